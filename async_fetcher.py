@@ -0,0 +1,156 @@
+"""비동기 차트 수집 엔진 - 하나의 이벤트 루프에서 수백 개 요청 동시 처리"""
+import asyncio
+import atexit
+import threading
+import time
+import aiohttp
+import config
+import http_client
+import rate_limiter
+
+_loop = None
+_loop_lock = threading.Lock()
+_session = None
+
+def _get_loop():
+    """백그라운드 이벤트 루프 (프로세스당 스레드 1개)"""
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name='async-fetcher', daemon=True)
+                thread.start()
+                _loop = loop
+    return _loop
+
+async def _get_session():
+    """aiohttp 세션 (이벤트 루프 스레드에서만 사용)"""
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=config.FETCH_CONCURRENCY,
+            limit_per_host=config.FETCH_CONCURRENCY,
+            ttl_dns_cache=300
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            headers=http_client.DEFAULT_HEADERS,
+            auto_decompress=True
+        )
+    return _session
+
+def chart_path(symbol):
+    """차트 API 경로"""
+    return f"/v8/finance/chart/{symbol}"
+
+async def fetch_json_async(path, params, timeout=8, cookies=None):
+    """Yahoo API JSON 비동기 요청 - (HTTP 상태 코드, JSON) 반환
+
+    요청마다 공유 속도 제한 토큰을 예약하며, 429/403 응답은 백오프 후
+    RATE_LIMIT_RETRIES회까지 재시도합니다.
+    timeout은 요청 1회(연결+응답 본문)에 대한 마감 시간이며 (속도 제한 대기 제외),
+    초과 시 요청이 실제로 취소됩니다.
+    cookies는 crumb가 필요한 API에서 crumb를 발급받은 쿠키입니다 (http_client.yahoo_crumb).
+    """
+    status, data, _ = await _fetch_json_timed(path, params, timeout, cookies)
+    return status, data
+
+async def _fetch_json_timed(path, params, timeout, cookies=None):
+    """fetch_json_async 본체 - (상태 코드, JSON, 요청 시간 합 (초, 재시도 포함·속도 제한 대기 제외))"""
+    session = await _get_session()
+    url = f"{http_client.YAHOO_QUERY_URL}{path}"
+    limiter = rate_limiter.get_limiter()
+
+    async def _request():
+        async with session.get(url, params=params, headers=http_client.YAHOO_HEADERS, cookies=cookies) as response:
+            retry_after = http_client.parse_retry_after(response.headers.get('Retry-After'))
+            if response.status != 200:
+                return response.status, None, retry_after
+            return response.status, await response.json(content_type=None), retry_after
+
+    elapsed = 0.0
+    for attempt in range(config.RATE_LIMIT_RETRIES + 1):
+        await limiter.acquire_async()
+        started = time.perf_counter()
+        try:
+            status, data, retry_after = await asyncio.wait_for(_request(), timeout=timeout)
+        except (asyncio.TimeoutError, aiohttp.ClientError, ValueError):
+            return None, None, elapsed + time.perf_counter() - started
+        elapsed += time.perf_counter() - started
+        if not limiter.record(status, retry_after):
+            return status, data, elapsed
+    return status, None, elapsed
+
+async def fetch_many_async(requests, timeout=8, concurrency=None, timings=None, cookies=None):
+    """여러 요청 동시 실행 - requests: {key: (path, params)} → {key: (상태 코드, JSON)}
+
+    timings가 주어지면 요청별 소요 시간(응답까지 걸린 시간 합, 재시도 포함·동시 요청/속도 제한 대기 제외)을 {key: 초}로 기록합니다.
+    cookies는 모든 요청에 함께 보냅니다 (fetch_json_async 참고).
+    """
+    semaphore = asyncio.Semaphore(concurrency or config.FETCH_CONCURRENCY)
+
+    async def _bounded(key, path, params):
+        async with semaphore:
+            status, data, elapsed = await _fetch_json_timed(path, params, timeout, cookies)
+            if timings is not None:
+                timings[key] = elapsed
+            return key, (status, data)
+
+    results = await asyncio.gather(*[_bounded(k, path, params) for k, (path, params) in requests.items()])
+    return dict(results)
+
+def run_sync(coro, timeout):
+    """코루틴을 이벤트 루프에서 실행하고 결과 대기 (시간 초과 시 취소)"""
+    future = asyncio.run_coroutine_threadsafe(coro, _get_loop())
+    try:
+        return future.result(timeout=timeout)
+    except Exception:
+        future.cancel()
+        raise
+
+def fetch_json(path, params, timeout=8):
+    """Yahoo API JSON 동기 요청 - (상태 코드, JSON) 반환"""
+    try:
+        budget = timeout + rate_limiter.get_limiter().worst_case_wait(1) + 1
+        return run_sync(fetch_json_async(path, params, timeout), budget)
+    except Exception:
+        return None, None
+
+def fetch_many(requests, timeout=8, concurrency=None, timings=None, cookies=None):
+    """여러 요청 동기 실행 - requests: {key: (path, params)} → {key: (상태 코드, JSON)} (timings, cookies: fetch_many_async 참고)"""
+    if not requests:
+        return {}
+    concurrency = concurrency or config.FETCH_CONCURRENCY
+    # 요청별 마감 시간이 있으므로 전체 대기 시간은 웨이브 수 + 속도 제한 대기 기준으로 제한
+    waves = (len(requests) + concurrency - 1) // concurrency
+    budget = timeout * waves + rate_limiter.get_limiter().worst_case_wait(len(requests)) + 5
+    try:
+        return run_sync(fetch_many_async(requests, timeout, concurrency, timings, cookies), budget)
+    except Exception:
+        return {}
+
+def fetch_chart(symbol, params, timeout=8):
+    """차트 JSON 동기 요청 (scan_symbol, server.py용) - (상태 코드, JSON) 반환"""
+    return fetch_json(chart_path(symbol), params, timeout)
+
+def fetch_charts(symbols, params, timeout=8, concurrency=None, params_by_symbol=None, timings=None):
+    """여러 종목 차트 동기 요청 - {symbol: (상태 코드, JSON)} 반환
+
+    params_by_symbol이 주어지면 종목별 파라미터를 우선 사용합니다.
+    timings가 주어지면 종목별 요청 소요 시간을 {symbol: 초}로 기록합니다.
+    """
+    params_by_symbol = params_by_symbol or {}
+    requests = {s: (chart_path(s), params_by_symbol.get(s, params)) for s in symbols}
+    return fetch_many(requests, timeout, concurrency, timings)
+
+def close():
+    """세션 정리 (프로세스 종료 시)"""
+    if _loop is None or _session is None or _session.closed:
+        return
+    try:
+        run_sync(_session.close(), 5)
+    except Exception:
+        pass
+
+atexit.register(close)
@@ -0,0 +1,159 @@
+"""로컬 일봉 저장소 - 종목별 컬럼형 NumPy 파일 (memory-mapped)
+
+파일 구조 (종목당 2개):
+    {SYMBOL}.npy       float64 배열 (6, N) - 행 순서: 타임스탬프, 시가, 고가, 저가, 종가, 거래량
+    {SYMBOL}.meta.json 수집 범위 메타데이터 (covered_from, updated_at)
+
+각 컬럼이 연속된 메모리에 저장되므로 종가 등 필요한 컬럼만 읽을 수 있습니다.
+"""
+import os
+import json
+import time
+import threading
+import numpy as np
+import pandas as pd
+import config
+
+COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+def _symbol_lock(symbol):
+    """종목별 쓰기 잠금"""
+    with _locks_guard:
+        lock = _locks.get(symbol)
+        if lock is None:
+            lock = threading.Lock()
+            _locks[symbol] = lock
+        return lock
+
+def _bars_path(symbol):
+    return os.path.join(config.BAR_STORE_DIR, f"{symbol.upper()}.npy")
+
+def _meta_path(symbol):
+    return os.path.join(config.BAR_STORE_DIR, f"{symbol.upper()}.meta.json")
+
+def _index_to_timestamps(index):
+    """DatetimeIndex를 UTC epoch 초로 변환"""
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    return index.asi8 // 10**9
+
+def load_meta(symbol):
+    """메타데이터 로드 (없으면 None)"""
+    try:
+        with open(_meta_path(symbol), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+def load_array(symbol, start_ts=None):
+    """저장된 일봉 배열 (6, N) 로드 - start_ts 이후만 복사"""
+    path = _bars_path(symbol)
+    if not os.path.exists(path):
+        return None
+    try:
+        bars = np.load(path, mmap_mode='r')
+        start = 0
+        if start_ts is not None:
+            start = int(np.searchsorted(bars[0], start_ts, side='left'))
+        # mmap 해제 후에도 쓸 수 있도록 필요한 구간만 복사
+        result = np.array(bars[:, start:])
+        del bars
+        return result
+    except Exception:
+        return None
+
+def to_frame(bars):
+    """(6, N) 배열을 DataFrame으로 변환"""
+    if bars is None or bars.shape[1] == 0:
+        return None
+    # 컬럼 5개를 한 블록으로 넘겨 컬럼별 복사/병합 없이 생성
+    index = pd.DatetimeIndex((bars[0].astype(np.int64) * 10**9).view('M8[ns]'))
+    return pd.DataFrame(bars[1:].T, columns=COLUMNS, index=index, copy=False)
+
+def read_bars(symbol, start_ts=None):
+    """저장된 일봉 DataFrame 반환 (없으면 None)"""
+    return to_frame(load_array(symbol, start_ts))
+
+def last_timestamp(symbol):
+    """마지막 일봉 타임스탬프 (없으면 None)"""
+    path = _bars_path(symbol)
+    if not os.path.exists(path):
+        return None
+    try:
+        bars = np.load(path, mmap_mode='r')
+        ts = int(bars[0, -1]) if bars.shape[1] > 0 else None
+        del bars
+        return ts
+    except Exception:
+        return None
+
+def write_bars(symbol, df, covered_from=None, replace=False):
+    """일봉 병합 저장 - 겹치는 구간은 새 데이터로 교체
+
+    covered_from: 이번 요청이 보장하는 시작 시점 (전체 범위 요청 시에만 지정)
+    replace: 기존 봉을 모두 버리고 새로 저장 (액면분할로 과거 가격이 바뀐 경우)
+
+    병합된 (6, N) 배열을 반환합니다.
+    """
+    if df is None or df.empty:
+        return None
+    new_ts = _index_to_timestamps(df.index).astype(np.float64)
+    new_bars = np.vstack([new_ts] + [df[name].to_numpy(dtype=np.float64) for name in COLUMNS])
+    return write_array(symbol, new_bars, covered_from, replace)
+
+def write_array(symbol, new_bars, covered_from=None, replace=False):
+    """(6, N) 배열 병합 저장 - write_bars와 같으며 DataFrame 변환 없이 배열을 바로 받음"""
+    if new_bars is None or new_bars.shape[1] == 0:
+        return None
+
+    with _symbol_lock(symbol):
+        os.makedirs(config.BAR_STORE_DIR, exist_ok=True)
+        existing = None if replace else load_array(symbol)
+        meta = {} if replace else (load_meta(symbol) or {})
+
+        if existing is not None and existing.shape[1] > 0:
+            # 새 데이터 시작일 이전 구간만 유지 (마지막 봉은 장중 값일 수 있으므로 교체)
+            # 소스마다 봉 시각이 다르므로(yfinance 자정, 차트 API 장 시작) 날짜 단위로 비교
+            keep = existing[:, existing[0] // 86400 < new_bars[0, 0] // 86400]
+            merged = np.hstack([keep, new_bars])
+        else:
+            merged = new_bars
+
+        if covered_from is not None:
+            previous = meta.get('covered_from')
+            meta['covered_from'] = int(covered_from) if previous is None else min(int(previous), int(covered_from))
+        meta['updated_at'] = int(time.time())
+
+        path = _bars_path(symbol)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, np.ascontiguousarray(merged))
+        os.replace(tmp_path, path)
+
+        meta_tmp = f"{_meta_path(symbol)}.tmp"
+        with open(meta_tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(meta_tmp, _meta_path(symbol))
+        return merged
+
+def slice_from(bars, start_ts):
+    """(6, N) 배열에서 start_ts 이후 구간"""
+    if bars is None:
+        return None
+    return bars[:, int(np.searchsorted(bars[0], start_ts, side='left')):]
+
+def touch(symbol):
+    """새 일봉이 없을 때 갱신 시각만 기록"""
+    with _symbol_lock(symbol):
+        meta = load_meta(symbol)
+        if meta is None:
+            return
+        meta['updated_at'] = int(time.time())
+        meta_tmp = f"{_meta_path(symbol)}.tmp"
+        with open(meta_tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(meta_tmp, _meta_path(symbol))
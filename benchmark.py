@@ -0,0 +1,912 @@
+"""성능 벤치마크 - 로컬 스텁 서버 기반
+
+사용법:
+    python benchmark.py http [종목수]
+    python benchmark.py store [종목수]
+    python benchmark.py quotes [종목수]
+    python benchmark.py throttle [종목수]
+    python benchmark.py outage [종목수]
+    python benchmark.py parse [종목수]
+    python benchmark.py burst [동시요청수]
+    python benchmark.py scan [종목수]
+    python benchmark.py scoring [종목수]
+    python benchmark.py universe [종목수]
+    python benchmark.py indicators [종목수]
+    python benchmark.py panel [종목수]
+    python benchmark.py stream [종목수]
+    python benchmark.py processes [종목수] [최대 프로세스 수]
+"""
+import sys
+import json
+import time
+import threading
+from collections import deque
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
+import requests
+import config
+import http_client
+
+RANGE_DAYS = {'1d': 1, '5d': 5, '1mo': 21, '3mo': 63, '6mo': 126, '1y': 252, '2y': 504}
+
+def make_chart_payload(symbol, days=126, end_ts=None, period1=None, period2=None):
+    """합성 차트 응답 생성 (Yahoo v8 chart 형식, 오늘까지의 일봉)
+
+    period1/period2가 주어지면 해당 구간의 봉만 포함합니다.
+    """
+    if end_ts is None:
+        end_ts = int(time.time()) // 86400 * 86400 + 48600  # 오늘 13:30 UTC (장 시작)
+    timestamps = [end_ts - (days - 1 - i) * 86400 for i in range(days)]
+    closes = [100.0 + (i % 17) * 0.5 for i in range(days)]
+    volumes = [1000000 + i * 100 for i in range(days)]
+    if period1 is not None:
+        keep = [i for i, ts in enumerate(timestamps) if period1 <= ts < (period2 or end_ts + 1)]
+        timestamps = [timestamps[i] for i in keep]
+        closes = [closes[i] for i in keep]
+        volumes = [volumes[i] for i in keep]
+    result = {'meta': {'symbol': symbol, 'regularMarketPrice': 100.0, 'previousClose': 99.5}}
+    if timestamps:
+        result['timestamp'] = timestamps
+        result['indicators'] = {
+            'quote': [{
+                'open': [c - 0.3 for c in closes],
+                'high': [c + 0.8 for c in closes],
+                'low': [c - 0.9 for c in closes],
+                'close': closes,
+                'volume': volumes
+            }]
+        }
+    return {'chart': {'result': [result], 'error': None}}
+
+def make_quote_payload(symbols):
+    """합성 quote 응답 생성 (Yahoo v7 quote 형식, 여러 종목)
+
+    'X'로 시작하는 종목은 응답에서 빠집니다 (상장폐지 등 누락 종목 재현).
+    """
+    now = int(time.time())
+    result = []
+    for symbol in symbols:
+        if symbol.startswith('X'):
+            continue
+        result.append({
+            'symbol': symbol,
+            'shortName': f"{symbol} Inc.",
+            'currency': 'USD',
+            'regularMarketPrice': 100.0,
+            'regularMarketPreviousClose': 99.5,
+            'regularMarketChangePercent': 0.5025,
+            'regularMarketVolume': 1000000,
+            'regularMarketTime': now,
+            'marketCap': 1000000000
+        })
+    return {'quoteResponse': {'result': result, 'error': None}}
+
+# 스텁 서버가 발급하는 crumb (v7 quote 요청에 없으면 401)
+STUB_CRUMB = 'stub-crumb'
+
+class StubServer:
+    """커넥션 수를 세는 keep-alive 스텁 서버
+
+    rate_limit이 주어지면 최근 1초 요청 수가 이를 넘을 때 429를 응답합니다.
+    """
+
+    def __init__(self, latency=0.0, rate_limit=None):
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.connections = 0
+        self.requests = 0
+        self.throttled = 0
+        self.paths = []
+        self.bytes_sent = 0
+        self._recent = deque()
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                with stub._lock:
+                    stub.connections += 1
+                super().setup()
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests += 1
+                    throttled = stub._is_throttled()
+                if throttled:
+                    body = b'Too Many Requests'
+                    self.send_response(429)
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                if stub.latency:
+                    time.sleep(stub.latency)
+                parsed = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                symbol = parsed.path.rstrip('/').split('/')[-1]
+                stub.paths.append(self.path)
+                if parsed.path == http_client.YAHOO_CRUMB_PATH:
+                    body = STUB_CRUMB.encode('utf-8')
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/plain')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                if parsed.path.endswith('/quote') and query.get('crumb') != STUB_CRUMB:
+                    # 실제 Yahoo처럼 crumb 없는 v7 quote 요청은 거절
+                    body = json.dumps({'finance': {'result': None, 'error': {'code': 'Unauthorized', 'description': 'Invalid Crumb'}}}).encode('utf-8')
+                    self.send_response(401)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                if parsed.path.endswith('/quote'):
+                    payload = make_quote_payload(query.get('symbols', '').split(','))
+                elif 'period1' in query:
+                    payload = make_chart_payload(symbol, days=RANGE_DAYS['2y'],
+                                                 period1=int(query['period1']), period2=int(query.get('period2', 0)) or None)
+                else:
+                    payload = make_chart_payload(symbol, days=RANGE_DAYS.get(query.get('range'), 126))
+                body = json.dumps(payload).encode('utf-8')
+                with stub._lock:
+                    stub.bytes_sent += len(body)
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        # 클라이언트가 keep-alive 연결을 끊을 때의 오류 출력 생략
+        self.httpd.handle_error = lambda request, client_address: None
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _is_throttled(self):
+        """최근 1초 요청 수 기준 속도 제한 (잠금 상태에서 호출)"""
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        while self._recent and now - self._recent[0] > 1.0:
+            self._recent.popleft()
+        if len(self._recent) >= self.rate_limit:
+            self.throttled += 1
+            return True
+        self._recent.append(now)
+        return False
+
+    def reset(self):
+        with self._lock:
+            self.connections = 0
+            self.requests = 0
+            self.throttled = 0
+            self._recent.clear()
+            self.paths = []
+            self.bytes_sent = 0
+
+def _run_requests(fetch, symbols, workers):
+    """워커 풀로 요청 실행 후 소요 시간 반환"""
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(fetch, symbols))
+    return time.time() - start
+
+def bench_http(count=1000):
+    """bare requests.get vs 공유 커넥션 풀 비교 (속도 제한은 끄고 연결 재사용 효과만 측정)"""
+    import rate_limiter
+
+    workers = config.MONITOR_WORKERS
+    symbols = [f"S{i:04d}" for i in range(count)]
+    params = {'interval': '1d', 'range': '6mo'}
+
+    with StubServer() as stub:
+        def bare_fetch(symbol):
+            response = requests.get(f"{stub.url}/v8/finance/chart/{symbol}", params=params, timeout=8)
+            response.json()
+
+        original = (http_client.YAHOO_QUERY_URL, config.YAHOO_RATE_LIMIT)
+        http_client.YAHOO_QUERY_URL = stub.url
+        config.YAHOO_RATE_LIMIT = 1e9  # 로컬 스텁이므로 속도 상한 없음
+        rate_limiter.reset()
+        http_client.reset_pool()
+
+        def pooled_fetch(symbol):
+            response = http_client.yahoo_get(f"/v8/finance/chart/{symbol}", params=params, timeout=8)
+            response.json()
+
+        try:
+            results = []
+            for name, fetch in [('before (requests.get)', bare_fetch), ('after (http_client)', pooled_fetch)]:
+                stub.reset()
+                elapsed = _run_requests(fetch, symbols, workers)
+                per_1000 = elapsed / count * 1000
+                results.append((name, stub.connections, stub.requests, elapsed, per_1000))
+        finally:
+            http_client.YAHOO_QUERY_URL, config.YAHOO_RATE_LIMIT = original
+            rate_limiter.reset()
+            http_client.reset_pool()
+
+    print(f"📊 HTTP 벤치마크: {count}개 종목, workers={workers}")
+    for name, connections, reqs, elapsed, per_1000 in results:
+        print(f"   - {name:<22} 연결(핸드셰이크): {connections:>5}개 | 요청: {reqs:>5}개 | "
+              f"소요: {elapsed:.2f}초 | 1,000종목당 {per_1000:.2f}초")
+    return results
+
+def bench_store(count=1000):
+    """일봉 저장소: 첫 스캔(전체 범위) vs 재스캔(증분) 수집 비교 (속도 제한은 끄고 측정)"""
+    import os
+    import shutil
+    import tempfile
+    import data_fetcher
+    import rate_limiter
+
+    symbols = [f"S{i:04d}" for i in range(count)]
+    store_dir = tempfile.mkdtemp(prefix='bar_store_bench_')
+    original = (http_client.YAHOO_QUERY_URL, config.BAR_STORE_DIR, config.BAR_STORE_FRESH_MINUTES, config.YAHOO_RATE_LIMIT)
+
+    with StubServer(latency=0.02) as stub:
+        http_client.YAHOO_QUERY_URL = stub.url
+        config.BAR_STORE_DIR = store_dir
+        config.BAR_STORE_FRESH_MINUTES = 0  # 재스캔에서도 증분 요청이 나가도록
+        config.YAHOO_RATE_LIMIT = 1e9  # 로컬 스텁이므로 속도 상한 없음
+        rate_limiter.reset()
+        try:
+            results = []
+            for name in ['first scan (full)', 'rescan (incremental)']:
+                data_fetcher._history_flight.invalidate()  # 메모리 캐시가 아닌 저장소 증분 수집을 측정
+                stub.reset()
+                start = time.time()
+                data = data_fetcher.fetch_stock_data_batch(symbols)
+                elapsed = time.time() - start
+                ok = sum(1 for df in data.values() if df is not None)
+                results.append((name, stub.requests, stub.bytes_sent, elapsed, ok))
+        finally:
+            (http_client.YAHOO_QUERY_URL, config.BAR_STORE_DIR,
+             config.BAR_STORE_FRESH_MINUTES, config.YAHOO_RATE_LIMIT) = original
+            rate_limiter.reset()
+            shutil.rmtree(store_dir, ignore_errors=True)
+
+    print(f"📊 일봉 저장소 벤치마크: {count}개 종목")
+    for name, reqs, sent, elapsed, ok in results:
+        print(f"   - {name:<22} 요청: {reqs:>5}개 | 전송량: {sent / 1024 / 1024:.2f}MB | "
+              f"소요: {elapsed:.2f}초 | 성공: {ok}개")
+    return results
+
+def bench_quotes(count=500):
+    """현재가 조회: 종목별 차트 요청 vs 일괄 quote 요청 비교 (속도 제한은 끄고 측정)"""
+    import data_fetcher
+    import rate_limiter
+
+    workers = config.MONITOR_WORKERS
+    # 일부 종목은 quote 응답에서 빠지도록 ('X' 접두사) → 차트 API 보충 경로 확인
+    symbols = [f"{'X' if i % 100 == 0 else 'S'}{i:04d}" for i in range(count)]
+    original = (http_client.YAHOO_QUERY_URL, config.YAHOO_RATE_LIMIT)
+
+    with StubServer(latency=0.02) as stub:
+        http_client.YAHOO_QUERY_URL = stub.url
+        config.YAHOO_RATE_LIMIT = 1e9  # 로컬 스텁이므로 속도 상한 없음
+        rate_limiter.reset()
+        http_client.reset_pool()
+
+        def per_symbol(symbol):
+            response = http_client.yahoo_get(f"/v8/finance/chart/{symbol}",
+                                             params={'interval': '1d', 'range': '1d'}, timeout=5)
+            return response.json()['chart']['result'][0]['meta']['regularMarketPrice']
+
+        try:
+            results = []
+            stub.reset()
+            start = time.time()
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                ok = sum(1 for price in executor.map(per_symbol, symbols) if price)
+            results.append(('before (per symbol)', stub.requests, time.time() - start, ok))
+
+            stub.reset()
+            start = time.time()
+            prices = data_fetcher.get_current_prices(symbols)
+            results.append(('after (batch quote)', stub.requests, time.time() - start, len(prices)))
+        finally:
+            http_client.YAHOO_QUERY_URL, config.YAHOO_RATE_LIMIT = original
+            rate_limiter.reset()
+            http_client.reset_pool()
+
+    print(f"📊 현재가 조회 벤치마크: {count}개 종목, QUOTE_BATCH_SIZE={config.QUOTE_BATCH_SIZE}")
+    for name, reqs, elapsed, ok in results:
+        print(f"   - {name:<22} 요청: {reqs:>5}개 | 소요: {elapsed:.2f}초 | 성공: {ok}개")
+    return results
+
+def bench_throttle(count=1000, server_rate=100):
+    """속도 제한 서버 대상 일괄 수집: 리미터 없음 vs 적응형 리미터 (커버리지 비교)"""
+    import shutil
+    import tempfile
+    import data_fetcher
+    import rate_limiter
+
+    symbols = [f"S{i:04d}" for i in range(count)]
+    original = (http_client.YAHOO_QUERY_URL, config.BAR_STORE_DIR, config.YAHOO_RATE_LIMIT, config.RATE_LIMIT_RETRIES)
+    # 리미터 없음 = 속도 상한 없음 + 재시도 없음 (기존 동작)
+    modes = [('before (no limiter)', 1e9, 0), ('after (adaptive)', original[2], original[3])]
+
+    with StubServer(latency=0.01, rate_limit=server_rate) as stub:
+        http_client.YAHOO_QUERY_URL = stub.url
+        try:
+            results = []
+            for name, max_rate, retries in modes:
+                store_dir = tempfile.mkdtemp(prefix='bar_store_bench_')
+                config.BAR_STORE_DIR = store_dir
+                config.YAHOO_RATE_LIMIT, config.RATE_LIMIT_RETRIES = max_rate, retries
+                rate_limiter.reset()
+                stub.reset()
+                start = time.time()
+                data = data_fetcher.fetch_stock_data_batch(symbols)
+                elapsed = time.time() - start
+                ok = sum(1 for df in data.values() if df is not None)
+                metrics = rate_limiter.get_metrics()
+                results.append((name, ok, stub.requests, stub.throttled, elapsed, metrics))
+                shutil.rmtree(store_dir, ignore_errors=True)
+        finally:
+            (http_client.YAHOO_QUERY_URL, config.BAR_STORE_DIR,
+             config.YAHOO_RATE_LIMIT, config.RATE_LIMIT_RETRIES) = original
+            rate_limiter.reset()
+
+    print(f"📊 속도 제한 벤치마크: {count}개 종목, 서버 한도 {server_rate}회/초")
+    for name, ok, reqs, throttled, elapsed, metrics in results:
+        print(f"   - {name:<22} 성공: {ok:>5}개 | 요청: {reqs:>5}개 (429: {throttled}개) | "
+              f"소요: {elapsed:.2f}초 | 최종 속도: {min(metrics['rate'], 9999):.1f}/초 | 제한 이벤트: {metrics['throttle_events']}회")
+    return results
+
+def bench_outage(count=1000, timeout=1):
+    """Yahoo 장애(응답 없음) 시 일괄 수집: 서킷 브레이커 없음 vs 있음 (타임아웃 비용 비교)"""
+    import shutil
+    import tempfile
+    import yfinance.base
+    import data_fetcher
+    import providers
+
+    symbols = [f"S{i:04d}" for i in range(count)]
+    original = (http_client.YAHOO_QUERY_URL, yfinance.base._BASE_URL_, config.BAR_STORE_DIR,
+                config.PROVIDER_BREAKER_FAILURES, providers.FAILURE_RATE_THRESHOLD)
+    # 브레이커 없음 = 실패 임계값을 도달할 수 없는 값으로 (기존 동작: 종목마다 모든 경로의 타임아웃)
+    modes = [('before (no breaker)', 10**9, 2.0), ('after (breaker)', original[3], original[4])]
+
+    # 응답이 타임아웃보다 늦는 스텁 = 장애 상황
+    with StubServer(latency=timeout * 3) as stub:
+        http_client.YAHOO_QUERY_URL = stub.url
+        yfinance.base._BASE_URL_ = stub.url
+        try:
+            results = []
+            for name, threshold, rate_threshold in modes:
+                store_dir = tempfile.mkdtemp(prefix='bar_store_bench_')
+                config.BAR_STORE_DIR = store_dir
+                config.PROVIDER_BREAKER_FAILURES = threshold
+                providers.FAILURE_RATE_THRESHOLD = rate_threshold
+                providers.reset_health()
+                stub.reset()
+                start = time.time()
+                for i in range(0, count, config.FETCH_BATCH_SIZE):
+                    data_fetcher.fetch_stock_data_batch(symbols[i:i + config.FETCH_BATCH_SIZE], timeout=timeout)
+                elapsed = time.time() - start
+                states = {n: m['state'] for n, m in data_fetcher.get_provider_metrics().items()}
+                results.append((name, stub.requests, elapsed, states))
+                shutil.rmtree(store_dir, ignore_errors=True)
+        finally:
+            (http_client.YAHOO_QUERY_URL, yfinance.base._BASE_URL_, config.BAR_STORE_DIR,
+             config.PROVIDER_BREAKER_FAILURES, providers.FAILURE_RATE_THRESHOLD) = original
+            providers.reset_health()
+
+    print(f"📊 장애 벤치마크: {count}개 종목, 배치 {config.FETCH_BATCH_SIZE}개, 요청 타임아웃 {timeout}초")
+    for name, reqs, elapsed, states in results:
+        print(f"   - {name:<22} 요청: {reqs:>5}개 | 소요: {elapsed:.2f}초 | 제공자 상태: {states}")
+    return results
+
+def _parse_rows_legacy(data):
+    """기존 파서 (봉마다 dict 생성 후 DataFrame) - 비교 기준"""
+    import pandas as pd
+    result = data['chart']['result'][0]
+    timestamps = result['timestamp']
+    quote = result['indicators']['quote'][0]
+    opens, highs, lows = quote['open'], quote['high'], quote['low']
+    closes, volumes = quote['close'], quote['volume']
+    rows = []
+    valid_timestamps = []
+    for i, ts in enumerate(timestamps):
+        if i < len(closes) and closes[i] is not None and closes[i] > 0:
+            valid_timestamps.append(ts)
+            rows.append({
+                'Open': opens[i] if i < len(opens) and opens[i] is not None else closes[i],
+                'High': highs[i] if i < len(highs) and highs[i] is not None else closes[i],
+                'Low': lows[i] if i < len(lows) and lows[i] is not None else closes[i],
+                'Close': closes[i],
+                'Volume': volumes[i] if i < len(volumes) and volumes[i] is not None else 0
+            })
+    return pd.DataFrame(rows, index=pd.to_datetime(valid_timestamps, unit='s'))
+
+def bench_parse(count=500, days=504):
+    """차트 응답 파싱: 봉 단위 dict vs 컬럼 단위 NumPy 변환 (시간, 메모리 할당)"""
+    import tracemalloc
+    import numpy as np
+    import data_fetcher
+
+    # 기록된 응답과 같은 형식 (2년 일봉, 일부 null 봉 포함)
+    responses = []
+    for i in range(count):
+        payload = json.loads(json.dumps(make_chart_payload(f"S{i:04d}", days=days)))
+        quote = payload['chart']['result'][0]['indicators']['quote'][0]
+        for j in range(i % 7, days, 97):
+            for key in quote:
+                quote[key][j] = None
+        responses.append(payload)
+
+    # 두 파서 결과가 같은지 확인
+    legacy = _parse_rows_legacy(responses[0])
+    current = data_fetcher.parse_chart_response('S0000', responses[0], min_rows=1)
+    assert legacy.index.equals(current.index)
+    assert np.allclose(legacy.to_numpy(dtype=np.float64), current[legacy.columns].to_numpy(dtype=np.float64))
+
+    results = []
+    for name, parse in [('before (row dicts)', _parse_rows_legacy),
+                        ('after (numpy columns)', lambda d: data_fetcher.parse_chart_response('S', d, min_rows=1)),
+                        ('after (arrays only)', lambda d: data_fetcher.parse_chart_arrays(d, min_rows=1))]:
+        start = time.perf_counter()
+        for payload in responses:
+            parse(payload)
+        elapsed = time.perf_counter() - start
+
+        # 종목 1개 파싱 중 최대 메모리 할당
+        tracemalloc.start()
+        peaks = []
+        for payload in responses[:50]:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            parse(payload)
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+        tracemalloc.stop()
+        results.append((name, elapsed / count * 1e6, sum(peaks) / len(peaks) / 1024))
+
+    print(f"📊 차트 파싱 벤치마크: {count}개 응답 x {days}봉")
+    for name, per_symbol_us, peak_kb in results:
+        print(f"   - {name:<22} 종목당 {per_symbol_us:>8.1f}µs | 종목당 최대 할당 {peak_kb:>7.1f}KB")
+    return results
+
+def bench_burst(clicks=50):
+    """같은 종목 동시 조회 (스캔 배치 + 대시보드 연속 클릭): 합치기 없음 vs single-flight"""
+    import shutil
+    import tempfile
+    import data_fetcher
+
+    batch = [f"S{i:04d}" for i in range(199)] + ['AAPL']
+    original = (http_client.YAHOO_QUERY_URL, config.BAR_STORE_DIR)
+    modes = [('before (no coalescing)', data_fetcher._load_history), ('after (single-flight)', data_fetcher.fetch_history)]
+
+    with StubServer(latency=0.2) as stub:
+        http_client.YAHOO_QUERY_URL = stub.url
+        try:
+            results = []
+            for name, fetch in modes:
+                store_dir = tempfile.mkdtemp(prefix='bar_store_bench_')
+                config.BAR_STORE_DIR = store_dir
+                data_fetcher._history_flight.invalidate()
+                stub.reset()
+                start = time.time()
+                # 스캔 배치가 AAPL을 받는 중에 /chart, /symbol 요청이 연달아 들어오는 상황
+                with ThreadPoolExecutor(max_workers=clicks + 1) as executor:
+                    futures = [executor.submit(fetch, batch, '2y', 8)]
+                    time.sleep(0.05)
+                    futures += [executor.submit(fetch, ['AAPL'], '2y', 8) for _ in range(clicks)]
+                    ok = sum(1 for f in futures if f.result().get('AAPL') is not None)
+                elapsed = time.time() - start
+                aapl_requests = sum(1 for path in stub.paths if '/AAPL' in path)
+                results.append((name, aapl_requests, stub.requests, elapsed, ok))
+                shutil.rmtree(store_dir, ignore_errors=True)
+        finally:
+            http_client.YAHOO_QUERY_URL, config.BAR_STORE_DIR = original
+            data_fetcher._history_flight.invalidate()
+
+    print(f"📊 동시 조회 벤치마크: 스캔 배치 {len(batch)}개 + AAPL 동시 요청 {clicks}개")
+    for name, aapl_requests, reqs, elapsed, ok in results:
+        print(f"   - {name:<24} AAPL 요청: {aapl_requests:>3}개 | 전체 요청: {reqs:>4}개 | "
+              f"소요: {elapsed:.2f}초 | 성공: {ok}/{clicks + 1}")
+    return results
+
+def bench_scan(count=500, latency=0.02):
+    """전체 스캔 (StockMonitor.scan_once) - 재생 서버의 합성 종목으로 오프라인 실행
+
+    같은 저장소로 두 번 스캔해 재스캔 시 요청 수(일봉 증분, 재무 지표 캐시)도 확인합니다.
+    """
+    import io
+    import shutil
+    import tempfile
+    import contextlib
+    import data_fetcher
+    import providers
+    import rate_limiter
+    import replay_server
+    import symbol_fetcher
+    from monitor import StockMonitor
+
+    work_dir = tempfile.mkdtemp(prefix='scan_bench_')
+    fixtures = f"{work_dir}/fixtures"
+    replay_server.synthesize(fixtures, count)
+    original = (http_client.YAHOO_QUERY_URL, http_client.NASDAQ_API_URL, config.BAR_STORE_DIR,
+                config.BAR_STORE_FRESH_MINUTES, config.FUNDAMENTALS_DB, config.UNIVERSE_META_FILE)
+
+    with replay_server.ReplayServer(fixtures, latency=latency) as server:
+        http_client.YAHOO_QUERY_URL = http_client.NASDAQ_API_URL = server.url
+        config.BAR_STORE_DIR = f"{work_dir}/bar_store"
+        config.BAR_STORE_FRESH_MINUTES = 0  # 재스캔에서도 일봉 증분 요청이 나가도록
+        config.FUNDAMENTALS_DB = f"{work_dir}/fundamentals.db"
+        config.UNIVERSE_META_FILE = f"{work_dir}/symbols_meta.csv"  # 합성 종목 메타데이터가 작업 디렉터리 밖에 남지 않도록
+        rate_limiter.reset()
+        providers.reset_health()
+        try:
+            results = []
+            for name in ['first scan', 'rescan']:
+                data_fetcher._history_flight.invalidate()
+                server.reset()
+                # 스캔 로그는 생략하고 결과만 출력
+                with contextlib.redirect_stdout(io.StringIO()):
+                    symbols = symbol_fetcher.get_all_symbols()
+                    monitor = StockMonitor(save_history=False)
+                    start = time.time()
+                    signals = monitor.scan_once(symbols, max_workers=config.MONITOR_WORKERS)
+                    elapsed = time.time() - start
+                results.append((name, elapsed, len(signals or []), server.get_metrics()))
+        finally:
+            (http_client.YAHOO_QUERY_URL, http_client.NASDAQ_API_URL, config.BAR_STORE_DIR,
+             config.BAR_STORE_FRESH_MINUTES, config.FUNDAMENTALS_DB, config.UNIVERSE_META_FILE) = original
+            http_client.reset_pool()
+            rate_limiter.reset()
+            data_fetcher._history_flight.invalidate()
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"📊 전체 스캔 벤치마크: {len(symbols)}개 종목 (재생 서버, 지연 {latency * 1000:.0f}ms)")
+    for name, elapsed, signal_count, metrics in results:
+        per_symbol = metrics['requests'] / max(len(symbols), 1)
+        kinds = ', '.join(f"{kind} {n}" for kind, n in sorted(metrics['by_kind'].items()))
+        print(f"   - {name:<11} 소요: {elapsed:.2f}초 | 종목당 {elapsed / max(len(symbols), 1) * 1000:.1f}ms | "
+              f"신호: {signal_count}개 | 요청: {metrics['requests']}개 (종목당 {per_symbol:.1f}개: {kinds})")
+    return results
+
+def _technical_score_legacy(data):
+    """이전 calculate_score의 ta 지표 계산 (비교 기준)"""
+    import pandas as pd
+    import ta
+
+    score = 0.0
+    close = data['Close']
+    rsi = ta.momentum.RSIIndicator(close, window=14).rsi().iloc[-1]
+    if not pd.isna(rsi):
+        score += (1.0 if 30 <= rsi <= 70 else 0.0) + (0.5 if 40 <= rsi <= 60 else 0.0)
+    macd = ta.trend.MACD(close)
+    macd_line, signal_line = macd.macd().iloc[-1], macd.macd_signal().iloc[-1]
+    if not pd.isna(macd_line) and not pd.isna(signal_line) and macd_line > signal_line:
+        score += 1.5
+    ma20 = close.rolling(window=20).mean().iloc[-1]
+    if len(data) >= 50:
+        ma50 = close.rolling(window=50).mean().iloc[-1]
+        if not pd.isna(ma20) and not pd.isna(ma50) and ma20 > ma50:
+            score += 1.0
+    if not pd.isna(ma20) and close.iloc[-1] > ma20:
+        score += 1.0
+    bb_lower = ta.volatility.BollingerBands(close, window=20).bollinger_lband().iloc[-1]
+    if not pd.isna(bb_lower) and close.iloc[-1] <= bb_lower:
+        score += 1.5
+    volume_ma = data['Volume'].rolling(window=20).mean().iloc[-1]
+    if not pd.isna(volume_ma) and data['Volume'].iloc[-1] > volume_ma * 1.2:
+        score += 1.0
+    if (close.iloc[-1] - close.iloc[-5]) / close.iloc[-5] > 0:
+        score += 1.0
+    return min(score, 10.0)
+
+def _score_symbol_legacy(symbol, data):
+    """이전 scan_symbol의 점수 계산 순서 (방법론마다 점수 1번 + 신호 1번, 기술적 지표는 ta)"""
+    from canslim_score import get_canslim_score_only, generate_canslim_signal
+    from value_investing_score import get_value_score_only, generate_value_signal
+    from scoring import make_signal
+
+    canslim_score = get_canslim_score_only(symbol, data)
+    value_score = get_value_score_only(symbol, data)
+    technical_score = round(_technical_score_legacy(data), 2)
+    signal = generate_canslim_signal(symbol, data) or generate_value_signal(symbol, data)
+    if signal is None:
+        signal = make_signal(symbol, 'technical', _technical_score_legacy(data), data['Close'].iloc[-1])
+    total_score = max(canslim_score, value_score, technical_score)
+    if signal:
+        signal.update(canslim_score=canslim_score, value_score=value_score,
+                      technical_score=technical_score, total_score=total_score)
+    return total_score, signal if total_score >= 6.5 or canslim_score >= 5.0 else None
+
+def _score_symbol(symbol, data):
+    """scan_symbol의 점수 계산 (scoring.evaluate 1회, 저장할 종목만 신호 생성)"""
+    import scoring
+
+    result = scoring.evaluate(symbol, data)
+    keep = result.total_score >= 6.5 or result.canslim_score >= 5.0
+    return result.total_score, result.signal() if keep else None
+
+def bench_scoring(count=300):
+    """종목 점수 계산 CPU 시간: 방법론별 중복 계산 vs 단일 평가 (합성 일봉 + 재무 지표)"""
+    import os
+    import shutil
+    import tempfile
+    import data_fetcher
+    import fundamentals
+    import replay_server
+
+    universe = replay_server.SyntheticUniverse(count, seed=3)
+    work_dir = tempfile.mkdtemp(prefix='scoring_bench_')
+    original = config.FUNDAMENTALS_DB
+    config.FUNDAMENTALS_DB = os.path.join(work_dir, 'fundamentals.db')
+    try:
+        # 재무 지표는 캐시에 미리 저장 (네트워크 없이 계산 비용만 측정)
+        now = time.time()
+        frames = {}
+        for symbol in universe.symbols:
+            info = fundamentals._flatten(universe.info(symbol)['quoteSummary']['result'][0])
+            fundamentals._save(symbol, info, now, now + 86400)
+            frames[symbol] = data_fetcher.parse_chart_response(symbol, universe.chart_payload(symbol))
+
+        # 두 방식의 점수와 신호가 같은지 확인
+        for symbol in universe.symbols[:50]:
+            before, after = _score_symbol_legacy(symbol, frames[symbol]), _score_symbol(symbol, frames[symbol])
+            assert before[0] == after[0]
+            if before[1] is not None:
+                assert {k: v for k, v in before[1].items() if k != 'date'} == {k: v for k, v in after[1].items() if k != 'date'}
+
+        results = []
+        for name, score in [('before (per-method)', _score_symbol_legacy), ('after (single pass)', _score_symbol)]:
+            start = time.process_time()
+            kept = sum(1 for symbol in universe.symbols if score(symbol, frames[symbol])[1] is not None)
+            elapsed = time.process_time() - start
+            results.append((name, elapsed / count * 1000, kept))
+    finally:
+        config.FUNDAMENTALS_DB = original
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"📊 점수 계산 벤치마크: {count}개 종목 x {replay_server.SYNTHETIC_BARS}봉")
+    for name, per_symbol_ms, kept in results:
+        print(f"   - {name:<22} 종목당 CPU {per_symbol_ms:>6.2f}ms | 신호 생성: {kept}개")
+    return results
+
+def bench_universe(count=6000):
+    """CAN SLIM·가치투자 전체 종목 재계산: 종목별 사다리 vs 특징 표 배열 연산 (합성 일봉 + 재무 지표)"""
+    import numpy as np
+    import data_fetcher
+    import fundamentals
+    import replay_server
+    import scoring
+    from canslim_score import score_canslim
+    from value_investing_score import score_value
+
+    universe = replay_server.SyntheticUniverse(count, seed=4)
+    inputs = []
+    for symbol in universe.symbols:
+        frame = data_fetcher.parse_chart_response(symbol, universe.chart_payload(symbol))
+        info = fundamentals._with_prices(fundamentals._flatten(universe.info(symbol)['quoteSummary']['result'][0]), frame)
+        inputs.append(scoring.ScoreInputs(symbol, frame, info))
+
+    start = time.perf_counter()
+    table = scoring.universe_table(inputs)
+    build_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scalar = np.array([[score_canslim(item)[0], score_value(item)[0]] for item in inputs])
+    scalar_elapsed = time.perf_counter() - start
+
+    runs = 20
+    start = time.perf_counter()
+    for _ in range(runs):
+        batch = scoring.score_universe(table)
+    batch_elapsed = (time.perf_counter() - start) / runs
+
+    # 종목별 계산과 값이 정확히 같은지 확인
+    assert np.array_equal(scalar, batch[['canslim_score', 'value_score']].to_numpy())
+
+    print(f"📊 전체 종목 재계산 벤치마크: {count}개 종목 (CAN SLIM + 가치투자)")
+    print(f"   - 종목별 사다리      {scalar_elapsed * 1000:>8.1f}ms")
+    print(f"   - 특징 표 배열 연산  {batch_elapsed * 1000:>8.1f}ms (특징 표 생성 {build_elapsed * 1000:.0f}ms, 1회)")
+    return scalar_elapsed, batch_elapsed, build_elapsed
+
+def bench_indicators(count=300):
+    """기술적 지표 점수 CPU 시간: ta 라이브러리 vs NumPy 커널 (6개월·2년 일봉)"""
+    import data_fetcher
+    import replay_server
+    from signal_generator import calculate_score
+
+    universe = replay_server.SyntheticUniverse(count, seed=5)
+    frames = [data_fetcher.parse_chart_response(symbol, universe.chart_payload(symbol)) for symbol in universe.symbols]
+
+    results = []
+    for label, days in [('6개월', 126), ('2년', replay_server.SYNTHETIC_BARS)]:
+        series = [frame.iloc[-days:] for frame in frames]
+        # 두 방식의 점수가 같은지 확인
+        assert all(_technical_score_legacy(data) == calculate_score(data) for data in series)
+        for name, score in [('before (ta)', _technical_score_legacy), ('after (NumPy 커널)', calculate_score)]:
+            start = time.process_time()
+            for data in series:
+                score(data)
+            elapsed = time.process_time() - start
+            results.append((label, days, name, elapsed / count * 1000))
+
+    print(f"📊 기술적 지표 벤치마크: {count}개 종목")
+    for label, days, name, per_symbol_ms in results:
+        print(f"   - {label:<4}({days}봉) {name:<20} 종목당 CPU {per_symbol_ms:>6.3f}ms")
+    return results
+
+def bench_panel(count=6000):
+    """전체 종목 기술적 점수: 종목별 calculate_score vs 패널 모드 1회 계산 (합성 2년 일봉)"""
+    import data_fetcher
+    import replay_server
+    import signal_generator
+
+    universe = replay_server.SyntheticUniverse(count, seed=6)
+    frames = {symbol: data_fetcher.parse_chart_response(symbol, universe.chart_payload(symbol)) for symbol in universe.symbols}
+    # 이력이 짧은 종목 (신규 상장 등) 섞기
+    for i, symbol in enumerate(universe.symbols[::7]):
+        frames[symbol] = frames[symbol].iloc[-(10 + i * 37 % 400):]
+
+    start = time.perf_counter()
+    scalar = {symbol: signal_generator.calculate_score(data) for symbol, data in frames.items()}
+    scalar_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    symbols, close, volume = signal_generator.price_panel(frames)
+    build_elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    panel = dict(zip(symbols, signal_generator.calculate_scores(close, volume).tolist()))
+    panel_elapsed = time.perf_counter() - start
+
+    # 종목별 계산과 점수가 같은지 확인
+    assert scalar == panel
+
+    print(f"📊 패널 기술적 점수 벤치마크: {count}개 종목 x 최대 {close.shape[1]}봉")
+    print(f"   - 종목별 calculate_score {scalar_elapsed * 1000:>8.1f}ms")
+    print(f"   - 패널 모드 1회 계산     {panel_elapsed * 1000:>8.1f}ms (행렬 생성 {build_elapsed * 1000:.0f}ms 별도)")
+    return scalar_elapsed, panel_elapsed, build_elapsed
+
+def bench_stream(count=6000):
+    """재스캔 기술적 점수: 패널 모드 전체 이력 재계산 vs 지표 상태에 새 봉만 반영 (합성 2년 일봉)"""
+    import data_fetcher
+    import indicator_state
+    import replay_server
+    import signal_generator
+
+    universe = replay_server.SyntheticUniverse(count, seed=8)
+    payloads = {symbol: universe.chart_payload(symbol) for symbol in universe.symbols}
+    today = {symbol: data_fetcher.parse_chart_response(symbol, payload) for symbol, payload in payloads.items()}
+    yesterday = {symbol: frame.iloc[:-1] for symbol, frame in today.items()}
+
+    def intraday():
+        """장중 재스캔 일봉 (마지막 봉 종가만 바뀐 응답을 스캔마다 새로 파싱)"""
+        frames = {}
+        for symbol, payload in payloads.items():
+            payload = json.loads(json.dumps(payload))
+            quote = payload['chart']['result'][0]['indicators']['quote'][0]
+            quote['close'][-1] *= 1.01
+            frames[symbol] = data_fetcher.parse_chart_response(symbol, payload)
+        return frames
+
+    def timed(func):
+        start = time.perf_counter()
+        result = func()
+        return result, time.perf_counter() - start
+
+    states = {}
+    (_, built), build_elapsed = timed(lambda: indicator_state.score_frames(states, yesterday))
+    (_, advanced), next_day_elapsed = timed(lambda: indicator_state.score_frames(states, today))
+    stream_frames, panel_frames = intraday(), intraday()
+    (scores, unchanged), intraday_elapsed = timed(lambda: indicator_state.score_frames(states, stream_frames))
+    panel, panel_elapsed = timed(lambda: signal_generator.score_frames(panel_frames))
+
+    # 전체 이력 재계산과 점수가 같은지 확인
+    assert scores == panel
+    assert all(scores[symbol] == signal_generator.calculate_score(panel_frames[symbol]) for symbol in universe.symbols[:500])
+    assert not unchanged
+
+    print(f"📊 지표 상태 재스캔 벤치마크: {count}개 종목 x {replay_server.SYNTHETIC_BARS}봉")
+    print(f"   - 패널 모드 전체 재계산         {panel_elapsed * 1000:>8.1f}ms")
+    print(f"   - 지표 상태 생성 (첫 스캔)      {build_elapsed * 1000:>8.1f}ms (상태 {len(built)}개)")
+    print(f"   - 다음 날 재스캔 (새 봉 1개)    {next_day_elapsed * 1000:>8.1f}ms (확정 {len(advanced)}개)")
+    print(f"   - 장중 재스캔 (마지막 봉 변경)  {intraday_elapsed * 1000:>8.1f}ms (확정 {len(unchanged)}개)")
+    return panel_elapsed, build_elapsed, next_day_elapsed, intraday_elapsed
+
+def bench_processes(count=3000, max_processes=0):
+    """스캔 점수 계산 처리량: 현재 스레드 vs 프로세스 풀 (일봉 배열 피클링 / 공유 메모리 패널), 프로세스 수별"""
+    import os
+    import pickle
+    import numpy as np
+    import data_fetcher
+    import fundamentals
+    import pipeline
+    import replay_server
+    import scoring
+    import shared_panel
+
+    universe = replay_server.SyntheticUniverse(count, seed=5)
+    frames, infos = {}, {}
+    for symbol in universe.symbols:
+        frames[symbol] = data_fetcher.parse_chart_response(symbol, universe.chart_payload(symbol))
+        infos[symbol] = fundamentals._with_prices(fundamentals._flatten(universe.info(symbol)['quoteSummary']['result'][0]), frames[symbol])
+
+    panel = shared_panel.create(frames)
+    try:
+        inputs = [scoring.ScoreInputs(symbol, frames[symbol], infos[symbol]) for symbol in universe.symbols]
+        plain_jobs = [item.to_job() for item in inputs]
+        panel_jobs = [item.to_job(panel.slice(item.symbol, item.length)) for item in inputs]
+        size = max(config.SCORE_BATCH_SIZE, 1)
+        batches = {
+            'arrays': [plain_jobs[i:i + size] for i in range(0, count, size)],
+            'shared': [panel_jobs[i:i + size] for i in range(0, count, size)],
+        }
+
+        start = time.perf_counter()
+        expected = np.vstack([scoring.evaluate_batch(jobs)[0] for jobs in batches['arrays']])
+        thread_elapsed = time.perf_counter() - start
+
+        results = []
+        for processes in range(1, (max_processes or os.cpu_count() or 1) + 1):
+            pool = pipeline.create_process_pool(processes)
+            try:
+                # 프로세스 시작·모듈 로드는 제외 (스캔 간 재사용)
+                list(pool.map(scoring.evaluate_batch, batches['shared'][:processes]))
+                for name, jobs_list in batches.items():
+                    start = time.perf_counter()
+                    scores = np.vstack([scores for scores, _, _ in pool.map(scoring.evaluate_batch, jobs_list)])
+                    elapsed = time.perf_counter() - start
+                    assert np.array_equal(np.isnan(scores), np.isnan(expected)) and np.allclose(scores, expected, equal_nan=True)
+                    results.append((processes, name, elapsed))
+            finally:
+                pool.shutdown()
+        sent = {name: len(pickle.dumps(jobs_list[0])) for name, jobs_list in batches.items()}
+        returned = len(pickle.dumps(scoring.evaluate_batch(batches['shared'][0])))
+    finally:
+        panel.close()
+
+    print(f"📊 점수 계산 프로세스 벤치마크: {count}개 종목 x {replay_server.SYNTHETIC_BARS}봉, 묶음 {size}개 (CPU 코어 {os.cpu_count()}개)")
+    print(f"   - 묶음당 전송: 배열 {sent['arrays'] / 1024:.1f}KB | 공유 메모리 {sent['shared'] / 1024:.1f}KB | 결과 {returned / 1024:.1f}KB")
+    print(f"   - 현재 스레드          {count / thread_elapsed:>8.0f}개/초")
+    for processes, name, elapsed in results:
+        label = '공유 메모리' if name == 'shared' else '배열 전송'
+        print(f"   - 프로세스 {processes}개 {label:<8} {count / elapsed:>8.0f}개/초 (x{thread_elapsed / elapsed:.2f})")
+    return thread_elapsed, results
+
+BENCHMARKS = {
+    'http': bench_http,
+    'store': bench_store,
+    'quotes': bench_quotes,
+    'throttle': bench_throttle,
+    'outage': bench_outage,
+    'parse': bench_parse,
+    'burst': bench_burst,
+    'scan': bench_scan,
+    'scoring': bench_scoring,
+    'universe': bench_universe,
+    'indicators': bench_indicators,
+    'panel': bench_panel,
+    'stream': bench_stream,
+    'processes': bench_processes,
+}
+
+if __name__ == '__main__':
+    name = sys.argv[1] if len(sys.argv) > 1 else 'http'
+    args = [int(a) for a in sys.argv[2:]]
+    if name not in BENCHMARKS:
+        print(f"사용 가능한 벤치마크: {', '.join(BENCHMARKS)}")
+        sys.exit(1)
+    BENCHMARKS[name](*args)
@@ -1,41 +1,40 @@
 """윌리엄 오닐(William O'Neil) CAN SLIM 방법론 기반 점수 계산"""
-import pandas as pd
-import yfinance as yf
+import fundamentals
+import scoring
 import numpy as np
-from datetime import datetime, timedelta
 
-def get_canslim_data(symbol):
-    """CAN SLIM 분석에 필요한 데이터 가져오기"""
+def _canslim_fields(info):
+    """재무 지표 → CAN SLIM 분석 항목"""
+    return {
+        'info': info,
+        'currentPrice': info.get('currentPrice', info.get('regularMarketPrice', 0)),
+        'marketCap': info.get('marketCap', 0),
+        'volume': info.get('volume', 0),
+        'averageVolume': info.get('averageVolume', 0),
+        '52WeekHigh': info.get('fiftyTwoWeekHigh', 0),
+        '52WeekLow': info.get('fiftyTwoWeekLow', 0),
+        'sharesOutstanding': info.get('sharesOutstanding', 0),
+        'institutionalOwnership': info.get('heldPercentInstitutions', 0),
+        'earningsQuarterlyGrowth': info.get('earningsQuarterlyGrowth'),
+        'earningsGrowth': info.get('earningsGrowth'),
+        'revenueGrowth': info.get('revenueGrowth'),
+        'returnOnEquity': info.get('returnOnEquity'),
+        'profitMargins': info.get('profitMargins')
+    }
+
+def get_canslim_data(symbol, price_data=None):
+    """CAN SLIM 분석에 필요한 데이터 가져오기 (재무 지표 캐시 사용)"""
     try:
-        ticker = yf.Ticker(symbol)
-        info = ticker.info
-        financials = ticker.financials
-        quarterly_earnings = ticker.quarterly_financials
-        
-        return {
-            'info': info,
-            'financials': financials,
-            'quarterly_earnings': quarterly_earnings,
-            'currentPrice': info.get('currentPrice', info.get('regularMarketPrice', 0)),
-            'marketCap': info.get('marketCap', 0),
-            'volume': info.get('volume', 0),
-            'averageVolume': info.get('averageVolume', 0),
-            '52WeekHigh': info.get('fiftyTwoWeekHigh', 0),
-            '52WeekLow': info.get('fiftyTwoWeekLow', 0),
-            'sharesOutstanding': info.get('sharesOutstanding', 0),
-            'institutionalOwnership': info.get('heldPercentInstitutions', 0),
-            'earningsQuarterlyGrowth': info.get('earningsQuarterlyGrowth'),
-            'earningsGrowth': info.get('earningsGrowth'),
-            'revenueGrowth': info.get('revenueGrowth'),
-            'returnOnEquity': info.get('returnOnEquity'),
-            'profitMargins': info.get('profitMargins')
-        }
+        info = fundamentals.get_info(symbol, price_data)
+        if info is None:
+            return None
+        return _canslim_fields(info)
     except:
         return None
 
-def calculate_canslim_score(symbol, price_data):
+def score_canslim(inputs):
     """
-    윌리엄 오닐 CAN SLIM 방법론 기반 점수 계산 (0-10점)
+    윌리엄 오닐 CAN SLIM 방법론 기반 점수 계산 (0-10점) - (점수, scoring.Reasons)
     
     CAN SLIM:
     C - Current quarterly earnings (분기 실적)
@@ -46,22 +45,25 @@ def calculate_canslim_score(symbol, price_data):
     I - Institutional sponsorship (기관 투자자 지지)
     M - Market direction (시장 방향)
     """
-    if price_data is None or price_data.empty or len(price_data) < 20:
-        return 0.0, {}
+    reasons = scoring.Reasons()
+    if inputs.length < 20:
+        return 0.0, reasons
     
     try:
         score = 0.0
-        reasons = {}
         max_score = 0.0
+        close, high, volume = inputs.close, inputs.high, inputs.volume
         
-        # CAN SLIM 데이터 가져오기
-        canslim_data = get_canslim_data(symbol)
-        if canslim_data is None:
-            return 0.0, {'error': 'CAN SLIM 데이터 없음'}
+        # CAN SLIM 데이터 (재무 지표 캐시)
+        info = inputs.info
+        if info is None:
+            reasons.add('error', 'CAN SLIM 데이터 없음')
+            return 0.0, reasons
+        canslim_data = _canslim_fields(info)
         
         current_price = canslim_data.get('currentPrice', 0)
         if current_price == 0:
-            current_price = price_data['Close'].iloc[-1]
+            current_price = close[-1]
         
         # ============================================
         # C - Current Quarterly Earnings (분기 실적)
@@ -70,20 +72,21 @@ def calculate_canslim_score(symbol, price_data):
         earnings_q_growth = canslim_data.get('earningsQuarterlyGrowth')
         if earnings_q_growth is not None:
             max_score += 2.0
+            pct = earnings_q_growth * 100
             if earnings_q_growth >= 0.50:  # 50% 이상
                 score += 2.0
-                reasons['C_earnings'] = f"분기 이익 성장 {earnings_q_growth*100:.0f}% (매우 우수)"
+                reasons.add('C_earnings', "분기 이익 성장 {:.0f}% (매우 우수)", pct)
             elif earnings_q_growth >= 0.25:  # 25% 이상
                 score += 1.5
-                reasons['C_earnings'] = f"분기 이익 성장 {earnings_q_growth*100:.0f}% (우수)"
+                reasons.add('C_earnings', "분기 이익 성장 {:.0f}% (우수)", pct)
             elif earnings_q_growth >= 0.10:  # 10% 이상
                 score += 1.0
-                reasons['C_earnings'] = f"분기 이익 성장 {earnings_q_growth*100:.0f}% (양호)"
+                reasons.add('C_earnings', "분기 이익 성장 {:.0f}% (양호)", pct)
             elif earnings_q_growth >= 0:
                 score += 0.5
-                reasons['C_earnings'] = f"분기 이익 성장 {earnings_q_growth*100:.0f}% (보통)"
+                reasons.add('C_earnings', "분기 이익 성장 {:.0f}% (보통)", pct)
             else:
-                reasons['C_earnings'] = f"분기 이익 감소 {earnings_q_growth*100:.0f}% (불량)"
+                reasons.add('C_earnings', "분기 이익 감소 {:.0f}% (불량)", pct)
         
         # ============================================
         # A - Annual Earnings Growth (연간 이익 성장)
@@ -92,20 +95,21 @@ def calculate_canslim_score(symbol, price_data):
         earnings_growth = canslim_data.get('earningsGrowth')
         if earnings_growth is not None:
             max_score += 2.0
+            pct = earnings_growth * 100
             if earnings_growth >= 0.50:  # 50% 이상
                 score += 2.0
-                reasons['A_annual'] = f"연간 이익 성장 {earnings_growth*100:.0f}% (매우 우수)"
+                reasons.add('A_annual', "연간 이익 성장 {:.0f}% (매우 우수)", pct)
             elif earnings_growth >= 0.25:  # 25% 이상
                 score += 1.5
-                reasons['A_annual'] = f"연간 이익 성장 {earnings_growth*100:.0f}% (우수)"
+                reasons.add('A_annual', "연간 이익 성장 {:.0f}% (우수)", pct)
             elif earnings_growth >= 0.10:  # 10% 이상
                 score += 1.0
-                reasons['A_annual'] = f"연간 이익 성장 {earnings_growth*100:.0f}% (양호)"
+                reasons.add('A_annual', "연간 이익 성장 {:.0f}% (양호)", pct)
             elif earnings_growth >= 0:
                 score += 0.5
-                reasons['A_annual'] = f"연간 이익 성장 {earnings_growth*100:.0f}% (보통)"
+                reasons.add('A_annual', "연간 이익 성장 {:.0f}% (보통)", pct)
             else:
-                reasons['A_annual'] = f"연간 이익 감소 {earnings_growth*100:.0f}% (불량)"
+                reasons.add('A_annual', "연간 이익 감소 {:.0f}% (불량)", pct)
         
         # ============================================
         # N - New Highs (신고가)
@@ -120,26 +124,26 @@ def calculate_canslim_score(symbol, price_data):
             # 52주 고점의 95% 이상이면 신고가 근처
             if current_price >= week_52_high * 0.95:
                 score += 1.5
-                reasons['N_newhigh'] = f"52주 고점 근처 ({current_price/week_52_high*100:.1f}%)"
+                reasons.add('N_newhigh', "52주 고점 근처 ({:.1f}%)", current_price / week_52_high * 100)
             elif price_position >= 0.85:
                 score += 1.2
-                reasons['N_newhigh'] = f"52주 상단권 ({price_position*100:.0f}%)"
+                reasons.add('N_newhigh', "52주 상단권 ({:.0f}%)", price_position * 100)
             elif price_position >= 0.70:
                 score += 0.8
-                reasons['N_newhigh'] = f"52주 중상단 ({price_position*100:.0f}%)"
+                reasons.add('N_newhigh', "52주 중상단 ({:.0f}%)", price_position * 100)
             elif price_position >= 0.50:
                 score += 0.4
-                reasons['N_newhigh'] = f"52주 중단 ({price_position*100:.0f}%)"
+                reasons.add('N_newhigh', "52주 중단 ({:.0f}%)", price_position * 100)
             else:
-                reasons['N_newhigh'] = f"52주 하단 ({price_position*100:.0f}%)"
+                reasons.add('N_newhigh', "52주 하단 ({:.0f}%)", price_position * 100)
         
         # 최근 3개월 신고가 돌파 여부
-        if len(price_data) >= 60:
-            recent_high = price_data['High'].tail(60).max()
+        if inputs.length >= 60:
+            recent_high = np.nanmax(high[-60:])
             if current_price >= recent_high * 0.98:  # 최근 고점의 98% 이상
                 max_score += 0.5
                 score += 0.5
-                reasons['N_recent_high'] = "최근 3개월 고점 근처"
+                reasons.add('N_recent_high', "최근 3개월 고점 근처")
         
         # ============================================
         # S - Supply and Demand (공급과 수요)
@@ -152,55 +156,72 @@ def calculate_canslim_score(symbol, price_data):
             volume_ratio = current_volume / avg_volume
             if volume_ratio >= 2.0:  # 평균의 2배 이상
                 score += 1.5
-                reasons['S_volume'] = f"거래량 {volume_ratio:.1f}배 (매우 활발)"
+                reasons.add('S_volume', "거래량 {:.1f}배 (매우 활발)", volume_ratio)
             elif volume_ratio >= 1.5:  # 평균의 1.5배 이상
                 score += 1.2
-                reasons['S_volume'] = f"거래량 {volume_ratio:.1f}배 (활발)"
+                reasons.add('S_volume', "거래량 {:.1f}배 (활발)", volume_ratio)
             elif volume_ratio >= 1.2:  # 평균의 1.2배 이상
                 score += 0.8
-                reasons['S_volume'] = f"거래량 {volume_ratio:.1f}배 (증가)"
+                reasons.add('S_volume', "거래량 {:.1f}배 (증가)", volume_ratio)
             elif volume_ratio >= 1.0:
                 score += 0.4
-                reasons['S_volume'] = f"거래량 {volume_ratio:.1f}배 (보통)"
+                reasons.add('S_volume', "거래량 {:.1f}배 (보통)", volume_ratio)
             else:
-                reasons['S_volume'] = f"거래량 {volume_ratio:.1f}배 (감소)"
+                reasons.add('S_volume', "거래량 {:.1f}배 (감소)", volume_ratio)
         
         # 가격 데이터의 최근 거래량 분석
-        if len(price_data) >= 20:
-            recent_volume = price_data['Volume'].tail(5).mean()
-            avg_volume_20 = price_data['Volume'].tail(20).mean()
-            if avg_volume_20 > 0:
-                volume_trend = recent_volume / avg_volume_20
-                max_score += 0.5
-                if volume_trend >= 1.5:
-                    score += 0.5
-                    reasons['S_volume_trend'] = f"최근 거래량 증가 추세 ({volume_trend:.1f}배)"
-                elif volume_trend >= 1.2:
-                    score += 0.3
-                    reasons['S_volume_trend'] = f"최근 거래량 증가 ({volume_trend:.1f}배)"
+        recent_volume = np.nanmean(volume[-5:])
+        avg_volume_20 = np.nanmean(volume[-20:])
+        if avg_volume_20 > 0:
+            volume_trend = recent_volume / avg_volume_20
+            max_score += 0.5
+            if volume_trend >= 1.5:
+                score += 0.5
+                reasons.add('S_volume_trend', "최근 거래량 증가 추세 ({:.1f}배)", volume_trend)
+            elif volume_trend >= 1.2:
+                score += 0.3
+                reasons.add('S_volume_trend', "최근 거래량 증가 ({:.1f}배)", volume_trend)
         
         # ============================================
         # L - Leader or Laggard (선도주 또는 후행주)
         # ============================================
-        # 상대 강도 (RS Rating) - 최근 6개월 수익률
-        if len(price_data) >= 120:
-            price_6mo_ago = price_data['Close'].iloc[-120]
+        # 상대 강도 (RS Rating) - 스캔 전체 대비 백분위 등급, 없으면 최근 6개월 수익률
+        if inputs.rs_rating is not None:
+            rs_rating = inputs.rs_rating
+            max_score += 1.5
+            if rs_rating >= 90:  # 상위 10%
+                score += 1.5
+                reasons.add('L_leader', "RS 등급 {} (선도주)", rs_rating)
+            elif rs_rating >= 80:  # 상위 20%
+                score += 1.2
+                reasons.add('L_leader', "RS 등급 {} (강세)", rs_rating)
+            elif rs_rating >= 70:
+                score += 0.8
+                reasons.add('L_leader', "RS 등급 {} (양호)", rs_rating)
+            elif rs_rating >= 50:
+                score += 0.4
+                reasons.add('L_leader', "RS 등급 {} (보통)", rs_rating)
+            else:
+                reasons.add('L_leader', "RS 등급 {} (후행주)", rs_rating)
+        elif inputs.length >= 120:
+            price_6mo_ago = close[-120]
             price_6mo_return = (current_price - price_6mo_ago) / price_6mo_ago
+            pct = price_6mo_return * 100
             max_score += 1.5
             if price_6mo_return >= 0.30:  # 30% 이상 상승
                 score += 1.5
-                reasons['L_leader'] = f"6개월 수익률 {price_6mo_return*100:.1f}% (선도주)"
+                reasons.add('L_leader', "6개월 수익률 {:.1f}% (선도주)", pct)
             elif price_6mo_return >= 0.20:  # 20% 이상 상승
                 score += 1.2
-                reasons['L_leader'] = f"6개월 수익률 {price_6mo_return*100:.1f}% (강세)"
+                reasons.add('L_leader', "6개월 수익률 {:.1f}% (강세)", pct)
             elif price_6mo_return >= 0.10:  # 10% 이상 상승
                 score += 0.8
-                reasons['L_leader'] = f"6개월 수익률 {price_6mo_return*100:.1f}% (양호)"
+                reasons.add('L_leader', "6개월 수익률 {:.1f}% (양호)", pct)
             elif price_6mo_return >= 0:
                 score += 0.4
-                reasons['L_leader'] = f"6개월 수익률 {price_6mo_return*100:.1f}% (보통)"
+                reasons.add('L_leader', "6개월 수익률 {:.1f}% (보통)", pct)
             else:
-                reasons['L_leader'] = f"6개월 수익률 {price_6mo_return*100:.1f}% (후행주)"
+                reasons.add('L_leader', "6개월 수익률 {:.1f}% (후행주)", pct)
         
         # ROE (자기자본이익률) - 17% 이상 선호
         roe = canslim_data.get('returnOnEquity')
@@ -208,12 +229,12 @@ def calculate_canslim_score(symbol, price_data):
             max_score += 0.5
             if roe >= 25:
                 score += 0.5
-                reasons['L_roe'] = f"ROE {roe:.1f}% (우수)"
+                reasons.add('L_roe', "ROE {:.1f}% (우수)", roe)
             elif roe >= 17:
                 score += 0.3
-                reasons['L_roe'] = f"ROE {roe:.1f}% (양호)"
+                reasons.add('L_roe', "ROE {:.1f}% (양호)", roe)
             else:
-                reasons['L_roe'] = f"ROE {roe:.1f}% (낮음)"
+                reasons.add('L_roe', "ROE {:.1f}% (낮음)", roe)
         
         # ============================================
         # I - Institutional Sponsorship (기관 투자자 지지)
@@ -222,39 +243,42 @@ def calculate_canslim_score(symbol, price_data):
         inst_ownership = canslim_data.get('institutionalOwnership')
         if inst_ownership is not None:
             max_score += 1.0
+            pct = inst_ownership * 100
             if inst_ownership >= 0.60:  # 60% 이상
                 score += 1.0
-                reasons['I_institutional'] = f"기관 보유율 {inst_ownership*100:.1f}% (높음)"
+                reasons.add('I_institutional', "기관 보유율 {:.1f}% (높음)", pct)
             elif inst_ownership >= 0.40:  # 40% 이상
                 score += 0.7
-                reasons['I_institutional'] = f"기관 보유율 {inst_ownership*100:.1f}% (양호)"
+                reasons.add('I_institutional', "기관 보유율 {:.1f}% (양호)", pct)
             elif inst_ownership >= 0.20:  # 20% 이상
                 score += 0.4
-                reasons['I_institutional'] = f"기관 보유율 {inst_ownership*100:.1f}% (보통)"
+                reasons.add('I_institutional', "기관 보유율 {:.1f}% (보통)", pct)
             else:
-                reasons['I_institutional'] = f"기관 보유율 {inst_ownership*100:.1f}% (낮음)"
+                reasons.add('I_institutional', "기관 보유율 {:.1f}% (낮음)", pct)
         
         # 최근 기관 매수 여부 (거래량과 가격 상승으로 추정)
-        if len(price_data) >= 20:
-            recent_price_change = (price_data['Close'].iloc[-1] - price_data['Close'].iloc[-20]) / price_data['Close'].iloc[-20]
-            recent_volume_avg = price_data['Volume'].tail(5).mean()
-            prev_volume_avg = price_data['Volume'].iloc[-20:-10].mean()
-            if recent_volume_avg > 0 and prev_volume_avg > 0:
-                volume_increase = recent_volume_avg / prev_volume_avg
-                if recent_price_change > 0.05 and volume_increase > 1.3:  # 가격 상승 + 거래량 증가
-                    max_score += 0.5
-                    score += 0.5
-                    reasons['I_buying'] = "기관 매수 추정 (가격↑ + 거래량↑)"
+        recent_price_change = (close[-1] - close[-20]) / close[-20]
+        prev_volume_avg = np.nanmean(volume[-20:-10])
+        if recent_volume > 0 and prev_volume_avg > 0:
+            volume_increase = recent_volume / prev_volume_avg
+            if recent_price_change > 0.05 and volume_increase > 1.3:  # 가격 상승 + 거래량 증가
+                max_score += 0.5
+                score += 0.5
+                reasons.add('I_buying', "기관 매수 추정 (가격↑ + 거래량↑)")
         
         # ============================================
         # M - Market Direction (시장 방향)
         # ============================================
-        # 시장 전체 방향은 개별 종목 분석에서는 제외
-        # (시장 지수 분석이 필요하므로 여기서는 스킵)
-        # 대신 종목의 시장 대비 상대 강도로 대체
+        # 스캔 시작 시 주요 지수로 계산한 시장 국면 (모든 종목 공통, market_regime)
+        # 시장 국면이 없으면 (단일 종목 조회, 지수 수집 실패) 기본 점수
+        regime = inputs.regime
         max_score += 0.5
-        score += 0.5  # 기본 점수 (시장 방향은 별도 분석 필요)
-        reasons['M_market'] = "시장 방향 (별도 분석 필요)"
+        if regime is None:
+            score += 0.5
+            reasons.add('M_market', "시장 방향 (별도 분석 필요)")
+        else:
+            score += regime.points
+            reasons.add('M_market', "{} (분산일 {}일)", regime.label, regime.distribution_days)
         
         # ============================================
         # 추가 지표
@@ -263,15 +287,16 @@ def calculate_canslim_score(symbol, price_data):
         revenue_growth = canslim_data.get('revenueGrowth')
         if revenue_growth is not None:
             max_score += 0.5
+            pct = revenue_growth * 100
             if revenue_growth >= 0.25:  # 25% 이상
                 score += 0.5
-                reasons['revenue_growth'] = f"매출 성장률 {revenue_growth*100:.1f}% (우수)"
+                reasons.add('revenue_growth', "매출 성장률 {:.1f}% (우수)", pct)
             elif revenue_growth >= 0.15:  # 15% 이상
                 score += 0.3
-                reasons['revenue_growth'] = f"매출 성장률 {revenue_growth*100:.1f}% (양호)"
+                reasons.add('revenue_growth', "매출 성장률 {:.1f}% (양호)", pct)
             elif revenue_growth >= 0:
                 score += 0.1
-                reasons['revenue_growth'] = f"매출 성장률 {revenue_growth*100:.1f}% (보통)"
+                reasons.add('revenue_growth', "매출 성장률 {:.1f}% (보통)", pct)
         
         # 순이익률
         profit_margin = canslim_data.get('profitMargins')
@@ -279,10 +304,10 @@ def calculate_canslim_score(symbol, price_data):
             max_score += 0.5
             if profit_margin >= 0.20:  # 20% 이상
                 score += 0.5
-                reasons['profit_margin'] = f"순이익률 {profit_margin*100:.1f}% (우수)"
+                reasons.add('profit_margin', "순이익률 {:.1f}% (우수)", profit_margin * 100)
             elif profit_margin >= 0.10:  # 10% 이상
                 score += 0.3
-                reasons['profit_margin'] = f"순이익률 {profit_margin*100:.1f}% (양호)"
+                reasons.add('profit_margin', "순이익률 {:.1f}% (양호)", profit_margin * 100)
         
         # 최대 10점으로 정규화
         if max_score > 0:
@@ -293,7 +318,93 @@ def calculate_canslim_score(symbol, price_data):
         return min(normalized_score, 10.0), reasons
         
     except Exception as e:
-        return 0.0, {'error': str(e)}
+        reasons = scoring.Reasons()
+        reasons.add('error', '{}', str(e))
+        return 0.0, reasons
+
+def score_canslim_table(table, regime=None):
+    """
+    특징 표(scoring.universe_table) 전체의 CAN SLIM 점수 (0-10점) - NumPy 배열
+
+    score_canslim의 if/elif 사다리를 np.digitize/np.select로 계산하고,
+    항목 점수를 같은 순서로 더해 종목별 계산과 같은 값을 돌려줍니다.
+    regime은 모든 종목에 공통인 시장 국면입니다 (없으면 M 기본 점수).
+    """
+    column = lambda name: table[name].to_numpy(dtype=np.float64)
+    length = column('length')
+    current_price = column('current_price')
+    score = np.zeros(len(table))
+    max_score = np.zeros(len(table))
+
+    def add(mask, points, weight):
+        nonlocal score, max_score
+        score = score + np.where(mask, points, 0.0)
+        max_score = max_score + np.where(mask, weight, 0.0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # C, A - 분기/연간 이익 성장
+        for name in ('earningsQuarterlyGrowth', 'earningsGrowth'):
+            growth = column(name)
+            add(~np.isnan(growth), scoring.ladder(growth, [0, 0.10, 0.25, 0.50], [0.0, 0.5, 1.0, 1.5, 2.0]), 2.0)
+
+        # N - 52주 고점 근처, 최근 3개월 고점
+        week_52_high, week_52_low = column('fiftyTwoWeekHigh'), column('fiftyTwoWeekLow')
+        has_range = (week_52_high > 0) & (week_52_low > 0)
+        price_position = (current_price - week_52_low) / (week_52_high - week_52_low)
+        add(has_range, np.select(
+            [current_price >= week_52_high * 0.95, price_position >= 0.85, price_position >= 0.70, price_position >= 0.50],
+            [1.5, 1.2, 0.8, 0.4], 0.0), 1.5)
+        add((length >= 60) & (current_price >= column('recent_high_60') * 0.98), 0.5, 0.5)
+
+        # S - 거래량 (재무 지표 기준, 최근 일봉 기준)
+        avg_volume, current_volume = column('averageVolume'), column('volume')
+        add((avg_volume > 0) & (current_volume > 0),
+            scoring.ladder(current_volume / avg_volume, [1.0, 1.2, 1.5, 2.0], [0.0, 0.4, 0.8, 1.2, 1.5]), 1.5)
+        recent_volume, avg_volume_20 = column('recent_volume'), column('avg_volume_20')
+        add(avg_volume_20 > 0, scoring.ladder(recent_volume / avg_volume_20, [1.2, 1.5], [0.0, 0.3, 0.5]), 0.5)
+
+        # L - RS 등급 (없으면 6개월 수익률), ROE
+        rs_rating = column('rs_rating')
+        has_rating = ~np.isnan(rs_rating)
+        price_6mo_ago = column('close_120')
+        add(has_rating | (length >= 120), np.where(
+            has_rating,
+            scoring.ladder(rs_rating, [50, 70, 80, 90], [0.0, 0.4, 0.8, 1.2, 1.5]),
+            scoring.ladder((current_price - price_6mo_ago) / price_6mo_ago, [0, 0.10, 0.20, 0.30], [0.0, 0.4, 0.8, 1.2, 1.5])
+        ), 1.5)
+        roe = column('returnOnEquity')
+        add(roe > 0, scoring.ladder(roe, [17, 25], [0.0, 0.3, 0.5]), 0.5)
+
+        # I - 기관 보유율, 기관 매수 추정 (가격↑ + 거래량↑)
+        inst_ownership = np.nan_to_num(column('heldPercentInstitutions'), nan=0.0)  # 없으면 0 (score_canslim과 동일)
+        add(True, scoring.ladder(inst_ownership, [0.20, 0.40, 0.60], [0.0, 0.4, 0.7, 1.0]), 1.0)
+        close_20 = column('close_20')
+        recent_price_change = (column('last_close') - close_20) / close_20
+        prev_volume_avg = column('prev_volume_avg')
+        add((recent_volume > 0) & (prev_volume_avg > 0) & (recent_price_change > 0.05) &
+            (recent_volume / prev_volume_avg > 1.3), 0.5, 0.5)
+
+        # M - 시장 국면 (모든 종목 공통, 없으면 기본 점수)
+        add(True, 0.5 if regime is None else regime.points, 0.5)
+
+        # 추가 지표 - 매출 성장률, 순이익률
+        revenue_growth = column('revenueGrowth')
+        add(~np.isnan(revenue_growth), scoring.ladder(revenue_growth, [0, 0.15, 0.25], [0.0, 0.1, 0.3, 0.5]), 0.5)
+        profit_margin = column('profitMargins')
+        add(profit_margin > 0, scoring.ladder(profit_margin, [0.10, 0.20], [0.0, 0.3, 0.5]), 0.5)
+
+    normalized = scoring.normalize(score, max_score)
+    # 재무 지표가 없거나 일봉이 짧은 종목, 52주 고가 = 저가(종목별 계산에서 0으로 나누기 오류)는 0점
+    failed = has_range & (week_52_high == week_52_low) & ~table['price_from_close'].to_numpy()
+    valid = table['has_info'].to_numpy() & (length >= 20) & ~failed
+    return np.where(valid, normalized, 0.0)
+
+def calculate_canslim_score(symbol, price_data):
+    """CAN SLIM 점수와 근거 (0-10점) - 근거는 문장 딕셔너리"""
+    if price_data is None or price_data.empty:
+        return 0.0, {}
+    score, reasons = score_canslim(scoring.ScoreInputs(symbol, price_data))
+    return score, reasons.to_dict()
 
 def generate_canslim_signal(symbol, price_data):
     """CAN SLIM 방법론 기반 매수 신호 생성 (점수만 반환)"""
@@ -301,19 +412,9 @@ def generate_canslim_signal(symbol, price_data):
         return None
     
     try:
-        score, reasons = calculate_canslim_score(symbol, price_data)
-        current_price = price_data['Close'].iloc[-1]
-        
-        # 점수가 있으면 항상 반환 (7.5점 미만이어도)
-        return {
-            'symbol': symbol,
-            'level': 'BUY' if score >= 7.5 else 'WATCH',
-            'score': round(score, 2),
-            'price': round(current_price, 2),
-            'date': datetime.now().isoformat(),
-            'reasons': reasons,
-            'method': 'canslim'
-        }
+        inputs = scoring.ScoreInputs(symbol, price_data)
+        score, reasons = score_canslim(inputs)
+        return scoring.make_signal(symbol, 'canslim', score, inputs.last_close, reasons)
     except Exception as e:
         return None
 
@@ -324,4 +425,3 @@ def get_canslim_score_only(symbol, price_data):
         return round(score, 2)
     except:
         return 0.0
-
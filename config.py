@@ -11,6 +11,53 @@ MONITOR_SYMBOL_COUNT = int(os.environ.get('MONITOR_SYMBOL_COUNT', '0'))  # 0이
 MONITOR_WORKERS = int(os.environ.get('MONITOR_WORKERS', '20'))
 MONITOR_TIMEFRAME = os.environ.get('MONITOR_TIMEFRAME', 'short_swing')
 
+# 데이터 수집 설정
+FETCH_CONCURRENCY = int(os.environ.get('FETCH_CONCURRENCY', '200'))  # 동시 차트 요청 수
+FETCH_BATCH_SIZE = int(os.environ.get('FETCH_BATCH_SIZE', '200'))  # 스캔 시 한 번에 수집할 종목 수
+QUOTE_BATCH_SIZE = int(os.environ.get('QUOTE_BATCH_SIZE', '50'))  # 현재가 일괄 조회 시 요청당 종목 수
+SCAN_PERIOD = os.environ.get('SCAN_PERIOD', '1y')  # 스캔 시 수집할 일봉 기간 (상대강도 12개월 수익률 포함)
+
+# 종목 사전 필터 (스크리너 메타데이터 기준, 제외된 종목은 일봉·재무 지표를 요청하지 않음 - 0이면 기준 사용 안 함)
+UNIVERSE_META_FILE = os.environ.get('UNIVERSE_META_FILE', 'symbols_meta.csv')  # 스크리너 메타데이터 (가격, 거래량, 시가총액)
+UNIVERSE_META_MAX_AGE_HOURS = int(os.environ.get('UNIVERSE_META_MAX_AGE_HOURS', '24'))  # 이보다 오래되면 스크리너에서 다시 받음
+PREFILTER_MIN_PRICE = float(os.environ.get('PREFILTER_MIN_PRICE', '1'))  # 최소 주가 ($)
+PREFILTER_MIN_DOLLAR_VOLUME = float(os.environ.get('PREFILTER_MIN_DOLLAR_VOLUME', '1000000'))  # 최소 거래대금 ($, 가격 x 당일 거래량)
+PREFILTER_MIN_MARKET_CAP = float(os.environ.get('PREFILTER_MIN_MARKET_CAP', '0'))  # 최소 시가총액 ($)
+
+# 스캔 파이프라인 (수집 → 준비 → 점수 계산 → 결과 반영)
+SCORE_PROCESSES = int(os.environ.get('SCORE_PROCESSES', '0'))  # 점수 계산 프로세스 수 (0이면 CPU 코어 수, -1이면 프로세스 풀 없이 스레드에서 계산)
+PIPELINE_QUEUE_SIZE = int(os.environ.get('PIPELINE_QUEUE_SIZE', '256'))  # 단계 사이 대기 작업 최대 수 (뒷단계가 밀리면 앞단계 대기)
+SCAN_SKIP_UNCHANGED = os.environ.get('SCAN_SKIP_UNCHANGED', '1') == '1'  # 최신 봉이 지난 스캔과 같은 종목은 수집·점수 계산 생략 (0이면 매번 전체)
+SCAN_WARM_HOURS = int(os.environ.get('SCAN_WARM_HOURS', '0'))  # warm 등급(5점 이상·유동성 상위) 수집 주기 (시간, 0이면 매 스캔)
+SCAN_COLD_HOURS = int(os.environ.get('SCAN_COLD_HOURS', '0'))  # cold 등급(나머지) 수집 주기 (시간, 0이면 매 스캔) - 주기 전에는 저장소 일봉 사용
+SCAN_CHECKPOINT_SIZE = int(os.environ.get('SCAN_CHECKPOINT_SIZE', '200'))  # 완료된 종목 결과를 DB에 저장하는 단위 (재시작 시 남은 종목만 스캔)
+SCAN_RESUME_MAX_AGE_HOURS = int(os.environ.get('SCAN_RESUME_MAX_AGE_HOURS', '6'))  # 이보다 오래된 중단 스캔은 재개하지 않음
+RS_RATINGS_KEEP_SCANS = int(os.environ.get('RS_RATINGS_KEEP_SCANS', '30'))  # 전체 종목 상대강도 등급을 DB에 보관할 최근 스캔 수
+SCAN_DEADLINE_MINUTES = float(os.environ.get('SCAN_DEADLINE_MINUTES', '210'))  # 스캔 시간 예산 (분, 0이면 제한 없음) - 22:30 스캔이 02:30 스캔과 겹치지 않도록 4시간보다 짧게
+SCORE_BATCH_SIZE = int(os.environ.get('SCORE_BATCH_SIZE', '32'))  # 점수 계산 프로세스로 한 번에 보내는 종목 수 (일봉은 공유 메모리 패널로 전달)
+
+# Yahoo 요청 속도 제한 (프로세스 전체 공유)
+YAHOO_RATE_LIMIT = float(os.environ.get('YAHOO_RATE_LIMIT', '50'))  # 최대 초당 요청 수
+YAHOO_RATE_LIMIT_MIN = float(os.environ.get('YAHOO_RATE_LIMIT_MIN', '2'))  # 제한 시 최저 초당 요청 수
+RATE_LIMIT_RETRIES = int(os.environ.get('RATE_LIMIT_RETRIES', '6'))  # 429/403 응답 시 재시도 횟수
+
+# API 기본 주소 (오프라인 재생 서버 등으로 바꿀 때 설정, 예: http://127.0.0.1:8765)
+YAHOO_BASE_URL = os.environ.get('YAHOO_BASE_URL', 'https://query1.finance.yahoo.com').rstrip('/')
+NASDAQ_BASE_URL = os.environ.get('NASDAQ_BASE_URL', 'https://api.nasdaq.com').rstrip('/')
+
+# 데이터 제공자 서킷 브레이커
+PROVIDER_BREAKER_FAILURES = int(os.environ.get('PROVIDER_BREAKER_FAILURES', '5'))  # 연속 실패 시 제공자 일시 제외
+PROVIDER_BREAKER_COOLDOWN = int(os.environ.get('PROVIDER_BREAKER_COOLDOWN', '60'))  # 제외 후 상태 확인까지 대기 (초)
+
+# 일봉 저장소 설정
+BAR_STORE_DIR = os.environ.get('BAR_STORE_DIR', 'bar_store')
+BAR_STORE_FRESH_MINUTES = int(os.environ.get('BAR_STORE_FRESH_MINUTES', '30'))  # 이 시간 내 갱신된 종목은 요청 생략
+HISTORY_CACHE_SECONDS = int(os.environ.get('HISTORY_CACHE_SECONDS', '60'))  # 같은 종목/기간 조회 결과 재사용 시간 (초)
+
+# 재무 지표 캐시 설정
+FUNDAMENTALS_DB = os.environ.get('FUNDAMENTALS_DB', 'fundamentals.db')
+FUNDAMENTALS_TTL_DAYS = int(os.environ.get('FUNDAMENTALS_TTL_DAYS', '30'))  # 실적 발표 전까지 최대 보관 기간 (일)
+
 # 서버 설정
 HOST = os.environ.get('HOST', '0.0.0.0')
 PORT = int(os.environ.get('PORT', '5000'))
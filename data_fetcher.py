@@ -1,176 +1,302 @@
 """주식 데이터 가져오기 - 직접 Yahoo Finance API 호출"""
-import pandas as pd
+import numpy as np
 import time
-import json
 import warnings
 import logging
 import os
-import requests
-from datetime import datetime, timedelta
-import yfinance as yf
+import config
+import http_client
+import async_fetcher
+import bar_store
+import providers
+import rate_limiter
+import singleflight
+from rate_limiter import YFRateLimitError
+from concurrent.futures import ThreadPoolExecutor
 
 # 경고 억제
 warnings.filterwarnings('ignore')
 logging.getLogger('yfinance').setLevel(logging.CRITICAL)
 os.environ['YFINANCE_DISABLE_WARNINGS'] = '1'
 
-class YFRateLimitError(Exception):
-    """yfinance API 제한 오류"""
-    pass
+# 기간별 조회 일수 (달력 기준)
+PERIOD_DAYS = {'6mo': 183, '1y': 365, '2y': 730}
 
-def fetch_stock_data(symbol, period='6mo', retry_count=1, delay=0.3, silent=True, timeout=8):
-    """주식 데이터 가져오기 - 직접 Yahoo Finance API 호출 (yfinance 우회)"""
-    import threading
-    
-    # period를 6개월로 단축
-    if period == '1y':
-        period = '6mo'
+def _chart_params(period):
+    """차트 API 요청 파라미터 (전체 범위)"""
+    return {
+        'interval': '1d',
+        'range': period if period in PERIOD_DAYS else '6mo',
+        'includePrePost': 'false',
+        'events': 'div,splits'
+    }
+
+def _incremental_params(last_ts, now):
+    """차트 API 요청 파라미터 (마지막 저장 봉 이후 구간만)"""
+    return {
+        'interval': '1d',
+        'period1': str(int(last_ts)),
+        'period2': str(int(max(now, last_ts + 86400))),
+        'includePrePost': 'false',
+        'events': 'div,splits'
+    }
+
+def _column(values, n):
+    """JSON 숫자 배열 → float64 배열 (null은 NaN, 길이가 다르면 n에 맞춤)"""
+    if values is None:
+        return np.full(n, np.nan)
+    if len(values) == n:
+        return np.array(values, dtype=np.float64)
+    column = np.full(n, np.nan)
+    m = min(n, len(values))
+    column[:m] = np.array(values[:m], dtype=np.float64)
+    return column
+
+def parse_chart_arrays(data, min_rows=20):
+    """차트 API JSON → (6, N) float64 배열 (행: 타임스탬프, 시가, 고가, 저가, 종가, 거래량)
+
+    행 단위 Python 객체 없이 컬럼별로 한 번에 변환합니다.
+    종가가 없거나 0 이하인 봉은 제외하고, 빠진 시가/고가/저가는 종가로, 거래량은 0으로 채웁니다.
+    유효한 봉이 min_rows 미만이면 None을 반환합니다.
+    """
+    result = data['chart']['result'][0]
+    timestamps = result.get('timestamp')
+    quote_list = result.get('indicators', {}).get('quote')
+    if not timestamps or not quote_list:
+        return None
+    quote = quote_list[0]
     
-    result_container = {'data': None, 'error': None, 'done': False}
+    n = len(timestamps)
+    ts = np.array(timestamps, dtype=np.float64)
+    close = _column(quote.get('close'), n)
+    # NaN 비교는 False이므로 null 종가도 함께 걸러짐
+    valid = close > 0
+    if int(valid.sum()) < min_rows:
+        return None
     
-    def fetch_direct_api():
-        """Yahoo Finance API 직접 호출"""
-        try:
-            # Yahoo Finance의 차트 API 직접 호출
-            url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
-            range_param = '6mo' if period == '6mo' else '1y'
-            
-            params = {
-                'interval': '1d',
-                'range': range_param,
-                'includePrePost': 'false',
-                'events': 'div,splits'
-            }
-            
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'application/json',
-                'Accept-Language': 'en-US,en;q=0.9',
-                'Referer': 'https://finance.yahoo.com/',
-                'Origin': 'https://finance.yahoo.com'
-            }
-            
-            response = requests.get(url, params=params, headers=headers, timeout=timeout)
-            
-            if response.status_code != 200:
-                if not silent and symbol in ['AAPL', 'MSFT', 'GOOGL']:  # 테스트 종목만 로그
-                    print(f"⚠️ {symbol}: HTTP {response.status_code}")
-                return None
-            
-            data = response.json()
-            
-            if 'chart' not in data or 'result' not in data['chart'] or len(data['chart']['result']) == 0:
-                if not silent and symbol in ['AAPL', 'MSFT', 'GOOGL']:
-                    print(f"⚠️ {symbol}: chart.result 없음")
-                return None
-            
-            result = data['chart']['result'][0]
-            
-            if 'timestamp' not in result or 'indicators' not in result:
-                if not silent and symbol in ['AAPL', 'MSFT', 'GOOGL']:
-                    print(f"⚠️ {symbol}: timestamp/indicators 없음")
-                return None
-            
-            timestamps = result.get('timestamp', [])
-            if not timestamps:
-                return None
-            
-            indicators = result.get('indicators', {})
-            quote_list = indicators.get('quote', [])
-            if not quote_list:
-                return None
-            
-            quote = quote_list[0]
-            
-            # 데이터 추출 및 None 값 처리
-            opens = quote.get('open', [])
-            highs = quote.get('high', [])
-            lows = quote.get('low', [])
-            closes = quote.get('close', [])
-            volumes = quote.get('volume', [])
-            
-            # 유효한 데이터만 필터링 (None이 아닌 값만)
-            valid_data = []
-            valid_timestamps = []
-            
-            for i, ts in enumerate(timestamps):
-                if i < len(closes) and closes[i] is not None and closes[i] > 0:
-                    valid_timestamps.append(ts)
-                    valid_data.append({
-                        'Open': opens[i] if i < len(opens) and opens[i] is not None else closes[i],
-                        'High': highs[i] if i < len(highs) and highs[i] is not None else closes[i],
-                        'Low': lows[i] if i < len(lows) and lows[i] is not None else closes[i],
-                        'Close': closes[i],
-                        'Volume': volumes[i] if i < len(volumes) and volumes[i] is not None else 0
-                    })
-            
-            if len(valid_data) < 20:
-                if not silent and symbol in ['AAPL', 'MSFT', 'GOOGL']:
-                    print(f"⚠️ {symbol}: 유효한 데이터 부족 ({len(valid_data)}개)")
-                return None
-            
-            # DataFrame 생성
-            try:
-                df = pd.DataFrame(valid_data, index=pd.to_datetime(valid_timestamps, unit='s'))
-            except Exception as e:
-                if not silent and symbol in ['AAPL', 'MSFT', 'GOOGL']:
-                    print(f"⚠️ {symbol}: DataFrame 생성 실패 - {str(e)}")
-                return None
-            
-            # 최종 검증
-            if df.empty or len(df) < 20:
-                if not silent and symbol in ['AAPL', 'MSFT', 'GOOGL']:
-                    print(f"⚠️ {symbol}: 최종 데이터 부족 ({len(df)}개)")
-                return None
-            
-            return df
-            
-        except Exception as e:
+    close = close[valid]
+    bars = np.empty((6, close.shape[0]), dtype=np.float64)
+    bars[0] = ts[valid]
+    for row, name in ((1, 'open'), (2, 'high'), (3, 'low')):
+        column = _column(quote.get(name), n)[valid]
+        bars[row] = np.where(np.isnan(column), close, column)
+    bars[4] = close
+    volume = _column(quote.get('volume'), n)[valid]
+    bars[5] = np.where(np.isnan(volume), 0.0, volume)
+    return bars
+
+def parse_chart_response(symbol, data, silent=True, min_rows=20):
+    """차트 API JSON을 DataFrame으로 변환 (min_rows 미만이면 None)"""
+    try:
+        if 'chart' not in data or 'result' not in data['chart'] or not data['chart']['result']:
             if not silent and symbol in ['AAPL', 'MSFT', 'GOOGL']:
-                print(f"❌ {symbol}: API 호출 오류 - {str(e)}")
+                print(f"⚠️ {symbol}: chart.result 없음")
             return None
+        
+        bars = parse_chart_arrays(data, min_rows)
+        if bars is None:
+            if not silent and symbol in ['AAPL', 'MSFT', 'GOOGL']:
+                print(f"⚠️ {symbol}: 유효한 데이터 부족")
+            return None
+        
+        df = bar_store.to_frame(bars)
+        df['Volume'] = bars[5].astype(np.int64)
+        return df
+
+    except Exception as e:
+        if not silent and symbol in ['AAPL', 'MSFT', 'GOOGL']:
+            print(f"❌ {symbol}: 응답 파싱 오류 - {str(e)}")
+        return None
+
+def _plan_request(symbol, period, now=None):
+    """저장소 상태에 따른 요청 계획 - (모드, 파라미터, 시작 타임스탬프)
+
+    모드:
+        'store'       - 최근 갱신됨, 요청 없이 저장소에서 읽기
+        'incremental' - 마지막 저장 봉 이후 구간만 요청
+        'full'        - 저장소에 해당 기간이 없어 전체 범위 요청
+        'reset'       - 액면분할 발생, 전체 범위 요청 후 저장소 교체
+    """
+    now = int(now or time.time())
+    start_ts = now - PERIOD_DAYS.get(period, PERIOD_DAYS['6mo']) * 86400
+    meta = bar_store.load_meta(symbol)
+    last_ts = bar_store.last_timestamp(symbol)
     
-    def fetch_in_thread():
-        """별도 스레드에서 데이터 가져오기"""
-        try:
-            # 방법 1: 직접 Yahoo Finance API 호출 (우선)
-            hist = fetch_direct_api()
-            if hist is not None and not hist.empty and len(hist) >= 20:
-                result_container['data'] = hist
-                result_container['done'] = True
-                return
-            
-            # 방법 2: yfinance fallback (매우 짧은 타임아웃)
+    if meta is None or last_ts is None or meta.get('covered_from', now) > start_ts:
+        return 'full', _chart_params(period), start_ts
+    
+    if now - meta.get('updated_at', 0) < config.BAR_STORE_FRESH_MINUTES * 60:
+        return 'store', None, start_ts
+    
+    # 마지막 봉은 장중 값일 수 있으므로 다시 받아서 교체
+    return 'incremental', _incremental_params(last_ts, now), start_ts
+
+def _has_splits(data):
+    """응답 구간에 액면분할이 있는지 (과거 봉 전체 재조정 필요)"""
+    try:
+        return bool(data['chart']['result'][0].get('events', {}).get('splits'))
+    except Exception:
+        return False
+
+def _apply_response(symbol, plan, status, data, silent=True):
+    """응답을 저장소에 반영하고 기간만큼 잘라 반환 - (DataFrame, 전체 재요청 필요 여부)"""
+    mode, params, start_ts = plan
+    
+    if status != 200 or data is None:
+        if not silent and symbol in ['AAPL', 'MSFT', 'GOOGL']:  # 테스트 종목만 로그
+            print(f"⚠️ {symbol}: HTTP {status}")
+        return None, False
+    
+    try:
+        if mode in ('full', 'reset'):
+            bars = parse_chart_arrays(data)
+            if bars is None:
+                return None, False
             try:
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(period=period, timeout=3, raise_errors=False)
-                if hist is not None and not hist.empty and len(hist) >= 20:
-                    result_container['data'] = hist
-                    result_container['done'] = True
-                    return
-            except Exception as e:
+                bar_store.write_array(symbol, bars, covered_from=start_ts, replace=(mode == 'reset'))
+            except Exception:
                 pass
-            
-            # 모두 실패
-            result_container['done'] = True
-            
-        except Exception as e:
-            result_container['error'] = e
-            result_container['done'] = True
-    
-    # 스레드에서 실행
-    thread = threading.Thread(target=fetch_in_thread, daemon=True)
-    thread.start()
-    thread.join(timeout=timeout + 2)
+            return bar_store.to_frame(bars), False
+        
+        # 증분 요청: 분할이 있으면 과거 봉이 모두 바뀌므로 전체 재요청
+        if _has_splits(data):
+            return None, True
+        
+        new_bars = parse_chart_arrays(data, min_rows=1)
+    except Exception as e:
+        if not silent and symbol in ['AAPL', 'MSFT', 'GOOGL']:
+            print(f"❌ {symbol}: 응답 파싱 오류 - {str(e)}")
+        return None, False
     
-    if not result_container['done']:
-        return None
+    try:
+        if new_bars is not None:
+            merged = bar_store.write_array(symbol, new_bars)
+            return bar_store.to_frame(bar_store.slice_from(merged, start_ts)), False
+        # 새 봉 없음 (주말/휴일) - 갱신 시각만 기록
+        bar_store.touch(symbol)
+    except Exception:
+        pass
+    return bar_store.read_bars(symbol, start_ts), False
+
+def _is_provider_failure(status):
+    """제공자 자체의 실패인지 (타임아웃, 연결 오류, 서버 오류) - 404 등은 데이터 없음"""
+    return status is None or status >= 500
+
+def _fetch_chart_api(symbols, period, timeout=8, silent=True):
+    """차트 API로 저장소에 부족한 구간만 요청 - FetchResult 반환
     
-    if result_container['error']:
-        return None
+    재시도 후에도 속도 제한(429/403) 응답을 받은 종목은 결과에서 빠집니다
+    (데이터 없음과 구분해 나중에 다시 수집할 수 있도록).
+    """
+    results = {}
+    failed = set()
+    pending = {}
+    for symbol in symbols:
+        plan = _plan_request(symbol, period)
+        if plan[0] == 'store':
+            results[symbol] = _validate_history(bar_store.read_bars(symbol, plan[2]))
+        else:
+            pending[symbol] = plan
     
-    hist = result_container['data']
+    # 증분 요청 중 분할이 발견된 종목은 한 번 더 전체 범위로 요청
+    for _ in range(2):
+        if not pending:
+            break
+        timings = {}
+        responses = async_fetcher.fetch_charts(
+            list(pending), None, timeout=timeout,
+            params_by_symbol={s: plan[1] for s, plan in pending.items()},
+            timings=timings
+        )
+        for symbol, seconds in timings.items():
+            providers.record_request(symbol, seconds)
+        retry = {}
+        for symbol, plan in pending.items():
+            status, data = responses.get(symbol, (None, None))
+            if status in rate_limiter.THROTTLE_STATUSES:
+                continue
+            if _is_provider_failure(status):
+                failed.add(symbol)
+                continue
+            hist, needs_full = _apply_response(symbol, plan, status, data, silent)
+            if needs_full:
+                retry[symbol] = ('reset', _chart_params(period), plan[2])
+                continue
+            results[symbol] = _validate_history(hist)
+        pending = retry
     
+    for symbol in pending:
+        results.setdefault(symbol, None)
+    return providers.FetchResult(results, failed)
+
+def _fetch_yfinance(symbol, period, timeout=5):
+    """yfinance 일봉 조회 - (DataFrame 또는 None, 요청 실패 여부)"""
+    try:
+        http_client.reset_last_status()
+        ticker = http_client.get_ticker(symbol)
+        hist = ticker.history(period=period, timeout=timeout, raise_errors=False)
+    except Exception:
+        return None, True
+    status = http_client.last_status()
+    if status in rate_limiter.THROTTLE_STATUSES:
+        raise YFRateLimitError(f"{symbol}: Yahoo 속도 제한")
+    if hist is None or hist.empty or len(hist) < 20:
+        # yfinance는 연결 오류를 빈 결과로 돌려주므로 마지막 응답 상태로 구분
+        return None, _is_provider_failure(status)
+    try:
+        start_ts = int(time.time()) - PERIOD_DAYS.get(period, PERIOD_DAYS['6mo']) * 86400
+        bar_store.write_bars(symbol, hist, covered_from=start_ts)
+    except Exception:
+        pass
+    return hist, False
+
+class ChartApiProvider(providers.Provider):
+    """Yahoo 차트 API 직접 호출 (일봉 저장소 + 비동기 엔진, 마감 시간 초과 시 요청 취소)"""
+    name = 'yahoo_chart'
+    priority = 0
+
+    def fetch(self, symbols, period, timeout):
+        return _fetch_chart_api(symbols, period, timeout=timeout)
+
+class YFinanceProvider(providers.Provider):
+    """yfinance Ticker.history (종목별 요청, 워커 수만큼 동시 실행)"""
+    name = 'yfinance'
+    priority = 1
+
+    @property
+    def chunk_size(self):
+        return max(config.MONITOR_WORKERS, 1)
+
+    def fetch(self, symbols, period, timeout):
+        results = {}
+        failed = set()
+
+        def _fetch(symbol):
+            started = time.perf_counter()
+            try:
+                return symbol, _fetch_yfinance(symbol, period, timeout=min(timeout, 5))
+            except YFRateLimitError:
+                return symbol, None
+            finally:
+                providers.record_request(symbol, time.perf_counter() - started)
+
+        workers = max(min(len(symbols), config.MONITOR_WORKERS), 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for symbol, outcome in executor.map(_fetch, symbols):
+                if outcome is None:
+                    continue  # 속도 제한 - 결과에서 제외
+                hist, is_failure = outcome
+                if is_failure:
+                    failed.add(symbol)
+                else:
+                    results[symbol] = _validate_history(hist)
+        return providers.FetchResult(results, failed)
+
+providers.register(ChartApiProvider())
+providers.register(YFinanceProvider())
+
+def _validate_history(hist):
+    """최소 데이터 포인트 및 유효한 가격 데이터 확인"""
     if hist is None or hist.empty:
         return None
     
@@ -184,32 +310,236 @@ def fetch_stock_data(symbol, period='6mo', retry_count=1, delay=0.3, silent=True
     
     return hist
 
-def get_current_price(symbol):
-    """현재 가격 가져오기 - 직접 API 호출"""
+# 동시에 들어온 같은 종목/기간 조회 합치기 + 짧은 결과 캐시
+_history_flight = singleflight.SingleFlight(ttl=config.HISTORY_CACHE_SECONDS)
+
+def _load_history(symbols, period, timeout):
+    """저장소 우선 조회 후 나머지는 제공자 레지스트리로 요청"""
+    results = {}
+    pending = []
+    for symbol in symbols:
+        plan = _plan_request(symbol, period)
+        if plan[0] == 'store':
+            results[symbol] = _validate_history(bar_store.read_bars(symbol, plan[2]))
+        else:
+            pending.append(symbol)
+    
+    if pending:
+        fetched = providers.fetch_history(pending, period, timeout=timeout)
+        results.update({symbol: _validate_history(hist) for symbol, hist in fetched.items()})
+    return results
+
+def fetch_history(symbols, period='6mo', timeout=8):
+    """여러 종목 일봉 조회 - {symbol: DataFrame 또는 None}
+    
+    최근 갱신된 종목은 저장소에서 바로 읽고, 나머지는 제공자 레지스트리를 통해
+    가장 건강한 제공자부터 요청합니다. 속도 제한으로 받지 못한 종목은 결과에서 빠집니다.
+    
+    다른 스레드(스캔, 대시보드 요청)가 같은 종목/기간을 조회 중이면 새로 요청하지 않고
+    그 결과를 기다려 공유하며, 받은 결과는 HISTORY_CACHE_SECONDS 동안 재사용합니다.
+    반환된 DataFrame은 공유되므로 수정하지 말아야 합니다.
+    """
+    keys = [(symbol, period) for symbol in dict.fromkeys(symbols)]
+    cached, leading, waiting = _history_flight.claim(keys)
+    results = {symbol: value for (symbol, _), value in cached.items()}
+    
+    if leading:
+        try:
+            loaded = _load_history([symbol for symbol, _ in leading], period, timeout)
+        except Exception as e:
+            for key in leading:
+                _history_flight.fail(key, e)
+            raise
+        for key in leading:
+            value = loaded.get(key[0], singleflight.MISSING)
+            # 데이터 없음(None)은 기다리던 요청에만 전달하고 캐시하지 않음
+            _history_flight.resolve(key, value, cache=value is not None)
+            if value is not singleflight.MISSING:
+                results[key[0]] = value
+    
+    for (symbol, _), call in waiting.items():
+        try:
+            value = call.wait()
+        except Exception:
+            continue
+        if value is not singleflight.MISSING:
+            results[symbol] = value
+    return results
+
+def read_stored_history(symbols, period='6mo'):
+    """저장소에 기간 전체가 있는 종목의 일봉을 요청 없이 읽기 - {symbol: DataFrame} (없거나 부족한 종목은 빠짐)
+
+    최신 봉 확인(probe_latest)으로 바뀌지 않은 것을 확인한 종목에 사용합니다.
+    """
+    start_ts = int(time.time()) - PERIOD_DAYS.get(period, PERIOD_DAYS['6mo']) * 86400
+    results = {}
+    for symbol in symbols:
+        meta = bar_store.load_meta(symbol)
+        if meta is None or meta.get('covered_from', start_ts + 1) > start_ts:
+            continue
+        frame = _validate_history(bar_store.read_bars(symbol, start_ts))
+        if frame is not None:
+            results[symbol] = frame
+    return results
+
+def get_history_cache_metrics():
+    """일봉 조회 합치기/캐시 지표"""
+    return _history_flight.get_metrics()
+
+def fetch_stock_data(symbol, period='6mo', retry_count=1, delay=0.3, silent=True, timeout=8):
+    """주식 데이터 가져오기 - 저장소 우선, 가장 건강한 제공자부터 요청
+    
+    일봉은 로컬 저장소(bar_store)에서 읽고, 저장소에 없는 구간만 요청합니다.
+    요청이 속도 제한(429/403) 응답을 받아 결과가 없으면 YFRateLimitError를 발생시키고,
+    그 밖에 받지 못한 경우(제공자 실패, 함께 기다리던 요청 실패)는 None을 반환합니다.
+    """
+    limiter = rate_limiter.get_limiter()
+    throttled_before = limiter.throttled_responses
+    results = fetch_history([symbol], period, timeout=timeout)
+    if symbol not in results:
+        if limiter.throttled_responses > throttled_before:
+            raise YFRateLimitError(f"{symbol}: Yahoo 속도 제한")
+        return None
+    return results[symbol]
+
+def fetch_stock_data_batch(symbols, period='6mo', timeout=8):
+    """여러 종목 데이터 일괄 수집 (저장소 우선, 부족한 구간만 제공자 레지스트리로 요청)
+    
+    실패한 종목은 None, 속도 제한으로 받지 못한 종목은 결과에서 빠집니다.
+    """
+    return fetch_history(symbols, period, timeout=timeout)
+
+def get_provider_metrics():
+    """데이터 제공자별 상태 지표"""
+    return providers.get_metrics()
+
+QUOTE_PATH = '/v7/finance/quote'
+
+def _parse_quote(quote):
+    """v7 quote 응답 항목 → 가격/기본 정보"""
+    price = quote.get('regularMarketPrice') or quote.get('regularMarketPreviousClose')
+    if price is None:
+        return None
+    return {
+        'price': price,
+        'previousClose': quote.get('regularMarketPreviousClose'),
+        'change_percent': quote.get('regularMarketChangePercent'),
+        'volume': quote.get('regularMarketVolume'),
+        'marketCap': quote.get('marketCap'),
+        'currency': quote.get('currency'),
+        'name': quote.get('longName') or quote.get('shortName'),
+        'market_time': quote.get('regularMarketTime')
+    }
+
+def _parse_chart_meta(data):
+    """차트 응답 meta → 가격/기본 정보 (quote 응답에 없는 종목용)"""
     try:
-        # 직접 Yahoo Finance API 호출
-        url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
-        params = {'interval': '1d', 'range': '1d'}
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'application/json'
-        }
-        
-        response = requests.get(url, params=params, headers=headers, timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            if 'chart' in data and 'result' in data['chart'] and len(data['chart']['result']) > 0:
-                result = data['chart']['result'][0]
-                if 'meta' in result:
-                    return result['meta'].get('regularMarketPrice') or result['meta'].get('previousClose')
-    except:
-        pass
+        meta = data['chart']['result'][0]['meta']
+    except (KeyError, IndexError, TypeError):
+        return None
+    price = meta.get('regularMarketPrice') or meta.get('previousClose')
+    if price is None:
+        return None
+    previous = meta.get('chartPreviousClose') or meta.get('previousClose')
+    return {
+        'price': price,
+        'previousClose': previous,
+        'change_percent': (price - previous) / previous * 100 if previous else None,
+        'volume': meta.get('regularMarketVolume'),
+        'marketCap': meta.get('marketCap'),
+        'currency': meta.get('currency'),
+        'name': meta.get('longName') or meta.get('shortName'),
+        'market_time': meta.get('regularMarketTime')
+    }
+
+def _fetch_quotes(symbols, timeout, failed=None):
+    """v7 quote API 일괄 조회 (QUOTE_BATCH_SIZE개씩, 묶음끼리 동시 실행) - {symbol: _parse_quote 결과}
+
+    v7 quote는 crumb가 필요하므로 공유 crumb와 쿠키를 붙이고, 401이면 crumb를 새로 받아 그 묶음만 1회 재시도합니다.
+    failed(리스트)를 넘기면 재시도 후에도 200이 아닌 묶음의 종목을 추가합니다.
+    """
+    size = max(config.QUOTE_BATCH_SIZE, 1)
+    chunks = {i: ','.join(symbols[i:i + size]) for i in range(0, len(symbols), size)}
+    crumb, cookies = http_client.yahoo_crumb()
+    responses = _request_quotes(chunks, crumb, cookies, timeout)
+    rejected = {i: chunks[i] for i, (status, _) in responses.items() if status == 401}
+    if rejected:
+        crumb, cookies = http_client.yahoo_crumb(stale=crumb)
+        responses.update(_request_quotes(rejected, crumb, cookies, timeout))
+
+    wanted = set(symbols)
+    prices = {}
+    for i, (status, data) in responses.items():
+        if status != 200 or not data:
+            if failed is not None:
+                failed.extend(chunks[i].split(','))
+            continue
+        try:
+            results = data['quoteResponse']['result'] or []
+        except (KeyError, TypeError):
+            continue
+        for quote in results:
+            symbol = (quote.get('symbol') or '').upper()
+            parsed = _parse_quote(quote)
+            if symbol in wanted and parsed:
+                prices[symbol] = parsed
+    return prices
+
+def _request_quotes(chunks, crumb, cookies, timeout):
+    """{묶음 번호: 쉼표로 이은 종목} → {묶음 번호: (상태 코드, JSON)}"""
+    requests = {
+        i: (QUOTE_PATH, {'symbols': joined, **({'crumb': crumb} if crumb else {})})
+        for i, joined in chunks.items()
+    }
+    return async_fetcher.fetch_many(requests, timeout=timeout, cookies=cookies)
+
+def get_current_prices(symbols, timeout=8):
+    """여러 종목 현재가 일괄 조회 - {symbol: {'price', 'previousClose', ...}} 반환
+
+    QUOTE_BATCH_SIZE개씩 묶어 v7 quote API로 요청하고(묶음끼리는 동시 실행),
+    quote 응답에 없는 종목만 차트 API meta로 보충합니다. 조회 실패 종목은 결과에서 빠집니다.
+    """
+    symbols = list(dict.fromkeys(s.upper() for s in symbols if s))
+    if not symbols:
+        return {}
+    prices = _fetch_quotes(symbols, timeout)
+
+    # quote 응답에서 빠진 종목 → 차트 API meta (동시 요청)
+    missing = [s for s in symbols if s not in prices]
+    if missing:
+        responses = async_fetcher.fetch_charts(missing, {'interval': '1d', 'range': '1d'}, timeout=timeout)
+        for symbol, (status, data) in responses.items():
+            parsed = _parse_chart_meta(data) if status == 200 and data else None
+            if parsed:
+                prices[symbol] = parsed
+
+    return prices
+
+def probe_latest(symbols, timeout=8, failed=None):
+    """최신 봉 확인용 가벼운 조회 - {symbol: (시장 시각, 가격, 거래량)}
+
+    v7 quote 응답만 사용합니다 (종목당 차트 요청 없음, QUOTE_BATCH_SIZE개당 요청 1회).
+    응답에 없거나 시장 시각이 없는 종목은 결과에서 빠지고, 요청 자체가 실패한 종목은 failed(리스트)에 추가됩니다.
+    """
+    symbols = list(dict.fromkeys(s.upper() for s in symbols if s))
+    if not symbols:
+        return {}
+    return {
+        symbol: (quote['market_time'], quote['price'], quote['volume'])
+        for symbol, quote in _fetch_quotes(symbols, timeout, failed).items()
+        if quote.get('market_time') is not None
+    }
+
+def get_current_price(symbol):
+    """현재 가격 가져오기 - 일괄 조회 API 사용"""
+    quote = get_current_prices([symbol], timeout=5).get(symbol.upper())
+    if quote:
+        return quote['price']
     
     # Fallback: yfinance
     try:
-        ticker = yf.Ticker(symbol)
+        ticker = http_client.get_ticker(symbol)
         info = ticker.info
         return info.get('currentPrice') or info.get('regularMarketPrice')
     except:
         return None
-
@@ -2,6 +2,13 @@
 import sqlite3
 import json
 from datetime import datetime
+import config
+
+def _json_value(value):
+    """JSON으로 바로 저장되지 않는 값 (NumPy 정수·실수 등) 변환"""
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
 
 class Database:
     def __init__(self, db_path='scans.db'):
@@ -63,6 +70,96 @@ class Database:
             )
         ''')
         
+        # 스캔 실행별 상대강도 등급 (RS Rating, 전체 종목 - 최근 RS_RATINGS_KEEP_SCANS회만 보관)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS rs_ratings (
+                run_id INTEGER NOT NULL,
+                symbol TEXT NOT NULL,
+                rating INTEGER NOT NULL,
+                weighted_return REAL,
+                PRIMARY KEY (run_id, symbol),
+                FOREIGN KEY (run_id) REFERENCES scan_runs(id)
+            )
+        ''')
+        
+        # 스캔 실행별 시장 국면 (CAN SLIM M)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS market_regimes (
+                run_id INTEGER PRIMARY KEY,
+                status TEXT NOT NULL,
+                distribution_days INTEGER,
+                detail TEXT,
+                computed_at TEXT,
+                FOREIGN KEY (run_id) REFERENCES scan_runs(id)
+            )
+        ''')
+        
+        # 종목별 기술적 지표 스트리밍 상태 (indicator_state, 최신 상태만 보관)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS indicator_states (
+                symbol TEXT PRIMARY KEY,
+                bar_date TEXT,
+                state TEXT NOT NULL,
+                scan_id INTEGER,
+                updated_at TEXT
+            )
+        ''')
+        
+        # 종목별 스캔 우선순위 기록 (priority.PriorityScheduler - 재시작 후에도 등급별 수집 주기 유지, 시각은 epoch 초)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scan_priorities (
+                symbol TEXT PRIMARY KEY,
+                score REAL,
+                previous_score REAL,
+                liquidity REAL,
+                scanned_at REAL,
+                fetched_at REAL
+            )
+        ''')
+        
+        # 스캔 진행 기록 (중단된 스캔 재개용 - status: running, completed, partial, abandoned)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scan_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                started_at TEXT NOT NULL,
+                status TEXT NOT NULL,
+                symbols TEXT NOT NULL,
+                finished_at TEXT
+            )
+        ''')
+        
+        # 스캔 체크포인트 (완료된 종목의 결과 - 신호 대상이 아니면 signal은 NULL, 스캔이 끝나면 삭제)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scan_checkpoints (
+                run_id INTEGER NOT NULL,
+                symbol TEXT NOT NULL,
+                score REAL,
+                signal TEXT,
+                checkpointed_at TEXT,
+                PRIMARY KEY (run_id, symbol)
+            )
+        ''')
+        
+        # 스캔 측정 요약 (스캔 1회당 1행 - stages/outcomes/detail은 JSON)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scan_metrics (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id INTEGER,
+                scan_id INTEGER,
+                finished_at TEXT NOT NULL,
+                status TEXT,
+                symbols INTEGER,
+                completed INTEGER,
+                elapsed REAL,
+                throughput REAL,
+                time_to_first_signal REAL,
+                dominant_stage TEXT,
+                stages TEXT,
+                outcomes TEXT,
+                detail TEXT
+            )
+        ''')
+        
         # 인덱스 추가 (조회 성능 향상)
         cursor.execute('''
             CREATE INDEX IF NOT EXISTS idx_daily_prices_symbol_date 
@@ -78,9 +175,9 @@ class Database:
         conn.close()
     
     def save_scan(self, signals):
-        """스캔 결과 저장 및 일일 가격 저장"""
+        """스캔 결과 저장 및 일일 가격 저장 - 스캔 ID 반환 (신호가 없으면 저장하지 않고 None)"""
         if not signals:
-            return
+            return None
         
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
@@ -123,6 +220,302 @@ class Database:
         
         conn.commit()
         conn.close()
+        return scan_id
+    
+    def save_scan_context(self, run_id, rs_ratings=None, regime=None, keep=None):
+        """스캔 실행의 상대강도 등급·시장 국면 저장 (scan_runs 기준 - 신호 기록(scans)은 만들지 않음)
+        
+        rs_ratings: 스캔 전체 상대강도 등급 [(종목, 등급, 가중 수익률), ...]
+        regime: 스캔 시작 시 계산한 시장 국면 (market_regime.to_dict 결과)
+        keep: 상대강도 등급을 보관할 최근 스캔 수 (기본 RS_RATINGS_KEEP_SCANS, 오래된 등급은 삭제)
+        """
+        keep = config.RS_RATINGS_KEEP_SCANS if keep is None else keep
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        # 상대강도 등급 저장
+        if rs_ratings:
+            cursor.executemany('''
+                INSERT OR REPLACE INTO rs_ratings (run_id, symbol, rating, weighted_return)
+                VALUES (?, ?, ?, ?)
+            ''', [(run_id, symbol, rating, weighted_return) for symbol, rating, weighted_return in rs_ratings])
+            cursor.execute('''
+                DELETE FROM rs_ratings WHERE run_id NOT IN (
+                    SELECT DISTINCT run_id FROM rs_ratings ORDER BY run_id DESC LIMIT ?
+                )
+            ''', (max(keep, 1),))
+        
+        # 시장 국면 저장
+        if regime:
+            cursor.execute('''
+                INSERT OR REPLACE INTO market_regimes (run_id, status, distribution_days, detail, computed_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (run_id, regime['status'], regime['distribution_days'],
+                  json.dumps(regime, ensure_ascii=False), regime.get('computed_at')))
+        
+        conn.commit()
+        conn.close()
+    
+    def save_daily_prices(self, prices, scores=None):
+        """일일 가격 일괄 저장 - prices: {symbol: 가격}, scores: {symbol: 점수}"""
+        if not prices:
+            return
+        
+        scores = scores or {}
+        price_date = datetime.now().strftime('%Y-%m-%d')
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        # 같은 날짜는 최신 가격으로 업데이트 (점수는 없으면 기존 값 유지)
+        cursor.executemany('''
+            INSERT INTO daily_prices (symbol, price_date, price, score)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(symbol, price_date) DO UPDATE SET
+                price = excluded.price,
+                score = COALESCE(excluded.score, daily_prices.score)
+        ''', [(symbol, price_date, price, scores.get(symbol)) for symbol, price in prices.items()])
+        
+        conn.commit()
+        conn.close()
+    
+    def get_rs_ratings(self, run_id=None, weighted_returns=False):
+        """스캔 실행별 상대강도 등급 - {종목: 등급} (run_id가 없으면 가장 최근 스캔)
+
+        weighted_returns=True이면 {종목: 가중 수익률} (재시작 후 다음 스캔의 등급 분포로 사용)
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        if run_id is None:
+            cursor.execute('SELECT MAX(run_id) FROM rs_ratings')
+            run_id = cursor.fetchone()[0]
+        
+        cursor.execute(f'''
+            SELECT symbol, {'weighted_return' if weighted_returns else 'rating'} FROM rs_ratings WHERE run_id = ?
+        ''', (run_id,))
+        
+        results = cursor.fetchall()
+        conn.close()
+        
+        return {symbol: value for symbol, value in results}
+    
+    def get_market_regime(self, run_id=None):
+        """스캔 실행별 시장 국면 딕셔너리 (run_id가 없으면 가장 최근 스캔, 없으면 None)"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        if run_id is None:
+            cursor.execute('SELECT detail FROM market_regimes ORDER BY run_id DESC LIMIT 1')
+        else:
+            cursor.execute('SELECT detail FROM market_regimes WHERE run_id = ?', (run_id,))
+        
+        row = cursor.fetchone()
+        conn.close()
+        
+        return json.loads(row[0]) if row and row[0] else None
+    
+    def save_indicator_states(self, states, scan_id=None):
+        """기술적 지표 상태 저장 (종목별 최신 상태로 교체) - states: {종목: IndicatorState.to_dict()}"""
+        if not states:
+            return
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        updated_at = datetime.now().isoformat()
+        cursor.executemany('''
+            INSERT OR REPLACE INTO indicator_states (symbol, bar_date, state, scan_id, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [(symbol, state.get('date'), json.dumps(state), scan_id, updated_at) for symbol, state in states.items()])
+        
+        conn.commit()
+        conn.close()
+    
+    def get_indicator_states(self):
+        """저장된 기술적 지표 상태 - {종목: 상태 딕셔너리}"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT symbol, state FROM indicator_states')
+        results = cursor.fetchall()
+        conn.close()
+        
+        return {symbol: json.loads(state) for symbol, state in results}
+    
+    def save_scan_priorities(self, rows):
+        """스캔 우선순위 기록 저장 (종목별 최신 기록으로 교체) - rows: [(종목, 점수, 이전 점수, 유동성, 스캔 시각, 수집 시각), ...]"""
+        if not rows:
+            return
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.executemany('''
+            INSERT OR REPLACE INTO scan_priorities (symbol, score, previous_score, liquidity, scanned_at, fetched_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', rows)
+        
+        conn.commit()
+        conn.close()
+    
+    def get_scan_priorities(self):
+        """저장된 스캔 우선순위 기록 - [(종목, 점수, 이전 점수, 유동성, 스캔 시각, 수집 시각), ...]"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT symbol, score, previous_score, liquidity, scanned_at, fetched_at FROM scan_priorities
+        ''')
+        results = cursor.fetchall()
+        conn.close()
+        
+        return results
+    
+    def start_scan_run(self, symbols):
+        """스캔 진행 기록 시작 - 실행 ID 반환 (이전에 끝나지 않은 스캔은 abandoned로 정리)"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        now = datetime.now().isoformat()
+        cursor.execute('''
+            DELETE FROM scan_checkpoints WHERE run_id IN (SELECT id FROM scan_runs WHERE status = 'running')
+        ''')
+        cursor.execute('''
+            UPDATE scan_runs SET status = 'abandoned', finished_at = ? WHERE status = 'running'
+        ''', (now,))
+        cursor.execute('''
+            INSERT INTO scan_runs (started_at, status, symbols) VALUES (?, 'running', ?)
+        ''', (now, json.dumps(list(symbols))))
+        run_id = cursor.lastrowid
+        
+        conn.commit()
+        conn.close()
+        return run_id
+    
+    def save_scan_checkpoint(self, run_id, rows):
+        """완료된 종목 결과 저장 (한 트랜잭션) - rows: [(종목, 총점 또는 None, 신호 딕셔너리 또는 None), ...]"""
+        if not rows:
+            return
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        now = datetime.now().isoformat()
+        cursor.executemany('''
+            INSERT OR REPLACE INTO scan_checkpoints (run_id, symbol, score, signal, checkpointed_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [
+            (run_id, symbol, None if score is None else float(score),
+             None if signal is None else json.dumps(signal, ensure_ascii=False, default=_json_value), now)
+            for symbol, score, signal in rows
+        ])
+        
+        conn.commit()
+        conn.close()
+    
+    def finish_scan_run(self, run_id, status='completed'):
+        """스캔 진행 기록 종료 (체크포인트 삭제)"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('DELETE FROM scan_checkpoints WHERE run_id = ?', (run_id,))
+        cursor.execute('''
+            UPDATE scan_runs SET status = ?, finished_at = ? WHERE id = ?
+        ''', (status, datetime.now().isoformat(), run_id))
+        
+        conn.commit()
+        conn.close()
+    
+    def get_interrupted_scan(self):
+        """끝나지 않은 마지막 스캔 - {'id', 'started_at', 'symbols', 'results': {종목: 신호 또는 None}} (없으면 None)"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT id, started_at, symbols FROM scan_runs WHERE status = 'running' ORDER BY id DESC LIMIT 1
+        ''')
+        run = cursor.fetchone()
+        if run is None:
+            conn.close()
+            return None
+        
+        cursor.execute('SELECT symbol, signal FROM scan_checkpoints WHERE run_id = ?', (run[0],))
+        results = cursor.fetchall()
+        conn.close()
+        
+        return {
+            'id': run[0],
+            'started_at': run[1],
+            'symbols': json.loads(run[2]),
+            'results': {symbol: json.loads(signal) if signal else None for symbol, signal in results}
+        }
+    
+    def save_scan_metrics(self, metrics, scan_id=None):
+        """스캔 측정 요약 저장 - metrics: StockMonitor.last_scan_metrics"""
+        summary = metrics.get('telemetry') or {}
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            INSERT INTO scan_metrics (run_id, scan_id, finished_at, status, symbols, completed, elapsed, throughput,
+                                      time_to_first_signal, dominant_stage, stages, outcomes, detail)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            metrics.get('run_id'),
+            scan_id,
+            datetime.now().isoformat(),
+            metrics.get('status'),
+            metrics.get('symbols'),
+            metrics.get('completed'),
+            metrics.get('elapsed'),
+            metrics.get('throughput'),
+            metrics.get('time_to_first_signal'),
+            summary.get('dominant_stage'),
+            json.dumps(summary.get('stages', {})),
+            json.dumps(summary.get('outcomes', {})),
+            json.dumps({k: v for k, v in metrics.items() if k != 'telemetry'}, ensure_ascii=False, default=_json_value)
+        ))
+        metrics_id = cursor.lastrowid
+        
+        conn.commit()
+        conn.close()
+        return metrics_id
+    
+    def get_scan_metrics(self, limit=50):
+        """최근 스캔 측정 요약 (최신 순)"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT id, run_id, scan_id, finished_at, status, symbols, completed, elapsed, throughput,
+                   time_to_first_signal, dominant_stage, stages, outcomes, detail
+            FROM scan_metrics
+            ORDER BY id DESC
+            LIMIT ?
+        ''', (limit,))
+        
+        results = cursor.fetchall()
+        conn.close()
+        
+        return [{
+            'id': row[0],
+            'run_id': row[1],
+            'scan_id': row[2],
+            'finished_at': row[3],
+            'status': row[4],
+            'symbols': row[5],
+            'completed': row[6],
+            'elapsed': row[7],
+            'throughput': row[8],
+            'time_to_first_signal': row[9],
+            'dominant_stage': row[10],
+            'stages': json.loads(row[11]) if row[11] else {},
+            'outcomes': json.loads(row[12]) if row[12] else {},
+            'detail': json.loads(row[13]) if row[13] else {}
+        } for row in results]
     
     def get_all_scans(self, limit=50):
         """모든 스캔 결과 가져오기"""
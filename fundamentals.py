@@ -0,0 +1,257 @@
+"""재무 지표 캐시 - 종목당 1회 조회 후 SQLite에 보관 (CAN SLIM / 가치투자 점수 공용)
+
+재무 지표는 분기 실적 발표 때만 바뀌므로, 마지막 분기(mostRecentQuarter)로 다음 실적 발표 시기를 추정해
+- 발표 전까지는 최대 FUNDAMENTALS_TTL_DAYS일 동안 다시 요청하지 않고
+- 발표 예상 구간에 들어가면 하루마다 새 분기 반영 여부를 확인합니다.
+현재가, 거래량, 52주 고가/저가처럼 매일 바뀌는 값은 일봉(price_data)이 주어지면 일봉 기준으로 바꿔서 돌려줍니다.
+"""
+import os
+import json
+import time
+import sqlite3
+import threading
+import numpy as np
+import config
+import http_client
+import singleflight
+from rate_limiter import THROTTLE_STATUSES, YFRateLimitError
+
+QUOTE_SUMMARY_PATH = '/v10/finance/quoteSummary'  # crumb 필요 (http_client.yahoo_get_with_crumb)
+QUOTE_SUMMARY_MODULES = 'financialData,quoteType,defaultKeyStatistics,assetProfile,summaryDetail'
+
+# 실적 발표 시기 추정 (분기 종료 후 일수)
+QUARTER_DAYS = 91
+EARNINGS_WINDOW_START_DAYS = 20
+EARNINGS_WINDOW_END_DAYS = 50
+
+# 보관 기간 (일) - 분기 정보가 없을 때, 실적 발표 구간일 때, 종목이 없을 때
+DEFAULT_TTL_DAYS = 7
+EARNINGS_TTL_DAYS = 1
+MISSING_TTL_DAYS = 1
+
+DAY = 86400
+
+_local = threading.local()
+_flight = singleflight.SingleFlight(ttl=0)  # 동시 요청 합치기만 (결과는 SQLite에 보관)
+_metrics_lock = threading.Lock()
+_metrics = {'cache_hits': 0, 'fetches': 0, 'not_found': 0, 'failures': 0, 'last_failure_status': None}
+
+def _count(name):
+    with _metrics_lock:
+        _metrics[name] += 1
+
+def _fail(status):
+    """캐시하지 않는 실패 기록 (status: 응답 상태 코드, 연결 오류·타임아웃이면 None)"""
+    with _metrics_lock:
+        _metrics['failures'] += 1
+        _metrics['last_failure_status'] = status
+    return None, False
+
+def _not_found(response):
+    """응답 본문에 quoteSummary 'Not Found' 오류가 있는지 (종목 없음 - 캐시 대상)"""
+    try:
+        error = response.json()['quoteSummary']['error'] or {}
+    except (ValueError, KeyError, TypeError):
+        return False
+    return error.get('code') == 'Not Found'
+
+def _connect():
+    """현재 스레드의 DB 연결 (경로가 바뀌면 다시 연결)"""
+    path = config.FUNDAMENTALS_DB
+    conn = getattr(_local, 'conn', None)
+    if conn is not None and _local.path == path:
+        return conn
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS fundamentals (
+            symbol TEXT PRIMARY KEY,
+            info TEXT,
+            fetched_at REAL NOT NULL,
+            expires_at REAL NOT NULL
+        )
+    ''')
+    conn.commit()
+    _local.conn, _local.path = conn, path
+    return conn
+
+def _load(symbol, now):
+    """유효한 캐시 - (찾음 여부, info 또는 None(종목 없음))"""
+    row = _connect().execute(
+        'SELECT info, expires_at FROM fundamentals WHERE symbol = ?', (symbol,)
+    ).fetchone()
+    if row is None or row[1] <= now:
+        return False, None
+    return True, json.loads(row[0]) if row[0] else None
+
+def _save(symbol, info, now, expires_at):
+    conn = _connect()
+    conn.execute(
+        'INSERT OR REPLACE INTO fundamentals (symbol, info, fetched_at, expires_at) VALUES (?, ?, ?, ?)',
+        (symbol, json.dumps(info) if info is not None else None, now, expires_at)
+    )
+    conn.commit()
+
+def expires_at(info, now=None):
+    """다음 실적 발표 시기를 고려한 만료 시각"""
+    now = now or time.time()
+    max_ttl = config.FUNDAMENTALS_TTL_DAYS * DAY
+    if info is None:
+        return now + MISSING_TTL_DAYS * DAY
+
+    # 발표일이 알려져 있으면 그 날짜, 아니면 마지막 분기 종료일로 추정
+    announced = info.get('earningsTimestampStart') or info.get('earningsTimestamp')
+    quarter_end = info.get('mostRecentQuarter')
+    if announced and announced > now:
+        window_start, window_end = announced, announced + DAY
+    elif quarter_end:
+        next_quarter_end = quarter_end + QUARTER_DAYS * DAY
+        window_start = next_quarter_end + EARNINGS_WINDOW_START_DAYS * DAY
+        window_end = next_quarter_end + EARNINGS_WINDOW_END_DAYS * DAY
+    else:
+        return now + min(DEFAULT_TTL_DAYS * DAY, max_ttl)
+
+    if now < window_start:
+        return min(window_start, now + max_ttl)
+    if now < window_end:
+        # 발표 예상 구간 - 새 분기가 반영될 때까지 매일 확인
+        return now + EARNINGS_TTL_DAYS * DAY
+    # 예상 구간이 지났는데도 분기가 바뀌지 않음 (발표 지연 등)
+    return now + min(DEFAULT_TTL_DAYS * DAY, max_ttl)
+
+def _format(value):
+    """quoteSummary 값 정리 ({raw, fmt} → raw) - yfinance ticker.info와 같은 형식"""
+    if isinstance(value, dict):
+        if 'raw' in value:
+            return value['raw']
+        return {k: _format(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_format(v) for v in value]
+    if isinstance(value, str):
+        return value.replace('\xa0', ' ')
+    return value
+
+def _flatten(result):
+    """quoteSummary 모듈별 결과 → 하나의 info 딕셔너리 (빈 값 제외)"""
+    info = {}
+    for module in result.values():
+        if not isinstance(module, dict):
+            continue
+        for key, value in module.items():
+            value = _format(value)
+            if value not in (None, {}, [], ''):
+                info[key] = value
+    return info
+
+def _fetch(symbol, timeout):
+    """quoteSummary 1회 요청 - (info 또는 None(종목 없음), 캐시 여부)
+
+    종목 없음은 응답 본문의 quoteSummary 'Not Found' 오류로만 판단합니다
+    (엔드포인트 변경·인증 실패 등 그 밖의 404/401은 실패로 보고 캐시하지 않음).
+    """
+    _count('fetches')
+    try:
+        response = http_client.yahoo_get_with_crumb(
+            f"{QUOTE_SUMMARY_PATH}/{symbol}",
+            params={'modules': QUOTE_SUMMARY_MODULES},
+            timeout=timeout
+        )
+    except Exception:
+        return _fail(None)
+
+    if response.status_code in THROTTLE_STATUSES:
+        _fail(response.status_code)
+        raise YFRateLimitError(f"{symbol}: 재무 지표 요청 속도 제한")
+    if _not_found(response):
+        _count('not_found')
+        return None, True
+    if response.status_code != 200:
+        return _fail(response.status_code)
+
+    try:
+        results = response.json()['quoteSummary']['result'] or []
+    except (ValueError, KeyError, TypeError):
+        return _fail(response.status_code)
+    if not results:
+        return _fail(response.status_code)
+    info = _flatten(results[0])
+    info.setdefault('symbol', symbol)
+    return info, True
+
+def _get_cached_or_fetch(symbol, timeout):
+    now = time.time()
+    found, info = _load(symbol, now)
+    if found:
+        _count('cache_hits')
+        return info
+    info, cacheable = _fetch(symbol, timeout)
+    if cacheable:
+        _save(symbol, info, now, expires_at(info, now))
+    return info
+
+def _with_prices(info, price_data):
+    """매일 바뀌는 값을 일봉 기준으로 교체 (캐시된 info는 수정하지 않음)"""
+    try:
+        close = float(price_data['Close'].iloc[-1])
+        volume = price_data['Volume']
+    except Exception:
+        return info
+    info = dict(info)
+    cached_price = info.get('currentPrice') or info.get('regularMarketPrice')
+    if cached_price and info.get('marketCap'):
+        info['marketCap'] = int(info['marketCap'] * close / cached_price)
+    info['currentPrice'] = close
+    info['volume'] = int(volume.iloc[-1])
+    if len(volume) >= 63:
+        info['averageVolume'] = int(volume.iloc[-63:].mean())  # 3개월 평균 (Yahoo averageVolume과 같은 기준)
+
+    # 52주 고가/저가 - 1년치가 없으면 캐시 값과 최근 일봉 중 극값
+    high = float(np.nanmax(price_data['High'].to_numpy(dtype=np.float64)[-252:]))
+    low = float(np.nanmin(price_data['Low'].to_numpy(dtype=np.float64)[-252:]))
+    if len(price_data) >= 252:
+        info['fiftyTwoWeekHigh'], info['fiftyTwoWeekLow'] = high, low
+    else:
+        info['fiftyTwoWeekHigh'] = max(info.get('fiftyTwoWeekHigh') or high, high)
+        info['fiftyTwoWeekLow'] = min(info.get('fiftyTwoWeekLow') or low, low)
+    return info
+
+def get_info(symbol, price_data=None, timeout=8):
+    """재무 지표 (yfinance ticker.info 형식) - 캐시가 만료된 종목만 요청, 없으면 None
+
+    price_data(일봉 DataFrame)가 주어지면 현재가·거래량·52주 고가/저가를 일봉 기준으로 바꿉니다.
+    속도 제한 시 YFRateLimitError 발생 (캐시하지 않음).
+    """
+    symbol = symbol.upper().strip()
+    info = _flight.do(symbol, _get_cached_or_fetch, symbol, timeout)
+    if info is None:
+        return None
+    if price_data is not None and not price_data.empty:
+        return _with_prices(info, price_data)
+    return info
+
+def invalidate(symbol=None):
+    """캐시 삭제 (symbol이 없으면 전체)"""
+    conn = _connect()
+    if symbol is None:
+        conn.execute('DELETE FROM fundamentals')
+    else:
+        conn.execute('DELETE FROM fundamentals WHERE symbol = ?', (symbol.upper(),))
+    conn.commit()
+
+def get_metrics():
+    """캐시 지표"""
+    with _metrics_lock:
+        metrics = dict(_metrics)
+    try:
+        now = time.time()
+        conn = _connect()
+        metrics['entries'] = conn.execute('SELECT COUNT(*) FROM fundamentals').fetchone()[0]
+        metrics['fresh_entries'] = conn.execute(
+            'SELECT COUNT(*) FROM fundamentals WHERE expires_at > ?', (now,)
+        ).fetchone()[0]
+    except Exception:
+        pass
+    return metrics
@@ -0,0 +1,207 @@
+"""공유 HTTP 클라이언트 - 호스트별 커넥션 풀 + keep-alive"""
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+import config
+import rate_limiter
+
+# API 기본 주소 (config에서 재생 서버 등으로 변경 가능)
+YAHOO_DEFAULT_URL = 'https://query1.finance.yahoo.com'
+YAHOO_QUERY_URL = config.YAHOO_BASE_URL
+NASDAQ_API_URL = config.NASDAQ_BASE_URL
+
+# 기본 타임아웃 (초)
+DEFAULT_TIMEOUT = 8
+
+# 모든 요청에 공통으로 붙는 헤더
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'application/json',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive'
+}
+
+# 호스트별 추가 헤더
+YAHOO_HEADERS = {
+    'Referer': 'https://finance.yahoo.com/',
+    'Origin': 'https://finance.yahoo.com'
+}
+
+# crumb 발급 (v10 quoteSummary 등 crumb가 필요한 Yahoo API용)
+YAHOO_COOKIE_URL = 'https://fc.yahoo.com'
+YAHOO_CRUMB_PATH = '/v1/test/getcrumb'
+
+NASDAQ_HEADERS = {
+    'Referer': 'https://www.nasdaq.com/',
+    'Origin': 'https://www.nasdaq.com'
+}
+
+def is_yahoo_url(url):
+    """Yahoo Finance 요청인지 (속도 제한 대상)"""
+    host = url.split('://', 1)[-1].split('/', 1)[0].split(':', 1)[0]
+    return host.endswith('yahoo.com') or url.startswith(YAHOO_QUERY_URL)
+
+def rewrite_yahoo_url(url):
+    """Yahoo API 주소(query1/query2)를 설정된 기본 주소로 변경
+
+    yfinance는 주소가 코드에 고정되어 있으므로, 기본 주소를 바꾼 경우
+    (오프라인 재생 서버 등) 요청을 보내기 직전에 호스트만 바꿉니다.
+    """
+    if YAHOO_QUERY_URL == YAHOO_DEFAULT_URL:
+        return url
+    netloc, sep, rest = url.partition('://')[2].partition('/')
+    host = netloc.split(':', 1)[0]
+    if host.startswith('query') and host.endswith('.finance.yahoo.com'):
+        return f"{YAHOO_QUERY_URL}{sep}{rest}"
+    return url
+
+def parse_retry_after(value):
+    """Retry-After 헤더(초) 파싱 - 없거나 날짜 형식이면 None"""
+    try:
+        return float(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+class RateLimitedAdapter(HTTPAdapter):
+    """Yahoo 요청에 공유 속도 제한을 적용하는 어댑터 (yfinance 요청 포함)
+
+    429/403 응답은 리미터에 보고하고, 백오프 후 RATE_LIMIT_RETRIES회까지 다시 보냅니다.
+    """
+
+    def send(self, request, **kwargs):
+        request.url = rewrite_yahoo_url(request.url)
+        if not is_yahoo_url(request.url):
+            return super().send(request, **kwargs)
+        limiter = rate_limiter.get_limiter()
+        for attempt in range(config.RATE_LIMIT_RETRIES + 1):
+            limiter.acquire()
+            try:
+                response = super().send(request, **kwargs)
+            except Exception:
+                _local.last_status = None
+                raise
+            _local.last_status = response.status_code
+            throttled = limiter.record(response.status_code, parse_retry_after(response.headers.get('Retry-After')))
+            if not throttled or attempt == config.RATE_LIMIT_RETRIES:
+                return response
+            response.close()
+        return response
+
+_adapter = None
+_adapter_lock = threading.Lock()
+_local = threading.local()
+
+def last_status():
+    """현재 스레드의 마지막 Yahoo 응답 상태 코드 (연결 오류/타임아웃이면 None)
+
+    yfinance처럼 오류를 빈 결과로 돌려주는 호출에서 원인을 구분할 때 사용합니다.
+    """
+    return getattr(_local, 'last_status', None)
+
+def reset_last_status():
+    _local.last_status = None
+
+def get_pool_size():
+    """호스트당 커넥션 풀 크기 (워커 수에 맞춤)"""
+    return max(config.MONITOR_WORKERS, 1)
+
+def _get_adapter():
+    """모든 스레드가 공유하는 커넥션 풀 어댑터"""
+    global _adapter
+    if _adapter is None:
+        with _adapter_lock:
+            if _adapter is None:
+                pool_size = get_pool_size()
+                # pool_connections: 유지할 호스트 수, pool_maxsize: 호스트당 커넥션 수
+                _adapter = RateLimitedAdapter(
+                    pool_connections=8,
+                    pool_maxsize=pool_size,
+                    max_retries=0,
+                    pool_block=False
+                )
+    return _adapter
+
+def get_session():
+    """현재 스레드의 세션 반환 (커넥션 풀은 공유)"""
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        adapter = _get_adapter()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update(DEFAULT_HEADERS)
+        _local.session = session
+    return session
+
+def get(url, params=None, headers=None, timeout=DEFAULT_TIMEOUT):
+    """공유 커넥션 풀을 사용하는 GET 요청"""
+    return get_session().get(url, params=params, headers=headers, timeout=timeout)
+
+def yahoo_get(path, params=None, timeout=DEFAULT_TIMEOUT):
+    """Yahoo Finance API GET 요청 (path 예: /v8/finance/chart/AAPL)"""
+    return get(f"{YAHOO_QUERY_URL}{path}", params=params, headers=YAHOO_HEADERS, timeout=timeout)
+
+_crumb = (None, {})  # (crumb, 쿠키) - 모든 스레드 공유 (crumb는 발급받은 쿠키와 함께 보내야 함)
+_crumb_lock = threading.Lock()
+
+def _fetch_crumb():
+    """쿠키 발급 후 crumb 요청 - (crumb, 쿠키), 실패하면 (None, {})"""
+    session = get_session()
+    cookies = {}
+    try:
+        if YAHOO_QUERY_URL == YAHOO_DEFAULT_URL:
+            # 응답 상태와 관계없이 쿠키(A3)가 설정됨 (재생 서버는 쿠키 없이 crumb 발급)
+            cookies = session.get(YAHOO_COOKIE_URL, timeout=DEFAULT_TIMEOUT).cookies.get_dict()
+        response = session.get(f"{YAHOO_QUERY_URL}{YAHOO_CRUMB_PATH}", headers=YAHOO_HEADERS,
+                               cookies=cookies, timeout=DEFAULT_TIMEOUT)
+        crumb = response.text.strip()
+        if response.status_code == 200 and crumb and '<' not in crumb:
+            return crumb, cookies
+    except Exception:
+        pass
+    return None, {}
+
+def yahoo_crumb(stale=None):
+    """Yahoo crumb와 쿠키 - (crumb, 쿠키 딕셔너리)
+
+    처음 호출할 때 한 번 발급받아 공유하고, stale(거절된 crumb)이 현재 crumb와 같으면 새로 발급받습니다.
+    """
+    global _crumb
+    with _crumb_lock:
+        if _crumb[0] is None or _crumb[0] == stale:
+            _crumb = _fetch_crumb()
+        return _crumb
+
+def yahoo_get_with_crumb(path, params=None, timeout=DEFAULT_TIMEOUT):
+    """crumb가 필요한 Yahoo API GET 요청 (401이면 crumb를 새로 받아 1회 재시도)"""
+    crumb, cookies = yahoo_crumb()
+    for retry in (False, True):
+        request_params = dict(params or {})
+        if crumb:
+            request_params['crumb'] = crumb
+        response = get_session().get(f"{YAHOO_QUERY_URL}{path}", params=request_params,
+                                     headers=YAHOO_HEADERS, cookies=cookies, timeout=timeout)
+        if response.status_code != 401 or retry:
+            return response
+        response.close()
+        crumb, cookies = yahoo_crumb(stale=crumb)
+    return response
+
+def nasdaq_get(path, params=None, timeout=30):
+    """NASDAQ API GET 요청 (path 예: /api/screener/stocks)"""
+    return get(f"{NASDAQ_API_URL}{path}", params=params, headers=NASDAQ_HEADERS, timeout=timeout)
+
+def get_ticker(symbol):
+    """공유 세션을 사용하는 yfinance Ticker"""
+    import yfinance as yf
+    return yf.Ticker(symbol, session=get_session())
+
+def reset_pool():
+    """커넥션 풀 재생성 (워커 수 변경 시)"""
+    global _adapter
+    with _adapter_lock:
+        if _adapter is not None:
+            _adapter.close()
+        _adapter = None
+    _local.session = None
@@ -0,0 +1,236 @@
+"""기술적 지표 스트리밍 상태 - 새 봉이 추가되면 종목당 상수 시간으로 지표 갱신
+
+종목별로 지수이동평균(MACD 12/26/9), Wilder 평균(RSI 상승폭·하락폭), 최근 50개 종가와 20개 거래량
+(이동평균·볼린저 밴드·거래량 평균·5일 추세용 링 버퍼)만 보관하고, 새 봉이 오면 ta/pandas와 같은 점화식으로
+한 단계만 갱신합니다. 전체 이력을 다시 계산한 값과 부동소수점 오차 범위에서 같습니다.
+
+상태는 '확정된 봉'(마지막 봉 직전까지)만 반영합니다. 마지막 봉은 장중 재스캔마다 바뀔 수 있으므로
+점수 계산 때만 임시로 반영(peek)하고, 다음 봉이 추가되면 확정합니다.
+상태는 스캔 결과 DB(indicator_states 테이블)에 저장해 서버를 다시 시작해도 이력 재계산 없이 이어서 사용합니다.
+"""
+from collections import deque
+import numpy as np
+import pandas as pd
+import indicators
+from signal_generator import MIN_BARS, PANEL_CHUNK, price_panel, score_values
+
+STATE_VERSION = 1
+
+# 링 버퍼 길이 (가장 긴 이동평균 구간)
+CLOSE_BUFFER = max(indicators.MA_LONG, indicators.BB_WINDOW, indicators.MA_SHORT, indicators.TREND_DAYS)
+VOLUME_BUFFER = indicators.VOLUME_WINDOW
+
+RSI_ALPHA = 1.0 / indicators.RSI_WINDOW
+FAST_ALPHA = 2.0 / (indicators.MACD_FAST + 1)
+SLOW_ALPHA = 2.0 / (indicators.MACD_SLOW + 1)
+SIGNAL_ALPHA = 2.0 / (indicators.MACD_SIGNAL + 1)
+
+# 확정 종가가 이만큼 달라지면 (액면분할·배당 수정주가 등) 상태를 다시 만듦
+REBUILD_TOLERANCE = 1e-9
+
+def _step(weighted, value, alpha):
+    """지수이동평균 한 단계 (pandas ewm(adjust=False) 내부 계산과 같은 순서)"""
+    if weighted != value:
+        weighted = ((1.0 - alpha) * weighted + alpha * value) / ((1.0 - alpha) + alpha)
+    return weighted
+
+class IndicatorState:
+    """종목 1개의 확정된 봉까지의 지표 상태"""
+    __slots__ = ('date', 'close', 'bars', 'gain', 'loss', 'fast', 'slow', 'signal', 'closes', 'volumes')
+
+    def __init__(self, date=None, close=float('nan'), bars=0, gain=0.0, loss=0.0,
+                 fast=float('nan'), slow=float('nan'), signal=None, closes=(), volumes=()):
+        self.date = date  # 마지막 확정 봉 시각 (pd.Timestamp)
+        self.close = close
+        self.bars = bars
+        self.gain = gain  # RSI 평균 상승폭 (Wilder)
+        self.loss = loss  # RSI 평균 하락폭 (Wilder)
+        self.fast = fast  # MACD 12일 지수이동평균
+        self.slow = slow  # MACD 26일 지수이동평균
+        self.signal = signal  # MACD 시그널 (MACD 선이 생긴 뒤부터, 없으면 None)
+        self.closes = deque(closes, maxlen=CLOSE_BUFFER)
+        self.volumes = deque(volumes, maxlen=VOLUME_BUFFER)
+
+    def advance(self, date, close, volume):
+        """봉 1개 확정 (상수 시간)"""
+        if self.bars == 0:
+            self.gain = self.loss = 0.0
+            self.fast = self.slow = close
+        else:
+            change = close - self.close
+            self.gain = _step(self.gain, change if change > 0 else 0.0, RSI_ALPHA)
+            self.loss = _step(self.loss, -change if change < 0 else 0.0, RSI_ALPHA)
+            self.fast = _step(self.fast, close, FAST_ALPHA)
+            self.slow = _step(self.slow, close, SLOW_ALPHA)
+        self.bars += 1
+        if self.bars >= indicators.MACD_SLOW:
+            macd = self.fast - self.slow
+            self.signal = macd if self.signal is None else _step(self.signal, macd, SIGNAL_ALPHA)
+        self.date = date
+        self.close = close
+        self.closes.append(close)
+        self.volumes.append(volume)
+
+    def to_dict(self):
+        return {
+            'version': STATE_VERSION,
+            'date': self.date.isoformat() if self.date is not None else None,
+            'close': self.close, 'bars': self.bars,
+            'gain': self.gain, 'loss': self.loss,
+            'fast': self.fast, 'slow': self.slow, 'signal': self.signal,
+            'closes': list(self.closes), 'volumes': list(self.volumes)
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """저장된 딕셔너리 → IndicatorState (버전이 다르면 None - 다음 스캔에서 다시 생성)"""
+        if not data or data.get('version') != STATE_VERSION:
+            return None
+        return cls(
+            pd.Timestamp(data['date']) if data.get('date') else None,
+            data['close'], data['bars'], data['gain'], data['loss'],
+            data['fast'], data['slow'], data['signal'], data['closes'], data['volumes']
+        )
+
+def build_states(frames):
+    """{symbol: 일봉} → {symbol: IndicatorState} (마지막 봉 직전까지, 전체 이력을 패널 모드로 한 번에 계산)"""
+    symbols, close, volume = price_panel(frames)
+    # 오른쪽 정렬 행렬이므로 마지막 열을 빼면 종목마다 마지막 봉이 빠짐
+    close, volume = close[:, :-1], volume[:, :-1]
+    states = {}
+    for start in range(0, len(symbols), PANEL_CHUNK):
+        rows = slice(start, start + PANEL_CHUNK)
+        chunk = close[rows]
+        bars = chunk.shape[1] - indicators.first_valid(chunk)
+        gain, loss = indicators.gains_losses(chunk)
+        gain = indicators.ema(gain, RSI_ALPHA)
+        loss = indicators.ema(loss, RSI_ALPHA)
+        fast = indicators.ema(chunk, FAST_ALPHA)
+        slow = indicators.ema(chunk, SLOW_ALPHA)
+        # MACD 선은 26번째 봉부터 (ta와 동일), 시그널은 그 뒤 첫 값부터
+        before_macd = np.arange(chunk.shape[1]) < (chunk.shape[1] - bars + indicators.MACD_SLOW - 1)[:, None]
+        macd = np.where(before_macd, np.nan, fast - slow)
+        signal = indicators.ema(macd, SIGNAL_ALPHA)
+
+        for row, symbol in enumerate(symbols[rows]):
+            frame = frames[symbol]
+            state = IndicatorState()
+            if bars[row]:
+                recent = chunk[row, -min(bars[row], CLOSE_BUFFER):]
+                state = IndicatorState(
+                    frame.index[-2], float(chunk[row, -1]), int(bars[row]),
+                    float(gain[row, -1]), float(loss[row, -1]), float(fast[row, -1]), float(slow[row, -1]),
+                    None if np.isnan(signal[row, -1]) else float(signal[row, -1]),
+                    recent.tolist(), volume[rows][row, -min(bars[row], VOLUME_BUFFER):].tolist()
+                )
+            states[symbol] = state
+    return states
+
+def _step_array(weighted, values, alpha):
+    """_step의 배열 버전 (종목별 한 단계)"""
+    return np.where(weighted != values, ((1.0 - alpha) * weighted + alpha * values) / ((1.0 - alpha) + alpha), weighted)
+
+def peek_values(states, close, volume):
+    """상태 목록에 마지막(미확정) 봉을 임시로 반영한 지표 값 - 종목별 배열의 indicators.LastValues
+
+    모든 종목의 한 단계 갱신과 이동평균·볼린저 밴드 계산을 배열 연산으로 한 번에 수행합니다 (상태는 그대로).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+    bars = np.array([state.bars for state in states]) + 1
+    prev = np.array([state.close for state in states], dtype=np.float64)
+    closes = np.full((len(states), CLOSE_BUFFER + 1), np.nan)
+    volumes = np.full((len(states), VOLUME_BUFFER + 1), np.nan)
+    for row, state in enumerate(states):
+        closes[row, CLOSE_BUFFER - len(state.closes):CLOSE_BUFFER] = state.closes
+        volumes[row, VOLUME_BUFFER - len(state.volumes):VOLUME_BUFFER] = state.volumes
+    closes[:, -1] = close
+    volumes[:, -1] = volume
+    closes, volumes = closes[:, 1:], volumes[:, 1:]
+
+    # 첫 봉이면 평균 상승폭·하락폭 0, 지수이동평균은 종가에서 시작
+    first = bars == 1
+    change = np.where(first, 0.0, close - prev)
+    gain = _step_array(np.array([state.gain for state in states], dtype=np.float64), np.where(change > 0, change, 0.0), RSI_ALPHA)
+    loss = _step_array(np.array([state.loss for state in states], dtype=np.float64), np.where(change < 0, -change, 0.0), RSI_ALPHA)
+    fast = np.where(first, close, _step_array(np.array([state.fast for state in states], dtype=np.float64), close, FAST_ALPHA))
+    slow = np.where(first, close, _step_array(np.array([state.slow for state in states], dtype=np.float64), close, SLOW_ALPHA))
+    macd = fast - slow
+    signal = np.array([np.nan if state.signal is None else state.signal for state in states], dtype=np.float64)
+    signal = np.where(np.isnan(signal), macd, _step_array(signal, macd, SIGNAL_ALPHA))
+
+    ma20 = indicators.window_mean(closes, indicators.MA_SHORT)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        trend = (close - closes[:, -indicators.TREND_DAYS]) / closes[:, -indicators.TREND_DAYS]
+    return indicators.LastValues(
+        close=close,
+        rsi=np.where(bars >= indicators.RSI_WINDOW, indicators.rsi_value(gain, loss), np.nan),
+        macd=np.where(bars >= indicators.MACD_SLOW, macd, np.nan),
+        macd_signal=np.where(bars >= indicators.MACD_SLOW + indicators.MACD_SIGNAL - 1, signal, np.nan),
+        ma20=ma20,
+        ma50=indicators.window_mean(closes, indicators.MA_LONG),
+        bb_lower=indicators.bollinger_lower(closes, ma20),
+        volume=volume,
+        volume_ma20=indicators.window_mean(volumes, indicators.VOLUME_WINDOW),
+        trend=trend
+    )
+
+def score_states(states, close, volume):
+    """상태 목록 + 종목별 마지막 봉 → 기술적 점수 배열 (signal_generator.calculate_score와 같은 값)"""
+    if not states:
+        return np.zeros(0)
+    score = score_values(peek_values(states, close, volume))
+    valid = np.array([state.bars for state in states]) + 1 >= MIN_BARS
+    return np.where(valid, score, 0.0)
+
+def sync(state, dates, close, volume):
+    """확정 상태를 새 일봉(날짜·종가·거래량 배열)에 맞춰 갱신 → (상태, 변경 여부)
+
+    새로 확정할 봉만 한 단계씩 반영하고 (보통 0-1개), 상태가 일봉과 맞지 않으면
+    (확정 봉이 없음, 수정주가로 종가 변경 등) None을 반환합니다 - build_states()로 다시 만들어야 합니다.
+    """
+    if state is None or state.bars == 0 or len(dates) < 2:
+        return None, False
+    # 대부분은 새로 확정할 봉이 없음 (장중 재스캔) - 마지막 직전 봉이 확정 봉
+    stamps, committed = dates.values, state.date.to_datetime64()
+    position = len(dates) - 2
+    if stamps[position] != committed:
+        position = int(np.searchsorted(stamps, committed))
+        if position >= len(dates) - 1 or stamps[position] != committed:
+            return None, False
+    if abs(close[position] - state.close) > REBUILD_TOLERANCE * abs(state.close):
+        return None, False
+    for i in range(position + 1, len(dates) - 1):
+        state.advance(dates[i], float(close[i]), float(volume[i]))
+    return state, position < len(dates) - 2
+
+def score_frames(states, frames):
+    """저장된 상태로 전체 종목 기술적 점수 계산 → ({symbol: 점수}, 변경된 종목 집합)
+
+    states는 그 자리에서 갱신합니다. 상태가 없거나 맞지 않는 종목만 모아 패널 모드로 다시 만듭니다.
+    """
+    stale = {}
+    changed = set()
+    symbols, last_close, last_volume = [], [], []
+    for symbol, frame in frames.items():
+        if frame is None or len(frame) == 0:
+            continue
+        dates = frame.index
+        close = frame['Close'].to_numpy(dtype=np.float64)
+        volume = frame['Volume'].to_numpy(dtype=np.float64)
+        state, advanced = sync(states.get(symbol), dates, close, volume)
+        if state is None:
+            stale[symbol] = frame
+        else:
+            states[symbol] = state
+            if advanced:
+                changed.add(symbol)
+        symbols.append(symbol)
+        last_close.append(close[-1])
+        last_volume.append(volume[-1])
+    if stale:
+        states.update(build_states(stale))
+        changed.update(stale)
+
+    scores = score_states([states[symbol] for symbol in symbols], last_close, last_volume)
+    return dict(zip(symbols, scores.tolist())), changed
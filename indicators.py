@@ -0,0 +1,143 @@
+"""기술적 지표 계산 커널 - NumPy 배열 기반 (ta 라이브러리 대체)
+
+calculate_score에 필요한 지표의 마지막 값만 계산합니다.
+입력은 종가·거래량 배열(마지막 축이 시간)이며 2차원(종목 x 일)도 같은 코드로 한 번에 계산합니다.
+이력이 짧은 종목은 앞쪽을 NaN으로 채우면 첫 유효값부터 계산합니다 (중간 결측값은 없다고 가정).
+
+지수이동평균은 ta가 사용하는 pandas ewm(adjust=False)과 같은 점화식
+    y[0] = x[0],  y[t] = (1 - alpha) * y[t-1] + alpha * x[t]
+을 블록 단위 누적합으로 계산하며, 결과는 ta와 부동소수점 오차 범위에서 같습니다.
+"""
+from collections import namedtuple
+import numpy as np
+
+# 지수이동평균 블록 길이 (블록 안에서 (1 - alpha)^-k 배율이 커지지 않을 만큼 짧게)
+EMA_BLOCK = 32
+
+RSI_WINDOW = 14
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+MA_SHORT, MA_LONG = 20, 50
+BB_WINDOW, BB_DEV = 20, 2
+VOLUME_WINDOW = 20
+TREND_DAYS = 5
+
+# calculate_score가 사용하는 지표의 마지막 값 (2차원 입력이면 종목별 배열, 계산할 수 없으면 NaN)
+LastValues = namedtuple('LastValues', [
+    'close', 'rsi', 'macd', 'macd_signal', 'ma20', 'ma50', 'bb_lower', 'volume', 'volume_ma20', 'trend'
+])
+
+def first_valid(values):
+    """마지막 축 기준 첫 유효값(NaN 아님) 위치 - 없으면 길이"""
+    valid = ~np.isnan(values)
+    return np.where(valid.any(axis=-1), valid.argmax(axis=-1), values.shape[-1])
+
+def ema(values, alpha, min_periods=0):
+    """지수이동평균 전체 구간 (pandas ewm(alpha=alpha, adjust=False, min_periods=min_periods).mean()과 같은 값)
+
+    앞쪽 NaN 구간과 관측 수가 min_periods 미만인 구간은 NaN입니다.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    squeeze = x.ndim == 1
+    x = np.atleast_2d(x)
+    rows, n = x.shape
+    if n == 0:
+        return x[0] if squeeze else x
+
+    first = first_valid(x)
+    start = x[np.arange(rows), np.minimum(first, n - 1)]
+
+    # 블록 안: y[j] = alpha * sum_k decay^(j-k) x[k] + decay^(j+1) * (이전 블록 마지막 값)
+    decay = 1.0 - alpha
+    blocks = -(-n // EMA_BLOCK)
+    local = np.zeros((rows, blocks * EMA_BLOCK))
+    local[:, :n] = x
+    # 앞쪽 NaN은 첫 유효값으로 채움 (상수 구간의 지수이동평균은 그 값 그대로)
+    padding = np.arange(n) < first[:, None]
+    if padding.any():
+        local[:, :n][padding] = np.broadcast_to(start[:, None], (rows, n))[padding]
+    local = local.reshape(rows, blocks, EMA_BLOCK)
+    k = np.arange(EMA_BLOCK)
+    local *= decay ** -k
+    np.cumsum(local, axis=-1, out=local)
+    local *= alpha * decay ** k
+    carry_decay = decay ** (k + 1)
+
+    carry = np.empty((rows, blocks))
+    carry[:, 0] = start  # y[-1] = x[0]이면 y[0] = x[0]
+    for block in range(1, blocks):
+        carry[:, block] = local[:, block - 1, -1] + carry_decay[-1] * carry[:, block - 1]
+    local += carry[:, :, None] * carry_decay
+    result = local.reshape(rows, -1)[:, :n]
+
+    result[np.arange(n) < first[:, None] + max(min_periods, 1) - 1] = np.nan
+    return result[0] if squeeze else result
+
+def window_mean(values, window):
+    """마지막 window개 평균 (길이가 짧거나 NaN이 있으면 NaN)
+
+    구간 값이 모두 같으면 그 값 그대로 (pandas rolling과 동일 - 보합 구간의 볼린저 밴드 하단 터치 판정 유지)
+    """
+    if values.shape[-1] < window:
+        return np.full(values.shape[:-1], np.nan)
+    recent = values[..., -window:]
+    last = recent[..., -1]
+    return np.where(recent.max(axis=-1) == recent.min(axis=-1), last, recent.sum(axis=-1) / window)
+
+def gains_losses(close):
+    """RSI용 상승폭·하락폭 배열 - 첫 봉의 변화량은 0 (ta와 동일), 이력 이전 구간은 NaN"""
+    diff = np.full(close.shape, np.nan)
+    diff[..., 1:] = close[..., 1:] - close[..., :-1]
+    before_start = np.arange(close.shape[-1]) < first_valid(close)[..., None]
+    gain = np.where(before_start, np.nan, np.where(diff > 0, diff, 0.0))
+    loss = np.where(before_start, np.nan, np.where(diff < 0, -diff, 0.0))
+    return gain, loss
+
+def rsi_value(avg_gain, avg_loss):
+    """Wilder 평균 상승폭·하락폭 → RSI (하락폭 평균이 0이면 100, 평균이 없으면 NaN)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(avg_loss == 0, 100.0, 100 - (100 / (1 + avg_gain / avg_loss)))
+    return np.where(np.isnan(avg_gain) | np.isnan(avg_loss), np.nan, rsi)
+
+def bollinger_lower(close, ma20):
+    """마지막 BB_WINDOW개 종가의 볼린저 밴드 하단 (모집단 표준편차, ta와 동일)"""
+    if close.shape[-1] < BB_WINDOW:
+        return np.full(np.shape(ma20), np.nan)
+    deviation = close[..., -BB_WINDOW:] - ma20[..., None]
+    return ma20 - BB_DEV * np.sqrt((deviation * deviation).sum(axis=-1) / BB_WINDOW)
+
+def last_values(close, volume):
+    """calculate_score에 필요한 지표의 마지막 값 - LastValues
+
+    RSI(14), MACD(12, 26, 9), 20/50일 이동평균, 볼린저 밴드(20, 2) 하단, 20일 평균 거래량, 5일 추세.
+    20일 이동평균은 볼린저 밴드 중심선과 공유하고, MACD 선은 빠른/느린 지수이동평균을 한 번씩만 계산합니다.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+    n = close.shape[-1]
+    last = close[..., -1]
+
+    # RSI
+    gain, loss = gains_losses(close)
+    avg_gain = ema(gain, 1.0 / RSI_WINDOW, RSI_WINDOW)[..., -1]
+    avg_loss = ema(loss, 1.0 / RSI_WINDOW, RSI_WINDOW)[..., -1]
+    rsi = rsi_value(avg_gain, avg_loss)
+
+    # MACD
+    macd_line = ema(close, 2.0 / (MACD_FAST + 1), MACD_FAST) - ema(close, 2.0 / (MACD_SLOW + 1), MACD_SLOW)
+    macd_signal = ema(macd_line, 2.0 / (MACD_SIGNAL + 1), MACD_SIGNAL)[..., -1]
+
+    # 이동평균, 볼린저 밴드 (모집단 표준편차, ta와 동일)
+    ma20 = window_mean(close, MA_SHORT)
+    ma50 = window_mean(close, MA_LONG)
+    bb_lower = bollinger_lower(close, ma20)
+
+    # 거래량, 5일 추세
+    volume_ma20 = window_mean(volume, VOLUME_WINDOW)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        trend = (last - close[..., -TREND_DAYS]) / close[..., -TREND_DAYS] if n >= TREND_DAYS else np.full(last.shape, np.nan)
+
+    return LastValues(
+        close=last, rsi=rsi, macd=macd_line[..., -1], macd_signal=macd_signal,
+        ma20=ma20, ma50=ma50, bb_lower=bb_lower,
+        volume=volume[..., -1], volume_ma20=volume_ma20, trend=trend
+    )
@@ -0,0 +1,158 @@
+"""시장 방향 (CAN SLIM M) - 스캔 시작 시 1회 계산해 모든 종목 점수 계산에 공유
+
+주요 지수(SPY, QQQ, ^IXIC) 일봉으로 분산일(distribution day), 팔로스루 데이(follow-through day),
+이동평균 추세를 계산해 시장 국면을 판정합니다.
+    uptrend        상승 추세 확인
+    under_pressure 상승 추세 압박 (분산일 누적 또는 추세 약화)
+    correction     조정 국면 (하락 추세, 팔로스루 데이 없음)
+결과는 불변 객체(namedtuple)이므로 스캔 중 여러 스레드에서 그대로 공유합니다.
+"""
+import threading
+from collections import namedtuple
+from datetime import datetime
+import numpy as np
+from data_fetcher import fetch_stock_data_batch
+
+# 시장 지수
+INDEXES = ('SPY', 'QQQ', '^IXIC')
+INDEX_PERIOD = '1y'  # 200일 이동평균 계산용
+
+# 분산일: 0.2% 이상 하락 + 전일보다 거래량 증가, 최근 25거래일 집계 (이후 5% 이상 오르면 제외)
+DISTRIBUTION_WINDOW = 25
+DISTRIBUTION_DROP = -0.002
+DISTRIBUTION_EXPIRE_GAIN = 0.05
+
+# 팔로스루 데이: 최근 60거래일 저점부터 랠리 4일째 이후 1.25% 이상 상승 + 전일보다 거래량 증가
+RALLY_LOOKBACK = 60
+FOLLOW_THROUGH_DAY = 4
+FOLLOW_THROUGH_GAIN = 0.0125
+
+# 국면 판정 기준 (분산일 수)
+PRESSURE_DISTRIBUTION_DAYS = 4
+CORRECTION_DISTRIBUTION_DAYS = 6
+
+# 국면별 표시 이름과 CAN SLIM M 점수 (최대 0.5점)
+STATUS_LABELS = {'uptrend': '시장 상승 추세 확인', 'under_pressure': '시장 상승 추세 압박', 'correction': '시장 조정 국면'}
+STATUS_POINTS = {'uptrend': 0.5, 'under_pressure': 0.25, 'correction': 0.0}
+_STATUS_ORDER = ('correction', 'under_pressure', 'uptrend')
+
+IndexState = namedtuple('IndexState', [
+    'symbol', 'date', 'close', 'ma50', 'ma200', 'trend',
+    'distribution_days', 'follow_through_date', 'status'
+])
+
+MarketRegime = namedtuple('MarketRegime', [
+    'status', 'label', 'points', 'distribution_days', 'indexes', 'computed_at'
+])
+
+_latest = None
+_lock = threading.Lock()
+
+def _date(index, position):
+    return index[position].strftime('%Y-%m-%d')
+
+def distribution_days(close, volume):
+    """최근 DISTRIBUTION_WINDOW 거래일의 분산일 수 (이후 지수가 5% 이상 오른 날은 제외)"""
+    if len(close) < 2:
+        return 0
+    change = close[1:] / close[:-1] - 1.0
+    distribution = (change <= DISTRIBUTION_DROP) & (volume[1:] > volume[:-1])
+    days = np.flatnonzero(distribution[-DISTRIBUTION_WINDOW:]) + max(len(change) - DISTRIBUTION_WINDOW, 0) + 1
+    # 각 분산일 이후의 최고 종가 (오른쪽 누적 최댓값)
+    later_high = np.append(np.maximum.accumulate(close[::-1])[::-1][1:], -np.inf)
+    return int(np.count_nonzero(later_high[days] < close[days] * (1 + DISTRIBUTION_EXPIRE_GAIN)))
+
+def follow_through(close, volume):
+    """조정 저점 이후 팔로스루 데이 위치 (없으면 None)"""
+    start = max(len(close) - RALLY_LOOKBACK, 0)
+    low = start + int(np.argmin(close[start:]))
+    first = low + FOLLOW_THROUGH_DAY - 1  # 저점이 랠리 1일째
+    if first >= len(close):
+        return None
+    positions = np.arange(first, len(close))
+    gain = close[positions] / close[positions - 1] - 1.0
+    hits = positions[(gain >= FOLLOW_THROUGH_GAIN) & (volume[positions] > volume[positions - 1])]
+    return int(hits[0]) if len(hits) else None
+
+def _trend(close, ma50, ma200):
+    """이동평균 추세 - up(종가 > 50일 > 200일), down(종가 < 50일 < 200일), mixed"""
+    if np.isnan(ma200):
+        return 'up' if close > ma50 else 'down'
+    if close > ma50 > ma200:
+        return 'up'
+    if close < ma50 < ma200:
+        return 'down'
+    return 'mixed'
+
+def analyze_index(symbol, data):
+    """지수 일봉 → IndexState (50일 미만이면 None)"""
+    if data is None or len(data) < 50:
+        return None
+    close = data['Close'].to_numpy(dtype=np.float64)
+    volume = data['Volume'].to_numpy(dtype=np.float64)
+    ma50 = float(close[-50:].mean())
+    ma200 = float(close[-200:].mean()) if len(close) >= 200 else float('nan')
+    trend = _trend(close[-1], ma50, ma200)
+    distribution = distribution_days(close, volume)
+    ftd = follow_through(close, volume)
+
+    if distribution >= CORRECTION_DISTRIBUTION_DAYS or (trend == 'down' and ftd is None):
+        status = 'correction'
+    elif distribution >= PRESSURE_DISTRIBUTION_DAYS or (trend != 'up' and ftd is None):
+        status = 'under_pressure'
+    else:
+        status = 'uptrend'
+
+    return IndexState(
+        symbol=symbol,
+        date=_date(data.index, -1),
+        close=round(float(close[-1]), 2),
+        ma50=round(ma50, 2),
+        ma200=None if np.isnan(ma200) else round(ma200, 2),
+        trend=trend,
+        distribution_days=distribution,
+        follow_through_date=None if ftd is None else _date(data.index, ftd),
+        status=status
+    )
+
+def analyze(frames):
+    """{지수: 일봉} → MarketRegime (지수 데이터가 하나도 없으면 None)
+
+    시장 국면은 지수별 국면의 중앙값 (짝수 개면 더 보수적인 쪽)입니다.
+    """
+    states = tuple(state for state in (analyze_index(symbol, frames.get(symbol)) for symbol in INDEXES) if state)
+    if not states:
+        return None
+    ranks = sorted(_STATUS_ORDER.index(state.status) for state in states)
+    status = _STATUS_ORDER[ranks[(len(ranks) - 1) // 2]]
+    return MarketRegime(
+        status=status,
+        label=STATUS_LABELS[status],
+        points=STATUS_POINTS[status],
+        distribution_days=max(state.distribution_days for state in states),
+        indexes=states,
+        computed_at=datetime.now().isoformat()
+    )
+
+def refresh(timeout=8):
+    """지수 일봉을 한 번 수집해 시장 국면 갱신 (실패하면 None, 직전 값은 유지하지 않음)"""
+    global _latest
+    try:
+        regime = analyze(fetch_stock_data_batch(list(INDEXES), period=INDEX_PERIOD, timeout=timeout))
+    except Exception:
+        regime = None
+    with _lock:
+        _latest = regime
+    return regime
+
+def get_latest():
+    """마지막으로 계산한 시장 국면 (없으면 None)"""
+    return _latest
+
+def to_dict(regime):
+    """MarketRegime → JSON 직렬화용 딕셔너리"""
+    if regime is None:
+        return None
+    data = regime._asdict()
+    data['indexes'] = [state._asdict() for state in regime.indexes]
+    return data
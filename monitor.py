@@ -3,22 +3,60 @@ import os
 import json
 import warnings
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from data_fetcher import fetch_stock_data, YFRateLimitError
-from signal_generator import generate_signal
-from value_investing_score import generate_value_signal
-from canslim_score import generate_canslim_signal
+import queue
+import threading
+from collections import namedtuple
+import numpy as np
+import config
+import rate_limiter
+import relative_strength
+import market_regime
+import data_fetcher
+from data_fetcher import fetch_stock_data, fetch_stock_data_batch, YFRateLimitError
+import scoring
+import indicator_state
+import pipeline
+import shared_panel
+import priority
+import symbol_fetcher
+import providers
+import telemetry
 import time
 
 # 경고 억제
 warnings.filterwarnings('ignore')
 logging.getLogger('yfinance').setLevel(logging.CRITICAL)
 
+# 종목별 마지막 점수 계산 결과 - probe: 최신 봉 확인 값 (시장 시각, 가격, 거래량), key: 입력 해시, result: ScoreResult
+CachedScore = namedtuple('CachedScore', ['probe', 'key', 'result'])
+
 class StockMonitor:
     def __init__(self, scan_interval_minutes=240, save_history=True):
         self.scan_interval_minutes = scan_interval_minutes
         self.save_history = save_history
         self.previous_signals = {}
+        self.rs_ranking = None  # 마지막 스캔의 상대강도 등급 (스캔 중에는 지난 분포로 매긴 등급)
+        self.market_regime = None  # 마지막 스캔의 시장 국면 (스캔 시작 시 1회 계산)
+        self.technical_scores = {}  # 마지막 스캔에서 일괄 수집한 종목의 기술적 점수 (지표 상태로 배치마다 일괄 계산)
+        self.indicator_states = {}  # 종목별 기술적 지표 스트리밍 상태 (indicator_state, DB에 저장)
+        self.changed_indicator_states = set()  # 마지막 저장 이후 확정 봉이 바뀐 종목
+        self._score_pool = None  # 점수 계산 프로세스 풀 (스캔 간 재사용)
+        self._score_pool_failed = False
+        self._price_panels = {}  # 스캔 중 수집 배치별 공유 메모리 패널 {블록 이름: [패널, 결과가 남은 종목 수]} (프로세스 풀 사용 시)
+        self._panel_names = {}  # 종목 → 공유 메모리 패널 블록 이름
+        self._panel_lock = threading.Lock()
+        self.score_cache = {}  # 종목별 마지막 점수 계산 결과 (CachedScore - 입력이 같으면 재계산 없이 재사용)
+        self._probes = {}  # 이번 스캔의 최신 봉 확인 값
+        self._skipped_fetch = 0  # 이번 스캔에서 최신 봉이 같아 수집을 생략한 종목 수
+        self._probe_failed = 0  # 이번 스캔에서 최신 봉 확인 요청이 실패한 종목 수 (생략 없이 전체 수집)
+        self._deferred_fetch = 0  # 이번 스캔에서 등급별 수집 주기가 안 돼 저장소 일봉을 쓴 종목 수
+        self._handed_off = 0  # 이번 스캔에서 수집 단계가 넘긴 종목 수 (준비 단계 전달 + 일괄 수집 실패)
+        self._fetch_done = threading.Event()  # 이번 스캔의 수집 단계 종료 (더 넘길 종목 없음)
+        self.priority = priority.PriorityScheduler()  # 스캔 순서·등급별 수집 주기
+        self.last_scan_metrics = {}  # 마지막 스캔 지표 (소요 시간, 첫 신호까지 시간, 재사용 수 등)
+        self.checkpoint_store = None  # 스캔 체크포인트 저장소 (database.Database - 서버에서 설정, 없으면 체크포인트 없음)
+        self.scan_budget = None  # 진행 중인 스캔의 시간 예산·취소 토큰 (pipeline.ScanBudget)
+        self.telemetry = telemetry.ScanTelemetry()  # 현재(마지막) 스캔의 단계별 소요 시간·결과 분류
         self.history_file = 'signal_history.json'
         self.load_history()
     
@@ -39,155 +77,614 @@ class StockMonitor:
         except Exception as e:
             print(f"히스토리 저장 실패: {str(e)}")
     
-    def scan_symbol(self, symbol):
-        """단일 종목 스캔 (조용한 모드 - 오류 로그 최소화)"""
+    def scan_symbol(self, symbol, data=None, prefetched=False, rate_limit_retries=2):
+        """단일 종목 스캔 (조용한 모드 - 오류 로그 최소화)
+        
+        준비(I/O) → 점수 계산(CPU) → 결과 반영을 현재 스레드에서 순서대로 실행합니다.
+        전체 스캔은 scan_once_with_realtime()의 단계별 파이프라인을 사용합니다.
+        """
+        try:
+            job = self._prepare(symbol, data, prefetched, rate_limit_retries)
+            if job is None:
+                return None
+            return self._record(symbol, scoring.evaluate_job(job))
+        except Exception as e:
+            # 모든 오류는 조용히 무시 (로그 없음)
+            return None
+    
+    def _prepare(self, symbol, data=None, prefetched=False, rate_limit_retries=2):
+        """준비 단계 (I/O) - 종목 필터, 일봉 수집, 상대강도 등급, 재무 지표 조회 → ScoreJob (대상이 아니면 None)
+        
+        prefetched=True이면 일괄 수집 결과(data)를 그대로 사용합니다
+        (일괄 수집에서 이미 모든 제공자를 시도했으므로 data=None이면 다시 요청하지 않음).
+        속도 제한에 걸린 종목은 백오프가 끝난 뒤 다시 수집합니다.
+        """
         try:
             symbol_upper = symbol.upper().strip()
             
             # 특수 문자 필터링
             if '^' in symbol_upper or '/' in symbol_upper or '$' in symbol_upper:
+                self.telemetry.count(telemetry.FILTERED)
                 return None
             
             # 우선주 제외
             if ('.PR' in symbol_upper or 
                 symbol_upper.endswith('-P') or 
                 any(symbol_upper.endswith(f'-{chr(i)}') for i in range(65, 91))):  # -A ~ -Z
+                self.telemetry.count(telemetry.FILTERED)
                 return None
             
             # 상장폐지 의심 종목 제외 (너무 짧거나 특수 패턴)
             if len(symbol_upper) < 1 or len(symbol_upper) > 5:
+                self.telemetry.count(telemetry.FILTERED)
                 return None
             
             # 조용한 모드로 데이터 가져오기 (오류 로그 없음, 타임아웃 8초로 단축)
             # 주요 종목은 디버깅을 위해 로그 출력
             is_test_symbol = symbol_upper in ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA', 'TSLA', 'META']
-            data = fetch_stock_data(symbol, silent=not is_test_symbol, timeout=8)
+            if data is None and not prefetched:
+                started = time.perf_counter()
+                data = fetch_stock_data(symbol, period=config.SCAN_PERIOD, silent=not is_test_symbol, timeout=8)
+                self.telemetry.observe(telemetry.FETCH, time.perf_counter() - started)
             if data is None or data.empty:
                 if is_test_symbol:
                     print(f"⚠️ {symbol}: 데이터 없음")
+                self.telemetry.count(telemetry.TIMEOUT if providers.unreachable(symbol) else telemetry.NO_DATA)
                 return None
             
             if is_test_symbol:
                 print(f"✅ {symbol}: 데이터 가져옴 ({len(data)}개 행)")
             
-            # 모든 방법론의 점수 계산
-            from canslim_score import get_canslim_score_only
-            from value_investing_score import get_value_score_only
-            from signal_generator import get_technical_score_only
-            
-            canslim_score = 0.0
-            value_score = 0.0
-            technical_score = 0.0
-            
-            try:
-                canslim_score = get_canslim_score_only(symbol, data)
-            except:
-                pass
+            # 점수 계산 입력 (재무 지표는 여기서 1회 조회 - 점수 계산 단계는 네트워크·DB 접근 없음)
+            started = time.perf_counter()
+            rs_rating = self.rs_ranking.rating(symbol_upper, data) if self.rs_ranking is not None else None
+            technical = self.technical_scores.get(symbol) if prefetched else None
+            # 일괄 수집한 일봉은 공유 메모리 패널 위치만 전달 (프로세스 풀로 배열을 복사하지 않음)
+            panel = self._panel_slice(symbol, len(data)) if prefetched else None
+            inputs = scoring.ScoreInputs(symbol, data, rs_rating=rs_rating, regime=self.market_regime, technical=technical)
+            parsed = time.perf_counter()
+            inputs.info  # 재무 지표 조회 (to_job 전에 따로 측정)
+            fetched = time.perf_counter()
+            job = inputs.to_job(panel)
+            self.telemetry.observe(telemetry.PARSE, parsed - started + time.perf_counter() - fetched)
+            self.telemetry.observe(telemetry.FUNDAMENTALS, fetched - parsed)
+            return job
             
-            try:
-                value_score = get_value_score_only(symbol, data)
-            except:
-                pass
-            
-            try:
-                technical_score = get_technical_score_only(symbol, data)
-            except:
-                pass
-            
-            # 윌리엄 오닐 CAN SLIM 방법론 우선 사용
-            signal = generate_canslim_signal(symbol, data)
-            
-            # CAN SLIM에서 신호가 없으면 가치투자 방법론 사용
-            if signal is None:
-                signal = generate_value_signal(symbol, data)
-            
-            # 가치투자 방법론에서도 신호가 없으면 기술적 분석 사용
-            if signal is None:
-                signal = generate_signal(symbol, data)
-            
-            # 총점 계산
-            total_score = max(canslim_score, value_score, technical_score)
-            
-            # 모든 점수를 신호에 추가
-            if signal:
-                signal['canslim_score'] = canslim_score
-                signal['value_score'] = value_score
-                signal['technical_score'] = technical_score
-                signal['total_score'] = total_score
-            
-            # 총점 6.5점 이상인 종목만 출력
-            if total_score >= 6.5:
-                if signal:
-                    price = signal.get('price', 0)
-                    level_text = "매수" if total_score >= 7.5 else "관찰"
-                    print(f"📊 {symbol}: CAN SLIM {canslim_score:.2f}점 | 가치 {value_score:.2f}점 | 기술 {technical_score:.2f}점 | 총점 {total_score:.2f}점 ({level_text}) | 가격 ${price:.2f}")
+        except YFRateLimitError:
+            # API 제한 시 (일봉·재무 지표) 공유 리미터의 백오프가 끝날 때까지 대기 후 재시도 (종목을 건너뛰지 않음)
+            # 받은 일봉은 그대로 쓰고 받지 못한 단계만 다시 요청
+            if rate_limit_retries <= 0:
+                self.telemetry.count(telemetry.THROTTLED)
+                return None
+            rate_limiter.get_limiter().wait_for_cooldown()
+            return self._prepare(symbol, data, prefetched, rate_limit_retries - 1)
+        except Exception as e:
+            # 모든 오류는 조용히 무시 (로그 없음)
+            self.telemetry.count(telemetry.ERROR)
+            return None
+    
+    def _record(self, symbol, result):
+        """결과 반영 단계 - 점수 출력, 저장할 신호 생성, previous_signals 갱신 → 신호 (저장 대상이 아니면 None)"""
+        if result is None:
+            return None
+        canslim_score = result.canslim_score
+        value_score = result.value_score
+        technical_score = result.technical_score
+        total_score = result.total_score
+        
+        # 총점 6.5점 이상인 종목만 출력
+        if total_score >= 6.5:
+            if result.method is not None:
+                level_text = "매수" if total_score >= 7.5 else "관찰"
+                print(f"📊 {symbol}: CAN SLIM {canslim_score:.2f}점 | 가치 {value_score:.2f}점 | 기술 {technical_score:.2f}점 | 총점 {total_score:.2f}점 ({level_text}) | 가격 ${result.price:.2f}")
+            else:
+                # 신호가 없어도 점수는 출력
+                print(f"ℹ️ {symbol}: CAN SLIM {canslim_score:.2f}점 | 가치 {value_score:.2f}점 | 기술 {technical_score:.2f}점 | 총점 {total_score:.2f}점")
+        
+        # 신호는 CAN SLIM 우선, 없으면 가치투자 → 기술적 분석 (저장할 종목만 생성)
+        if not result.signal_candidate:
+            return None
+        signal = result.signal()
+        
+        # 7.5점 이상이면 매수 신호로 저장
+        if signal and total_score >= 7.5:
+            signal['last_seen'] = signal['date']
+            signal['level'] = 'BUY'
+            self.previous_signals[symbol] = signal
+            print(f"🟢 {symbol}: 7.5점 이상 신호 발견! (CAN SLIM: {canslim_score:.2f}, 가치: {value_score:.2f}, 기술: {technical_score:.2f})")
+            return signal
+        
+        # 6.5점 이상이면 관찰 종목으로 저장 (대시보드 표시용)
+        if signal and total_score >= 6.5:
+            signal['last_seen'] = signal['date']
+            signal['level'] = 'WATCH'
+            self.previous_signals[symbol] = signal
+            return signal
+        
+        # CAN SLIM 점수가 5점 이상이면 관찰 종목으로 반환 (모든 점수 포함)
+        return signal
+    
+    def _refresh_market_regime(self):
+        """스캔 시작 시 주요 지수로 시장 국면 1회 계산 (모든 종목 점수 계산에 공유)"""
+        self.market_regime = market_regime.refresh(timeout=8)
+        if self.market_regime is None:
+            print(f"⚠️ 시장 국면 계산 실패 (지수 데이터 없음) - CAN SLIM M은 기본 점수 사용")
+        else:
+            indexes = ', '.join(f"{state.symbol} {state.status}" for state in self.market_regime.indexes)
+            print(f"🧭 시장 국면: {self.market_regime.label} (분산일 최대 {self.market_regime.distribution_days}일 | {indexes})")
+    
+    def _rank_relative_strength(self, symbols, strength):
+        """배치별로 모은 가중 수익률로 이번 스캔 전체 종목 상대강도 등급 계산 (수집이 끝난 뒤 1회, 일봉을 다시 읽지 않음)"""
+        try:
+            started = time.time()
+            self.rs_ranking = relative_strength.RSRanking(symbols, np.concatenate(strength) if strength else np.empty(0))
+            print(f"📈 상대강도 등급 계산 완료: {len(self.rs_ranking)}개 종목 ({(time.time() - started) * 1000:.0f}ms)")
+        except Exception as e:
+            print(f"⚠️ 상대강도 등급 계산 실패: {str(e)}")
+    
+    def _score_technical(self, frames):
+        """수집 배치의 기술적 점수를 일괄 계산해 technical_scores에 추가 → 지표 상태가 바뀐 종목 수 (실패하면 종목별로 계산)
+
+        저장된 지표 상태에 새 봉만 반영하고, 상태가 없거나 맞지 않는 종목만 패널 모드로 전체 이력을 계산합니다.
+        """
+        try:
+            scores, changed = indicator_state.score_frames(self.indicator_states, frames)
+            self.technical_scores.update(scores)
+            self.changed_indicator_states |= changed
+            return len(changed)
+        except Exception as e:
+            print(f"⚠️ 기술적 점수 일괄 계산 실패 ({len(frames)}개 종목): {str(e)}")
+            return 0
+    
+    def load_rs_ratings(self, rows):
+        """저장된 상대강도 가중 수익률 복원 - rows: {종목: 가중 수익률} (재시작 후 첫 스캔의 등급 분포로 사용)"""
+        symbols = [symbol for symbol, value in rows.items() if value is not None]
+        self.rs_ranking = relative_strength.RSRanking(symbols, np.array([rows[symbol] for symbol in symbols], dtype=np.float64))
+        return len(self.rs_ranking)
+    
+    def load_indicator_states(self, rows):
+        """저장된 지표 상태 복원 - rows: {종목: 상태 딕셔너리} (버전이 다른 상태는 버림)"""
+        states = {symbol: indicator_state.IndicatorState.from_dict(data) for symbol, data in rows.items()}
+        self.indicator_states = {symbol: state for symbol, state in states.items() if state is not None}
+        self.changed_indicator_states = set()
+        return len(self.indicator_states)
+    
+    def pop_changed_indicator_states(self):
+        """마지막 저장 이후 바뀐 지표 상태 - {종목: 상태 딕셔너리} (저장용, 목록은 비움)"""
+        changed, self.changed_indicator_states = self.changed_indicator_states, set()
+        return {symbol: self.indicator_states[symbol].to_dict() for symbol in changed if symbol in self.indicator_states}
+    
+    def _fetch_stage(self, symbols, due, prepare_queue, prepare_workers, results, stats, budget, context=(), hot=0):
+        """수집 단계 - 우선순위 순으로 FETCH_BATCH_SIZE개씩 수집하고 배치마다 바로 준비 단계로 전달
+        
+        symbols의 앞 hot개(hot 등급)는 나머지와 섞지 않고 먼저 수집해, 롱테일을 요청하기 전에 점수 계산까지 넘깁니다.
+        상대강도 등급은 지난 스캔 분포(rs_ranking.reference())에 대해 배치마다 한 번에 매기고, 기술적 점수·유동성·공유 메모리 패널도
+        배치 단위로 만들어 전체 종목 수집을 기다리지 않습니다 (준비 큐가 차면 대기 - 메모리는 배치 몇 개 분량).
+        수집이 끝나면 배치별 가중 수익률로 이번 스캔 전체 분포의 등급을 다시 계산합니다 (저장·다음 스캔 분포용).
+        지난 분포가 없으면 (첫 스캔) 전체 수집 후 등급을 계산하고 준비 단계로 넘깁니다.
+        context는 중단된 스캔에서 이미 완료된 종목이며, 상대강도 등급 분포에만 저장소 일봉으로 포함합니다 (요청·점수 계산 없음).
+        일괄 수집 자체가 실패한 배치의 종목은 오류로 분류해 결과 반영 단계로 바로 넘깁니다.
+        budget이 중단되면 남은 배치는 요청하지 않고, 이미 수집한 배치는 준비 단계로 넘깁니다 (결과 반영 단계가 이 종목까지 기다림).
+        """
+        batch_size = max(config.FETCH_BATCH_SIZE, 1)
+        streaming = self.rs_ranking is not None and len(self.rs_ranking) > 0
+        if streaming:
+            self.rs_ranking = self.rs_ranking.reference()
+        else:
+            print(f"⚠️ 지난 스캔 상대강도 분포 없음 - 전체 종목 수집 후 등급 계산")
+        self.technical_scores = {}
+        self._probes = {}
+        self._skipped_fetch = 0
+        self._probe_failed = 0
+        self._deferred_fetch = 0
+        ranked, strength = [], []
+        held = []
+        changed = 0
+        finished = False
+        batches = [symbols[start:min(start + batch_size, hot)] for start in range(0, hot, batch_size)]
+        batches += [symbols[start:start + batch_size] for start in range(hot, len(symbols), batch_size)]
+        try:
+            for batch in batches:
+                if budget.stopped:
+                    break
+                started = time.time()
+                frames, failed = self._fetch_batch(batch, due)
+                stats.record(time.time() - started, len(batch))
+                self._handed_off += len(failed)
+                for symbol in failed:
+                    results.put((symbol, None))
+                
+                self.priority.observe_liquidity(frames)
+                names, values = relative_strength.strengths(frames)
+                ranked.extend(names)
+                strength.append(values)
+                if streaming:
+                    # 배치 전체를 지난 분포에 대해 한 번에 등급 계산 (종목별 종가 행렬 재계산 없음)
+                    self.rs_ranking.rate_batch(names, values)
+                changed += self._score_technical(frames)
+                self._share_prices(frames)
+                batch = [symbol for symbol in batch if symbol not in failed]
+                if streaming:
+                    self._hand_off(batch, frames, prepare_queue)
                 else:
-                    # 신호가 없어도 점수는 출력
-                    print(f"ℹ️ {symbol}: CAN SLIM {canslim_score:.2f}점 | 가치 {value_score:.2f}점 | 기술 {technical_score:.2f}점 | 총점 {total_score:.2f}점")
-            
-            # 7.5점 이상이면 매수 신호로 저장
-            if signal and total_score >= 7.5:
-                signal['last_seen'] = signal['date']
-                signal['level'] = 'BUY'
-                self.previous_signals[symbol] = signal
-                print(f"🟢 {symbol}: 7.5점 이상 신호 발견! (CAN SLIM: {canslim_score:.2f}, 가치: {value_score:.2f}, 기술: {technical_score:.2f})")
-                return signal
-            
-            # 6.5점 이상이면 관찰 종목으로 저장 (대시보드 표시용)
-            if signal and total_score >= 6.5:
-                signal['last_seen'] = signal['date']
-                signal['level'] = 'WATCH'
-                self.previous_signals[symbol] = signal
-                return signal
-            
-            # CAN SLIM 점수가 5점 이상이면 관찰 종목으로 반환 (모든 점수 포함)
-            if canslim_score >= 5.0:
-                return signal
+                    held.append((batch, frames))
+            else:
+                finished = True
             
+            if self._probes or self._probe_failed:
+                print(f"🔎 최신 봉 확인: {len(self._probes)}개 종목 응답, 변경 없음 {self._skipped_fetch}개 (수집 생략), 확인 실패 {self._probe_failed}개")
+            if self._probe_failed and not self._probes:
+                print(f"⚠️ 최신 봉 확인 요청이 모두 실패 - 변경 없는 종목도 전체 수집 (quote API 응답 확인 필요)")
+            print(f"📐 기술적 점수 일괄 계산 완료: {len(self.technical_scores)}개 종목, 지표 상태 갱신 {changed}개")
+            # 수집이 중간에 멈추면 일부 종목 분포로 바꾸지 않고 지난 분포로 매긴 등급 유지
+            if finished or not streaming:
+                context = list(context)
+                for start in range(0, len(context), batch_size):
+                    names, values = relative_strength.strengths(data_fetcher.read_stored_history(context[start:start + batch_size], config.SCAN_PERIOD))
+                    ranked.extend(names)
+                    strength.append(values)
+                self._rank_relative_strength(ranked, strength)
+            for batch, frames in held:
+                self._hand_off(batch, frames, prepare_queue)
+        finally:
+            for _ in range(prepare_workers):
+                prepare_queue.put(pipeline.STOP)
+            self._fetch_done.set()
+    
+    def _fetch_batch(self, batch, due):
+        """수집 배치 1개 → ({종목: 일봉}, 일괄 수집이 실패한 종목 목록)
+
+        due에 없는 종목(등급별 수집 주기 미도래)과 최신 봉이 지난 스캔과 같은 종목은 요청하지 않고 저장소 일봉을 사용합니다.
+        일괄 수집에서 실패한 종목은 None, 속도 제한으로 받지 못한 종목은 결과에서 빠집니다.
+        """
+        unchanged = self._probe_unchanged([symbol for symbol in batch if symbol in due])
+        deferred = data_fetcher.read_stored_history([symbol for symbol in batch if symbol not in due], config.SCAN_PERIOD)
+        stored = data_fetcher.read_stored_history([symbol for symbol in batch if symbol in unchanged], config.SCAN_PERIOD)
+        self._deferred_fetch += len(deferred)
+        self._skipped_fetch += len(stored)
+        self.priority.record_fetch(stored)
+        frames = {**deferred, **stored}
+        pending = [symbol for symbol in batch if symbol not in frames]
+        if not pending:
+            return frames, []
+        started = time.time()
+        try:
+            fetched = fetch_stock_data_batch(pending, period=config.SCAN_PERIOD, timeout=8)
+        except Exception as e:
+            print(f"⚠️ 일괄 수집 실패 ({len(pending)}개 종목, {pending[0]} 등): {str(e)}")
+            self.telemetry.count(telemetry.ERROR, len(pending))
+            return frames, pending
+        # 종목별 요청 시간 (저장소·캐시에서 읽어 요청하지 않은 종목은 제외)
+        for symbol in pending:
+            seconds = providers.request_seconds(symbol, since=started)
+            if seconds is not None:
+                self.telemetry.observe(telemetry.FETCH, seconds)
+        self.priority.record_fetch(fetched)
+        frames.update(fetched)
+        return frames, []
+    
+    def _hand_off(self, batch, frames, prepare_queue):
+        """수집 배치를 준비 단계로 전달 (넘긴 뒤 일봉은 준비 단계만 참조)"""
+        self._handed_off += len(batch)
+        for symbol in batch:
+            # 속도 제한으로 받지 못한 종목(결과에 없음)은 준비 단계에서 직접 다시 수집
+            prepare_queue.put((symbol, frames.get(symbol), symbol in frames))
+    
+    def _begin_checkpoint(self, symbols, resume=None):
+        """스캔 체크포인트 시작 → 실행 ID (저장소가 없거나 실패하면 None)
+
+        resume이 있으면 그 실행을 이어서 기록합니다.
+        """
+        if self.checkpoint_store is None:
             return None
-            
-        except YFRateLimitError:
-            # API 제한 시 조용히 대기 (로그 없음)
-            time.sleep(10)
+        if resume is not None:
+            return resume['id']
+        try:
+            return self.checkpoint_store.start_scan_run(symbols)
+        except Exception as e:
+            print(f"⚠️ 스캔 체크포인트 시작 실패: {str(e)} - 체크포인트 없이 스캔")
             return None
+    
+    def _save_checkpoint(self, run_id, rows):
+        """완료된 종목 결과를 체크포인트로 저장 (실패해도 스캔은 계속)"""
+        if run_id is None or not rows:
+            return
+        try:
+            self.checkpoint_store.save_scan_checkpoint(run_id, rows)
         except Exception as e:
-            # 모든 오류는 조용히 무시 (로그 없음)
+            print(f"⚠️ 스캔 체크포인트 저장 실패: {str(e)}")
+    
+    def _restore_checkpoint(self, resume):
+        """중단된 스캔의 체크포인트 복원 → (남은 종목, 완료된 종목)
+
+        완료된 종목의 신호(6.5점 이상)는 previous_signals로 복원하고 다시 수집·계산하지 않습니다.
+        """
+        results = resume['results']
+        for symbol, signal in results.items():
+            if signal and signal.get('total_score', signal.get('score', 0)) >= 6.5:
+                self.previous_signals[symbol] = signal
+        remaining = [symbol for symbol in resume['symbols'] if symbol not in results]
+        print(f"🔁 중단된 스캔 재개 (시작 {resume['started_at']}): {len(results)}개 종목은 체크포인트에서 복원, 남은 {len(remaining)}개 종목만 스캔")
+        return remaining, list(results)
+    
+    def _prefilter(self, symbols):
+        """스크리너 메타데이터로 가격·거래대금·시가총액 사전 필터 → (통과 종목, 제외 종목 수)
+
+        제외된 종목은 일봉·재무 지표를 요청하지 않습니다. 메타데이터를 받지 못하면 필터 없이 전체 스캔합니다.
+        """
+        try:
+            started = time.time()
+            metadata = symbol_fetcher.get_universe_metadata()
+            if metadata is None:
+                print(f"⚠️ 종목 메타데이터 없음 - 사전 필터 생략")
+                return symbols, 0
+            kept, removed = symbol_fetcher.prefilter(symbols, metadata)
+            print(f"🧹 사전 필터: {len(removed)}개 종목 제외 (주가 ${config.PREFILTER_MIN_PRICE:g} 미만, 거래대금 ${config.PREFILTER_MIN_DOLLAR_VOLUME:,.0f} 미만, 시가총액 ${config.PREFILTER_MIN_MARKET_CAP:,.0f} 미만) → {len(kept)}개 스캔 ({(time.time() - started) * 1000:.0f}ms)")
+            return kept, len(removed)
+        except Exception as e:
+            print(f"⚠️ 사전 필터 실패: {str(e)} - 전체 종목 스캔")
+            return symbols, 0
+    
+    def _probe_unchanged(self, symbols):
+        """최신 봉 확인(quote 일괄 조회) 값이 지난 스캔과 같은 종목 집합 - 수집하지 않고 저장소 일봉 사용
+
+        확인 값은 이번 스캔 결과와 함께 저장해 다음 스캔에서 비교합니다 (SCAN_SKIP_UNCHANGED=0이면 확인하지 않음).
+        """
+        if not config.SCAN_SKIP_UNCHANGED or not symbols:
+            return set()
+        try:
+            failed = []
+            probes = data_fetcher.probe_latest(symbols, timeout=8, failed=failed)
+            self._probe_failed += len(failed)
+            self._probes.update(probes)
+            return {
+                symbol for symbol in symbols
+                if symbol.upper() in probes and symbol in self.score_cache
+                and self.score_cache[symbol].probe == probes[symbol.upper()]
+            }
+        except Exception as e:
+            self._probe_failed += len(symbols)
+            print(f"⚠️ 최신 봉 확인 실패: {str(e)} - 배치 전체 수집")
+            return set()
+    
+    def _reuse_score(self, job):
+        """입력 해시가 지난 계산과 같으면 저장된 ScoreResult (없으면 None - 점수 계산 필요)"""
+        cached = self.score_cache.get(job.symbol)
+        if cached is None or cached.key != job.key:
             return None
+        self.score_cache[job.symbol] = cached._replace(probe=self._probes.get(job.symbol.upper()))
+        return cached.result
+    
+    def _remember_score(self, job, result):
+        if result is not None:
+            self.score_cache[job.symbol] = CachedScore(self._probes.get(job.symbol.upper()), job.key, result)
+    
+    def _share_prices(self, frames):
+        """점수 계산을 프로세스 풀에서 하면 수집 배치 일봉을 공유 메모리 패널에 복사 (배치 종목 결과가 모두 나오면 해제)"""
+        if self._get_score_pool() is None:
+            return
+        panel = shared_panel.create(frames)
+        if panel is None:
+            print(f"⚠️ 공유 메모리 패널 생성 실패 - 점수 계산 작업에 일봉 배열을 직접 전달 ({len(frames)}개 종목)")
+            return
+        with self._panel_lock:
+            self._price_panels[panel.name] = [panel, len(panel.slices)]
+            for symbol in panel.slices:
+                self._panel_names[symbol] = panel.name
+    
+    def _panel_slice(self, symbol, length):
+        """종목의 공유 메모리 패널 위치 (패널이 없으면 None - 배열을 직접 전달)"""
+        with self._panel_lock:
+            entry = self._price_panels.get(self._panel_names.get(symbol))
+        return entry[0].slice(symbol, length) if entry is not None else None
+    
+    def _release_panel(self, symbol):
+        """종목 결과를 받은 뒤 호출 - 배치의 모든 종목 결과가 나왔으면 그 배치의 패널 해제"""
+        with self._panel_lock:
+            name = self._panel_names.pop(symbol, None)
+            entry = self._price_panels.get(name)
+            if entry is None:
+                return
+            entry[1] -= 1
+            if entry[1] > 0:
+                return
+            del self._price_panels[name]
+        entry[0].close()
+    
+    def _release_prices(self):
+        """남은 공유 메모리 패널 모두 해제 (스캔 종료 시)"""
+        with self._panel_lock:
+            panels, self._price_panels, self._panel_names = self._price_panels, {}, {}
+        for panel, _ in panels.values():
+            panel.close()
+    
+    def _get_score_pool(self):
+        """점수 계산 프로세스 풀 (처음 필요할 때 생성해 스캔 간 재사용, 없으면 None - 스레드에서 계산)"""
+        if self._score_pool is None and not self._score_pool_failed:
+            self._score_pool = pipeline.create_process_pool(pipeline.score_processes())
+            self._score_pool_failed = self._score_pool is None
+        return self._score_pool
+    
+    def _drop_score_pool(self):
+        """고장 난 프로세스 풀 정리 (다음 스캔에서 다시 생성)"""
+        pool, self._score_pool = self._score_pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+    
+    def _score_stage(self, score_queue, results, stats, budget):
+        """점수 계산 단계 (CPU) - 작업을 SCORE_BATCH_SIZE개씩 묶어 프로세스 풀에서 계산하고 결과 큐로 전달
+        
+        큐에 쌓인 작업만 묶으므로 (묶음이 찰 때까지 기다리지 않음) 첫 결과가 늦어지지 않습니다.
+        동시에 계산 중인 작업은 PIPELINE_QUEUE_SIZE개 정도로 제한하고, 프로세스 풀을 쓸 수 없으면 이 스레드에서 계산합니다.
+        budget이 중단돼도 이미 수집한 종목의 작업은 계산하고, 결과 반영 단계가 close()하면 새 작업은 버리고 대기 중인 묶음은 취소합니다.
+        """
+        batch_size = max(config.SCORE_BATCH_SIZE, 1)
+        slots = threading.Semaphore(max(config.PIPELINE_QUEUE_SIZE // batch_size, 1))
+        submitted = set()
+        
+        def finish(jobs, future):
+            submitted.discard(future)
+            if future.cancelled() or budget.closed:
+                slots.release()
+                return
+            try:
+                (scores, reasons, seconds), busy = future.result()
+            except Exception:
+                # 프로세스 풀 오류 - 이 묶음만 콜백 스레드에서 다시 계산
+                (scores, reasons, seconds), busy = pipeline.timed(scoring.evaluate_batch, jobs)
+            deliver(jobs, scores, reasons, seconds, busy)
+        
+        def deliver(jobs, scores, reasons, seconds, busy):
+            stats.record(busy, len(jobs))
+            # 종목별 계산 시간은 작업 프로세스에서 측정
+            for elapsed in seconds.tolist():
+                self.telemetry.observe(telemetry.SCORE, elapsed)
+            for job, result in zip(jobs, scoring.unpack_batch(jobs, scores, reasons)):
+                self._remember_score(job, result)
+                results.put((job.symbol, result))
+            slots.release()
+        
+        stopped = False
+        while not stopped:
+            jobs = [score_queue.get()]
+            while len(jobs) < batch_size and jobs[-1] is not pipeline.STOP:
+                try:
+                    jobs.append(score_queue.get_nowait())
+                except queue.Empty:
+                    break
+            if jobs[-1] is pipeline.STOP:
+                stopped = True
+                jobs.pop()
+            if budget.closed:
+                for future in list(submitted):
+                    future.cancel()
+                continue
+            if not jobs:
+                continue
+            slots.acquire()
+            pool = self._get_score_pool()
+            if pool is not None:
+                try:
+                    future = pool.submit(pipeline.timed, scoring.evaluate_batch, jobs)
+                    submitted.add(future)
+                    future.add_done_callback(lambda future, jobs=jobs: finish(jobs, future))
+                    continue
+                except Exception:
+                    self._drop_score_pool()
+            (scores, reasons, seconds), busy = pipeline.timed(scoring.evaluate_batch, jobs)
+            deliver(jobs, scores, reasons, seconds, busy)
+    
+    def cancel_scan(self, reason=pipeline.CANCELLED):
+        """진행 중인 스캔 중단 요청 - 스캔이 없으면 False (처리된 종목 결과는 반영하고 부분 스캔으로 종료)"""
+        budget = self.scan_budget
+        if budget is None:
+            return False
+        budget.cancel(reason)
+        return True
     
     def scan_once(self, symbols, timeframe='short_swing', max_workers=20):
         """한 번 스캔 실행"""
         return self.scan_once_with_realtime(symbols, timeframe, max_workers, None)
     
-    def scan_once_with_realtime(self, symbols, timeframe='short_swing', max_workers=20, progress_callback=None):
-        """실시간 업데이트가 있는 스캔 실행"""
+    def scan_once_with_realtime(self, symbols, timeframe='short_swing', max_workers=20, progress_callback=None, resume=None):
+        """실시간 업데이트가 있는 스캔 실행
+
+        완료된 종목은 SCAN_CHECKPOINT_SIZE개마다 checkpoint_store에 저장합니다.
+        resume: 중단된 스캔 (Database.get_interrupted_scan 결과) - 남은 종목만 스캔 (symbols는 무시)
+        SCAN_DEADLINE_MINUTES가 지나거나 cancel_scan()이 호출되면 남은 종목은 수집하지 않고,
+        이미 수집한 종목까지 처리한 뒤 부분 스캔으로 종료합니다 (처리 비율은 coverage).
+        """
         new_signals = []
         min_score = 7.5
         failed_count = 0
         
-        print(f"📊 스캔 시작: {len(symbols)}개 종목")
+        budget = self.scan_budget = pipeline.ScanBudget(config.SCAN_DEADLINE_MINUTES * 60)
+        scan_started = budget.started
+        scan_telemetry = self.telemetry = telemetry.ScanTelemetry()
+        first_signal_time = None
+        self._handed_off = 0
+        self._fetch_done = threading.Event()
+        print(f"📊 스캔 시작: {len(symbols) if resume is None else len(resume['symbols'])}개 종목")
+        if resume is None:
+            symbols, prefiltered = self._prefilter(symbols)
+            scan_telemetry.count(telemetry.FILTERED, prefiltered)
+            restored = []
+        else:
+            # 사전 필터는 중단된 스캔 시작 시 이미 적용됨
+            symbols, restored = self._restore_checkpoint(resume)
+            prefiltered = 0
+        self._refresh_market_regime()
+        
+        # 지난 신호·고득점·유동성 상위 종목부터 수집·점수 계산 (등급별 수집 주기가 안 된 종목은 저장소 일봉 사용)
+        symbols, due, tiers = self.priority.plan(symbols, self.previous_signals)
+        run_id = self._begin_checkpoint(symbols, resume)
+        checkpoint_rows = []
+        print(f"🎯 스캔 순서: 우선순위 순 (hot {tiers[priority.HOT]}개, warm {tiers[priority.WARM]}개, cold {tiers[priority.COLD]}개 | 이번 수집 대상 {len(due)}개) - 상위: {', '.join(symbols[:5])}")
         print(f"⏳ 첫 번째 종목 처리 중... (잠시만 기다려주세요)")
-        print(f"🔧 ThreadPoolExecutor 생성: max_workers={max_workers}")
+        processes = pipeline.score_processes()
+        print(f"🔧 파이프라인 생성: 준비 스레드 {max_workers}개, 점수 계산 프로세스 {processes or '없음 (스레드에서 계산)'}개, 단계 사이 대기 최대 {config.PIPELINE_QUEUE_SIZE}개")
         
+        stages = [pipeline.StageStats(name) for name in ('수집', '준비', '점수 계산', '결과 반영')]
+        fetch_stats, prepare_stats, score_stats, sink_stats = stages
+        reuse_stats = pipeline.StageStats('재사용')
+        partial = False
+        stop_reason = None
         try:
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                print(f"✅ ThreadPoolExecutor 시작됨, 작업 제출 중...")
-                # 모든 작업 제출
-                future_to_symbol = {
-                    executor.submit(self.scan_symbol, symbol): symbol
-                    for symbol in symbols
-                }
-                print(f"✅ {len(future_to_symbol)}개 작업 제출 완료, 결과 대기 중...")
-                print(f"⏰ 첫 번째 결과를 기다리는 중... (타임아웃: 8초)")
-                
-                completed = 0
-                start_time = time.time()
-                last_print_time = start_time
-                first_result_time = None
-                first_wait_start = time.time()
-                waiting_printed_5s = False
-                waiting_printed_10s = False
-                
-                for future in as_completed(future_to_symbol):
+            # 수집(비동기 엔진, 배치) → 준비(재무 지표 등 I/O, 스레드) → 점수 계산(CPU, 프로세스 풀) → 결과 반영(현재 스레드)
+            prepare_queue = queue.Queue(maxsize=max(config.PIPELINE_QUEUE_SIZE, 1))
+            score_queue = queue.Queue(maxsize=max(config.PIPELINE_QUEUE_SIZE, 1))
+            results = queue.Queue()
+            
+            def prepare(item):
+                symbol, data, received = item
+                started = time.time()
+                if budget.closed:
+                    return
+                if budget.stopped and not received:
+                    # 중단 후에는 속도 제한으로 받지 못한 종목을 다시 수집하지 않음
+                    self.telemetry.count(telemetry.THROTTLED)
+                    results.put((symbol, None))
+                    return
+                job = self._prepare(symbol, data, received)
+                prepare_stats.record(time.time() - started)
+                if job is None:
+                    results.put((symbol, None))
+                    return
+                # 입력이 지난 스캔과 같으면 점수 계산 생략
+                cached = self._reuse_score(job)
+                if cached is not None:
+                    reuse_stats.record(0.0)
+                    results.put((symbol, cached))
+                else:
+                    score_queue.put(job)
+            
+            pipeline.start_stage('prepare', max_workers, prepare_queue, prepare,
+                                 on_stop=lambda: score_queue.put(pipeline.STOP))
+            threading.Thread(target=self._score_stage, args=(score_queue, results, score_stats, budget), daemon=True).start()
+            threading.Thread(
+                target=self._fetch_stage,
+                args=(symbols, due, prepare_queue, max_workers, results, fetch_stats, budget, restored, tiers[priority.HOT]),
+                daemon=True
+            ).start()
+            print(f"✅ {len(symbols)}개 종목 수집 시작 (배치 {config.FETCH_BATCH_SIZE}개, 동시 요청 {config.FETCH_CONCURRENCY}개), 결과 대기 중...")
+            print(f"⏰ 첫 번째 결과를 기다리는 중... (타임아웃: 8초)")
+            
+            completed = 0
+            start_time = time.time()
+            last_print_time = start_time
+            first_result_time = None
+            first_wait_start = time.time()
+            waiting_printed_5s = False
+            waiting_printed_10s = False
+            waiting_printed_15s = False
+            
+            # 시간 예산·취소는 결과를 기다리는 동안에도 확인 (중단되면 이미 수집한 종목 결과까지만 기다림)
+            while completed < len(symbols):
+                if budget.stopped and self._fetch_done.is_set() and completed >= self._handed_off:
+                    break
+                try:
+                    symbol, result = results.get(timeout=budget.poll_timeout())
+                except queue.Empty:
                     # 첫 번째 결과 대기 시간 체크
                     if first_result_time is None:
                         elapsed = time.time() - first_wait_start
@@ -197,75 +694,112 @@ class StockMonitor:
                         elif elapsed > 10 and not waiting_printed_10s:
                             print(f"⚠️ 첫 번째 결과가 10초 이상 지연 중... (yfinance API 응답 지연 또는 차단 가능)")
                             waiting_printed_10s = True
-                        elif elapsed > 15:
+                        elif elapsed > 15 and not waiting_printed_15s:
                             print(f"❌ 첫 번째 결과가 15초 이상 지연 중... API가 차단되었을 가능성이 높습니다.")
-                    
-                    if first_result_time is None:
-                        first_result_time = time.time()
-                        wait_time = first_result_time - start_time
-                        print(f"✅ 첫 번째 결과 수신! (대기 시간: {wait_time:.1f}초)")
-                    
-                    completed += 1
-                    symbol = future_to_symbol[future]
-                    
-                    try:
-                        signal = future.result()
-                        if signal:
-                            total_score = signal.get('total_score', signal.get('score', 0))
+                            waiting_printed_15s = True
+                    continue
+                
+                if first_result_time is None:
+                    first_result_time = time.time()
+                    wait_time = first_result_time - start_time
+                    print(f"✅ 첫 번째 결과 수신! (대기 시간: {wait_time:.1f}초)")
+                
+                completed += 1
+                self._release_panel(symbol)
+                
+                try:
+                    # 결과 반영 단계 - previous_signals 갱신은 이 스레드에서만
+                    started = time.time()
+                    signal = self._record(symbol, result)
+                    self.priority.record_score(symbol, result.total_score if result is not None else None)
+                    # 체크포인트 - 재시작 시 이 종목은 다시 수집·계산하지 않음
+                    checkpoint_rows.append((symbol, result.total_score if result is not None else None, signal))
+                    if len(checkpoint_rows) >= max(config.SCAN_CHECKPOINT_SIZE, 1):
+                        self._save_checkpoint(run_id, checkpoint_rows)
+                        checkpoint_rows = []
+                    sink_stats.record(time.time() - started)
+                    scan_telemetry.observe(telemetry.PERSIST, time.time() - started)
+                    if result is not None:
+                        scan_telemetry.count(telemetry.SCORED)
+                    if signal:
+                        total_score = signal.get('total_score', signal.get('score', 0))
+                        
+                        # 6.5점 이상인 모든 신호를 실시간으로 표시
+                        if total_score >= 6.5:
+                            if first_signal_time is None:
+                                first_signal_time = time.time() - scan_started
+                            # 새로운 신호인지 확인
+                            is_new = symbol not in self.previous_signals
+                            is_higher_score = not is_new and self.previous_signals[symbol].get('total_score', self.previous_signals[symbol].get('score', 0)) < total_score
                             
-                            # 6.5점 이상인 모든 신호를 실시간으로 표시
-                            if total_score >= 6.5:
-                                # 새로운 신호인지 확인
-                                is_new = symbol not in self.previous_signals
-                                is_higher_score = not is_new and self.previous_signals[symbol].get('total_score', self.previous_signals[symbol].get('score', 0)) < total_score
-                                
-                                if is_new or is_higher_score:
-                                    new_signals.append(signal)
-                                    # 신호 발견 시 즉시 출력
-                                    level_text = "매수" if total_score >= 7.5 else "관찰"
-                                    print(f"🟢 신호 발견: {symbol} ({total_score:.1f}점, {level_text}) - 가격: ${signal.get('price', 0):.2f}")
-                                
-                                # 6.5점 이상인 모든 신호를 실시간 콜백으로 전달 (웹에서 즉시 표시)
-                                if progress_callback:
-                                    progress_callback(completed, len(symbols), signal)
-                        else:
-                            failed_count += 1
-                    except Exception as e:
-                        failed_count += 1
-                        pass
-                    
-                    # 진행률 출력 및 콜백
-                    current_time = time.time()
-                    time_since_last_print = current_time - last_print_time
-                    
-                    should_print = False
-                    # 처음 10개는 즉시 출력
-                    if completed <= 10:
-                        should_print = True
-                    # 10개 이후는 25개마다 또는 10초마다
-                    elif completed <= 100:
-                        should_print = (completed % 25 == 0) or (time_since_last_print >= 10)
-                    # 100개 이후는 50개마다 또는 15초마다
+                            if is_new or is_higher_score:
+                                new_signals.append(signal)
+                                # 신호 발견 시 즉시 출력
+                                level_text = "매수" if total_score >= 7.5 else "관찰"
+                                print(f"🟢 신호 발견: {symbol} ({total_score:.1f}점, {level_text}) - 가격: ${signal.get('price', 0):.2f}")
+                            
+                            # 6.5점 이상인 모든 신호를 실시간 콜백으로 전달 (웹에서 즉시 표시)
+                            if progress_callback:
+                                progress_callback(completed, len(symbols), signal)
                     else:
-                        should_print = (completed % 50 == 0) or (time_since_last_print >= 15)
-                    
-                    if should_print:
-                        last_print_time = current_time
-                        success_rate = ((completed - failed_count) / completed * 100) if completed > 0 else 0
-                        percent = completed * 100 // len(symbols) if len(symbols) > 0 else 0
-                        elapsed = current_time - start_time
-                        remaining = (elapsed / completed * (len(symbols) - completed)) if completed > 0 else 0
-                        print(f"📊 진행률: {completed}/{len(symbols)} ({percent}%) | 성공: {completed - failed_count}개, 실패: {failed_count}개 | 성공률: {success_rate:.1f}% | 예상 남은 시간: {remaining/60:.1f}분")
-                        if progress_callback:
-                            progress_callback(completed, len(symbols), None)
+                        failed_count += 1
+                except Exception as e:
+                    failed_count += 1
+                    pass
+                
+                # 진행률 출력 및 콜백
+                current_time = time.time()
+                time_since_last_print = current_time - last_print_time
+                
+                should_print = False
+                # 처음 10개는 즉시 출력
+                if completed <= 10:
+                    should_print = True
+                # 10개 이후는 25개마다 또는 10초마다
+                elif completed <= 100:
+                    should_print = (completed % 25 == 0) or (time_since_last_print >= 10)
+                # 100개 이후는 50개마다 또는 15초마다
+                else:
+                    should_print = (completed % 50 == 0) or (time_since_last_print >= 15)
+                
+                if should_print:
+                    last_print_time = current_time
+                    success_rate = ((completed - failed_count) / completed * 100) if completed > 0 else 0
+                    percent = completed * 100 // len(symbols) if len(symbols) > 0 else 0
+                    elapsed = current_time - start_time
+                    remaining = (elapsed / completed * (len(symbols) - completed)) if completed > 0 else 0
+                    print(f"📊 진행률: {completed}/{len(symbols)} ({percent}%) | 성공: {completed - failed_count}개, 실패: {failed_count}개 | 성공률: {success_rate:.1f}% | 예상 남은 시간: {remaining/60:.1f}분")
+                    if progress_callback:
+                        progress_callback(completed, len(symbols), None)
+            
+            # 처리된 종목까지 체크포인트 저장 후 정리 (시간 예산 초과·취소면 부분 스캔으로 기록)
+            budget.close()
+            partial = completed < len(symbols)
+            if partial:
+                stop_reason = budget.reason
+                print(f"⏹️ 스캔 중단 ({'시간 예산 초과' if budget.reason == pipeline.DEADLINE else '취소 요청'}): 이미 수집한 종목까지 {completed}/{len(symbols)}개 처리, 남은 {len(symbols) - completed}개 종목은 수집하지 않음")
+            self._save_checkpoint(run_id, checkpoint_rows)
+            if run_id is not None:
+                try:
+                    self.checkpoint_store.finish_scan_run(run_id, 'partial' if partial else 'completed')
+                except Exception as e:
+                    print(f"⚠️ 스캔 체크포인트 정리 실패: {str(e)}")
         except Exception as e:
-            print(f"❌ ThreadPoolExecutor 실행 중 오류: {str(e)}")
+            print(f"❌ 스캔 파이프라인 실행 중 오류: {str(e)}")
             import traceback
             traceback.print_exc()
+            # 남은 단계 스레드는 작업을 버리고 종료
+            budget.cancel()
+            budget.close()
             completed = 0
             failed_count = len(symbols)
             new_signals = []
             filtered_signals = []
+        finally:
+            # 모든 결과를 받은 뒤 (또는 중단 후) 남은 공유 메모리 패널 해제
+            self.scan_budget = None
+            budget.close()
+            self._release_prices()
         
         # 히스토리 저장
         if self.save_history:
@@ -289,8 +823,48 @@ class StockMonitor:
         print(f"   - 실패: {failed_count}개 (상장폐지/데이터없음)")
         print(f"   - 새로운 신호: {len(filtered_signals)}개 (7.5점 이상)")
         print(f"   - 소요 시간: {elapsed_time/60:.1f}분 ({elapsed_time:.0f}초)")
+        coverage = completed / len(symbols) if symbols else 1.0
+        if partial:
+            print(f"   - 부분 스캔: {'시간 예산 초과' if stop_reason == pipeline.DEADLINE else '취소'} - 처리 {completed}/{len(symbols)}개 ({coverage:.0%}), 시간 예산 {config.SCAN_DEADLINE_MINUTES:g}분")
         print(f"   - 평균 속도: {avg_time_per_symbol:.2f}초/종목")
+        metrics = rate_limiter.get_metrics()
+        print(f"   - 요청 속도: 현재 {metrics['rate']:.1f}/초 (최대 {metrics['max_rate']:.0f}/초) | 속도 제한 {metrics['throttle_events']}회 (429/403 응답 {metrics['throttled_responses']}개)")
+        # 제외된 종목도 이번 스캔의 종목당 평균 시간만큼 걸렸을 것으로 추정
+        prefilter_saved = avg_time_per_symbol * prefiltered
+        print(f"   - 사전 필터 제외: {prefiltered}개 (예상 절약 시간 약 {prefilter_saved:.0f}초)")
+        print(f"   - 첫 신호까지: {f'{first_signal_time:.1f}초' if first_signal_time is not None else '신호 없음'}")
+        print(f"   - 결과 재사용: {reuse_stats.count}개 (수집 생략: 변경 없음 {self._skipped_fetch}개, 수집 주기 미도래 {self._deferred_fetch}개) | 재계산: {score_stats.count}개")
+        print(f"   - 단계별 처리량:")
+        for stats in stages:
+            print(f"      · {stats.summary()}")
+        scan_summary = scan_telemetry.summary()
+        print(f"   - 종목당 단계 소요 시간 (가장 오래 걸린 단계: {scan_summary['dominant_stage'] or '없음'}) / 결과 분류:")
+        for line in telemetry.format_summary(scan_summary):
+            print(f"      · {line}")
         print(f"{'='*50}\n")
         
+        self.last_scan_metrics = {
+            'run_id': run_id,  # scan_runs ID (상대강도 등급·시장 국면 저장 기준, 체크포인트 저장소가 없으면 None)
+            'status': 'partial' if partial else 'completed',
+            'stop_reason': stop_reason,
+            'symbols': len(symbols),
+            'completed': completed,
+            'coverage': coverage,
+            'failed': failed_count,
+            'elapsed': time.time() - scan_started,
+            'time_to_first_signal': first_signal_time,
+            'prefiltered': prefiltered,
+            'resumed': len(restored),
+            'prefilter_saved': prefilter_saved,
+            'tiers': tiers,
+            'fetch_due': len(due),
+            'reused': reuse_stats.count,
+            'recomputed': score_stats.count,
+            'skipped_fetch': self._skipped_fetch,
+            'probe_failed': self._probe_failed,
+            'deferred_fetch': self._deferred_fetch,
+            'throughput': completed / elapsed_time if elapsed_time > 0 else 0.0,
+            'telemetry': scan_summary
+        }
         return filtered_signals
 
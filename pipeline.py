@@ -0,0 +1,133 @@
+"""스캔 파이프라인 - 수집 → 준비 → 점수 계산 → 결과 반영 단계 연결
+
+단계 사이는 크기가 제한된 큐로 연결해 뒷단계가 밀리면 앞단계가 기다립니다 (스캔 중 메모리 일정).
+I/O 단계(일봉 수집, 재무 지표 조회)는 스레드로 동시에 많이 실행하고, CPU 단계(점수 계산)는
+CPU 코어 수만큼의 프로세스 풀에서 실행해 점수 계산이 GIL을 잡고 I/O 스레드를 굶기지 않게 합니다.
+"""
+import os
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import config
+
+# 단계 종료 표시 (큐에 넣으면 그 단계 스레드 1개가 종료)
+STOP = object()
+
+# 스캔 중단 사유
+DEADLINE = 'deadline'
+CANCELLED = 'cancelled'
+
+class ScanBudget:
+    """스캔 시간 예산과 취소 토큰 - 마감 시각이 지나거나 cancel()이 호출되면 stopped
+
+    stopped이면 수집 단계는 남은 배치를 요청하지 않고, 이미 수집한 종목은 준비·점수 계산·결과 반영까지 마칩니다.
+    결과 반영 단계는 poll_timeout()마다 깨어나 확인하고, 더 기다리지 않을 때 close()해 다른 단계의 남은 작업을 버리게 합니다.
+    """
+    POLL_SECONDS = 1.0
+
+    def __init__(self, seconds=0):
+        """seconds: 시간 예산 (초, 0 이하면 제한 없음 - 취소만 가능)"""
+        self.started = time.time()
+        self.deadline = self.started + seconds if seconds > 0 else None
+        self.reason = None
+        self._stopped = threading.Event()
+        self._closed = threading.Event()
+
+    def cancel(self, reason=CANCELLED):
+        """스캔 중단 요청 (처음 요청한 사유만 기록)"""
+        if not self._stopped.is_set():
+            self.reason = reason
+            self._stopped.set()
+
+    @property
+    def stopped(self):
+        if not self._stopped.is_set() and self.deadline is not None and time.time() >= self.deadline:
+            self.cancel(DEADLINE)
+        return self._stopped.is_set()
+
+    def close(self):
+        """결과 반영 단계가 더 기다리지 않음 (스캔 종료·오류) - 준비·점수 계산 단계는 남은 작업을 버림"""
+        self._closed.set()
+
+    @property
+    def closed(self):
+        return self._closed.is_set()
+
+    def poll_timeout(self):
+        """결과 대기 시간 - 취소 확인 주기와 남은 시간 중 짧은 쪽 (중단 후에는 확인 주기)"""
+        if self.deadline is None or self._stopped.is_set():
+            return self.POLL_SECONDS
+        return max(min(self.deadline - time.time(), self.POLL_SECONDS), 0.01)
+
+class StageStats:
+    """단계별 처리량 - 처리 수, 작업 시간 합, 첫 작업부터 마지막 작업 완료까지 경과 시간"""
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.busy = 0.0
+        self.first = None
+        self.last = None
+        self._lock = threading.Lock()
+
+    def record(self, busy, count=1):
+        """작업 완료 기록 - busy: 작업에 걸린 시간 (초)"""
+        now = time.time()
+        with self._lock:
+            self.count += count
+            self.busy += busy
+            if self.first is None:
+                self.first = now - busy
+            self.last = now
+
+    def summary(self):
+        elapsed = (self.last - self.first) if self.first is not None else 0.0
+        rate = self.count / elapsed if elapsed > 0 else 0.0
+        return f"{self.name} {self.count}개 | {rate:.1f}개/초 | 경과 {elapsed:.1f}초 (작업 시간 합 {self.busy:.1f}초)"
+
+def score_processes():
+    """점수 계산 프로세스 수 (SCORE_PROCESSES가 0이면 CPU 코어 수, 음수면 0 - 프로세스 풀 사용 안 함)"""
+    if config.SCORE_PROCESSES < 0:
+        return 0
+    return config.SCORE_PROCESSES or os.cpu_count() or 1
+
+def create_process_pool(processes):
+    """점수 계산 프로세스 풀 - 실패하거나 processes가 0이면 None
+
+    spawn 방식으로 시작합니다 (스케줄러·웹 서버 스레드가 있는 프로세스를 fork하지 않음).
+    """
+    if processes <= 0:
+        return None
+    try:
+        return ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn'))
+    except Exception:
+        return None
+
+def timed(func, arg):
+    """func(arg) 결과와 걸린 시간 (프로세스 풀 작업 - 작업 시간만 따로 측정)"""
+    started = time.perf_counter()
+    result = func(arg)
+    return result, time.perf_counter() - started
+
+def start_stage(name, count, source, handler, on_stop=None):
+    """source 큐를 처리하는 스레드 count개 시작 - 각 스레드는 STOP을 받으면 종료하고, 마지막 스레드가 on_stop() 호출"""
+    remaining = [count]
+    lock = threading.Lock()
+
+    def run():
+        while True:
+            item = source.get()
+            if item is STOP:
+                break
+            handler(item)
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last and on_stop is not None:
+            on_stop()
+
+    threads = [threading.Thread(target=run, name=f'{name}-{i}', daemon=True) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
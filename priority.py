@@ -0,0 +1,146 @@
+"""스캔 우선순위 - 신호 가능성이 높은 종목부터 수집·점수 계산
+
+종목별 마지막 점수, 점수 변화(모멘텀), 유동성(20일 평균 거래대금), 마지막 스캔 후 경과 시간으로
+우선순위를 매기고, 지난 신호(매수·관찰) 종목은 항상 맨 앞에 둡니다.
+
+등급별 수집 주기:
+    hot  - 지난 신호 종목 또는 마지막 점수 6.5점 이상: 매 스캔 수집
+    warm - 마지막 점수 5점 이상 또는 유동성 상위 20%: SCAN_WARM_HOURS마다 수집
+    cold - 나머지: SCAN_COLD_HOURS마다 수집
+주기가 안 된 종목은 요청하지 않고 저장소 일봉으로 점수만 계산합니다 (전체 종목 상대강도 등급 유지).
+종목별 기록은 스캔이 끝나면 DB(scan_priorities)에 저장하고 서버 시작 시 복원합니다 (재시작 후에도 주기 유지).
+"""
+import time
+import numpy as np
+import config
+
+HOT, WARM, COLD = 'hot', 'warm', 'cold'
+
+# 우선순위 가중치 (각 항목은 0-1로 정규화)
+SCORE_WEIGHT = 0.5
+MOMENTUM_WEIGHT = 0.2
+LIQUIDITY_WEIGHT = 0.2
+STALENESS_WEIGHT = 0.1
+
+HOT_SCORE = 6.5
+WARM_SCORE = 5.0
+WARM_LIQUIDITY = 0.8  # 유동성 백분위 (상위 20%)
+STALE_HOURS = 24  # 이 시간 이상 스캔하지 않은 종목은 경과 시간 항목 최대
+
+class SymbolRecord:
+    """종목별 스캔 기록"""
+    __slots__ = ('score', 'previous_score', 'liquidity', 'scanned_at', 'fetched_at')
+
+    def __init__(self):
+        self.score = None
+        self.previous_score = None
+        self.liquidity = None
+        self.scanned_at = None
+        self.fetched_at = None
+
+class PriorityScheduler:
+    """스캔 순서와 등급별 수집 주기 결정 (StockMonitor가 스캔마다 갱신)"""
+
+    def __init__(self):
+        self.records = {}
+
+    def _record(self, symbol):
+        record = self.records.get(symbol)
+        if record is None:
+            record = self.records[symbol] = SymbolRecord()
+        return record
+
+    def load(self, rows):
+        """저장된 기록 복원 - rows: [(종목, 점수, 이전 점수, 유동성, 스캔 시각, 수집 시각), ...] → 복원한 종목 수"""
+        for symbol, *values in rows:
+            record = self._record(symbol)
+            record.score, record.previous_score, record.liquidity, record.scanned_at, record.fetched_at = values
+        return len(rows)
+
+    def rows(self):
+        """저장용 기록 목록 - [(종목, 점수, 이전 점수, 유동성, 스캔 시각, 수집 시각), ...]"""
+        return [
+            (symbol, record.score, record.previous_score, record.liquidity, record.scanned_at, record.fetched_at)
+            for symbol, record in list(self.records.items())
+        ]
+
+    def observe_liquidity(self, frames):
+        """수집한 일봉의 20일 평균 거래대금 기록 - frames: {종목: 일봉}"""
+        for symbol, frame in frames.items():
+            if frame is None or len(frame) == 0:
+                continue
+            try:
+                close = frame['Close'].to_numpy(dtype=np.float64)
+                volume = frame['Volume'].to_numpy(dtype=np.float64)
+                liquidity = close[-1] * np.nanmean(volume[-20:])
+            except Exception:
+                continue
+            if np.isfinite(liquidity):
+                self._record(symbol).liquidity = float(liquidity)
+
+    def record_fetch(self, symbols, now=None):
+        """네트워크로 새로 수집한 종목 기록 (등급별 수집 주기 기준)"""
+        now = now or time.time()
+        for symbol in symbols:
+            self._record(symbol).fetched_at = now
+
+    def record_score(self, symbol, score, now=None):
+        """스캔 결과 기록 - score: 총점 (점수 계산 대상이 아니면 None)"""
+        record = self._record(symbol)
+        if score is not None:
+            record.previous_score, record.score = record.score, score
+        record.scanned_at = now or time.time()
+
+    def _liquidity_ranks(self, symbols):
+        """유동성 백분위 (0-1, 기록이 없으면 0)"""
+        liquidity = np.array([
+            np.nan if symbol not in self.records or self.records[symbol].liquidity is None
+            else self.records[symbol].liquidity
+            for symbol in symbols
+        ])
+        ranks = np.zeros(len(symbols))
+        known = ~np.isnan(liquidity)
+        if known.sum() > 1:
+            order = liquidity[known].argsort().argsort()
+            ranks[known] = order / (known.sum() - 1)
+        elif known.any():
+            ranks[known] = 1.0
+        return ranks
+
+    def plan(self, symbols, signals=None, now=None):
+        """스캔 순서와 이번에 수집할 종목 - (우선순위 순 종목 목록, 수집 대상 집합, {등급: 종목 수})
+
+        signals: 지난 신호 {종목: 신호} (StockMonitor.previous_signals) - 항상 hot
+        """
+        now = now or time.time()
+        signals = signals or {}
+        liquidity = self._liquidity_ranks(symbols)
+        intervals = {HOT: 0, WARM: config.SCAN_WARM_HOURS * 3600, COLD: config.SCAN_COLD_HOURS * 3600}
+
+        entries = []
+        tiers = {HOT: 0, WARM: 0, COLD: 0}
+        due = set()
+        for index, symbol in enumerate(symbols):
+            record = self.records.get(symbol) or SymbolRecord()
+            score = record.score or 0.0
+            momentum = 0.0
+            if record.score is not None and record.previous_score is not None:
+                momentum = min(max((record.score - record.previous_score) / 10.0, -1.0), 1.0)
+            stale = 1.0 if record.scanned_at is None else min((now - record.scanned_at) / (STALE_HOURS * 3600), 1.0)
+            priority = (SCORE_WEIGHT * score / 10.0 + MOMENTUM_WEIGHT * momentum
+                        + LIQUIDITY_WEIGHT * liquidity[index] + STALENESS_WEIGHT * stale)
+
+            if symbol in signals or score >= HOT_SCORE:
+                tier = HOT
+                priority += 1.0
+            elif score >= WARM_SCORE or liquidity[index] >= WARM_LIQUIDITY:
+                tier = WARM
+            else:
+                tier = COLD
+            tiers[tier] += 1
+            if record.fetched_at is None or now - record.fetched_at >= intervals[tier]:
+                due.add(symbol)
+            entries.append((-priority, index, symbol))
+
+        entries.sort()
+        return [symbol for _, _, symbol in entries], due, tiers
@@ -0,0 +1,298 @@
+"""데이터 제공자 레지스트리 - 제공자별 상태 추적 + 서킷 브레이커
+
+각 제공자는 여러 종목을 한 번에 받아 결과를 돌려주며, 레지스트리는
+- 제공자별 성공률과 종목당 지연 시간(p50/p95)을 최근 요청 기준으로 추적하고
+- 연속 실패가 쌓인 제공자는 일정 시간 건너뛴 뒤(open) 종목 1개로 상태를 확인(half-open)하며
+- 가장 건강한 제공자부터 요청하고, 실패한 종목만 다음 제공자로 넘깁니다.
+"""
+import time
+import threading
+from collections import deque
+import numpy as np
+import config
+
+# 서킷 브레이커 상태
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# 상태 추적 창 크기 (최근 결과 수)
+HEALTH_WINDOW = 200
+
+# 종목별 조회 기록(요청 실패 종목, 요청 시간)을 유지할 최대 종목 수 (넘으면 오래된 기록부터 삭제)
+MAX_TRACKED_SYMBOLS = 20000
+
+# 이 비율 이상 실패하면 (최소 표본 수 이상일 때) 브레이커를 엶
+FAILURE_RATE_THRESHOLD = 0.5
+MIN_SAMPLES = 20
+
+class FetchResult:
+    """제공자 조회 결과
+
+    data: {symbol: DataFrame 또는 None(데이터 없음)}
+    failed: 요청 자체가 실패한 종목 (타임아웃, 연결 오류, 5xx) → 다음 제공자로 넘김
+    두 곳 모두 없는 종목은 속도 제한 등으로 아직 시도하지 못한 종목입니다.
+    """
+
+    def __init__(self, data=None, failed=None):
+        self.data = data or {}
+        self.failed = set(failed or [])
+
+class ProviderHealth:
+    """제공자 상태 (성공률, 지연 시간, 서킷 브레이커)"""
+
+    def __init__(self, failure_threshold=None, cooldown=None):
+        self.failure_threshold = failure_threshold or config.PROVIDER_BREAKER_FAILURES
+        self.cooldown = cooldown or config.PROVIDER_BREAKER_COOLDOWN
+        self.outcomes = deque(maxlen=HEALTH_WINDOW)
+        self.latencies = deque(maxlen=HEALTH_WINDOW)
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probe_in_flight = False
+        self.total_success = 0
+        self.total_failure = 0
+        self.breaker_trips = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """요청 허용 여부 - (허용, 상태 확인 요청 여부)"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True, False
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return True, True
+            return False, False
+
+    def record(self, successes, failures, latencies=()):
+        """요청 결과 반영 (종목 단위) - latencies는 성공한 요청별 소요 시간 (초)"""
+        with self._lock:
+            self.outcomes.extend([True] * successes + [False] * failures)
+            self.total_success += successes
+            self.total_failure += failures
+            if successes:
+                self.latencies.extend(latencies)
+
+            if self.state == HALF_OPEN:
+                self.probe_in_flight = False
+                if successes and not failures:
+                    self._close()
+                elif failures:
+                    self._open()
+                return
+
+            if failures and not successes:
+                self.consecutive_failures += failures
+            elif successes:
+                self.consecutive_failures = 0
+
+            if self.state == CLOSED and (
+                self.consecutive_failures >= self.failure_threshold
+                or (len(self.outcomes) >= MIN_SAMPLES and 1 - self._success_rate() >= FAILURE_RATE_THRESHOLD)
+            ):
+                self._open()
+
+    def release_probe(self):
+        """상태 확인 요청이 결과 없이 끝났을 때 (속도 제한 등)"""
+        with self._lock:
+            self.probe_in_flight = False
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.breaker_trips += 1
+
+    def _close(self):
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        # 장애 이전 기록이 다시 브레이커를 열지 않도록 초기화
+        self.outcomes.clear()
+
+    def _success_rate(self):
+        if not self.outcomes:
+            return 1.0
+        return sum(self.outcomes) / len(self.outcomes)
+
+    def latency_percentile(self, q):
+        with self._lock:
+            if not self.latencies:
+                return None
+            return float(np.percentile(list(self.latencies), q))
+
+    def sort_key(self):
+        """정렬 키 (작을수록 우선) - 브레이커 상태, 성공률(0.1 단위), 종목당 지연 시간
+
+        아직 측정값이 없는 제공자는 측정된 제공자보다 뒤에 둡니다 (실패할 때만 시도됨).
+        """
+        with self._lock:
+            state_rank = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}[self.state]
+            success = round(self._success_rate(), 1)
+            latency = float(np.median(list(self.latencies))) if self.latencies else float('inf')
+        return state_rank, -success, latency
+
+    def get_metrics(self):
+        p50 = self.latency_percentile(50)
+        p95 = self.latency_percentile(95)
+        with self._lock:
+            return {
+                'state': self.state,
+                'success_rate': round(self._success_rate(), 3),
+                'latency_p50_ms': round(p50 * 1000, 1) if p50 is not None else None,
+                'latency_p95_ms': round(p95 * 1000, 1) if p95 is not None else None,
+                'total_success': self.total_success,
+                'total_failure': self.total_failure,
+                'consecutive_failures': self.consecutive_failures,
+                'breaker_trips': self.breaker_trips
+            }
+
+class Provider:
+    """데이터 제공자 기본 클래스 - fetch(symbols, period, timeout) → FetchResult"""
+    name = 'provider'
+    priority = 0  # 상태가 같을 때 우선순위 (작을수록 먼저)
+    chunk_size = None  # 한 번에 보낼 종목 수 (None이면 전체) - 묶음 사이에 브레이커 상태 확인
+
+    def fetch(self, symbols, period, timeout):
+        raise NotImplementedError
+
+_registry = []
+_health = {}
+_registry_lock = threading.Lock()
+# 마지막 조회에서 모든 제공자 요청이 실패한 종목 {종목: None} (데이터 없음과 구분 - 스캔 결과 분류용, 삽입 순서로 오래된 기록 삭제)
+_unreachable = {}
+# 마지막 조회에서 종목별 요청에 걸린 시간 합 {종목: (초, 기록 시각)} (제공자를 옮기면 더함 - 스캔 단계 측정용)
+_request_seconds = {}
+# _unreachable·_request_seconds 보호 (수집 스레드 여러 개가 동시에 갱신)
+_tracking_lock = threading.Lock()
+
+def register(provider):
+    """제공자 등록 (같은 이름이면 교체)"""
+    with _registry_lock:
+        _registry[:] = [p for p in _registry if p.name != provider.name]
+        _registry.append(provider)
+        _health.setdefault(provider.name, ProviderHealth())
+
+def get_health(name):
+    return _health.get(name)
+
+def reset_health():
+    """제공자 상태 초기화"""
+    with _registry_lock:
+        for provider in _registry:
+            _health[provider.name] = ProviderHealth()
+
+def get_providers():
+    """건강한 순서로 정렬된 제공자 목록"""
+    with _registry_lock:
+        providers = list(_registry)
+    return sorted(providers, key=lambda p: (_health[p.name].sort_key(), p.priority))
+
+def fetch_history(symbols, period='6mo', timeout=8):
+    """가장 건강한 제공자부터 일봉 조회 - {symbol: DataFrame 또는 None}
+
+    요청이 실패한 종목만 다음 제공자로 넘기며, 브레이커가 열린 제공자는 건너뜁니다.
+    상태 확인(half-open) 중인 제공자에는 종목 1개만 먼저 보내고, 성공하면 나머지도 보냅니다.
+    속도 제한으로 시도하지 못한 종목은 결과에서 빠집니다.
+    """
+    results = {}
+    remaining = list(dict.fromkeys(symbols))
+    with _tracking_lock:
+        for symbol in remaining:
+            _request_seconds.pop(symbol, None)
+
+    for provider in get_providers():
+        if not remaining:
+            break
+        health = _health[provider.name]
+        allowed, probe = health.allow()
+        if not allowed:
+            continue
+
+        passed = []  # 이 제공자에서 실패했거나 시도하지 못한 종목
+        pending = remaining
+        if probe:
+            outcome = _run(provider, health, pending[:1], period, timeout, probe=True)
+            results.update(outcome.data)
+            passed.extend(s for s in pending[:1] if s in outcome.failed)
+            pending = pending[1:]
+
+        chunk = provider.chunk_size or len(pending) or 1
+        for i in range(0, len(pending), chunk):
+            if health.state != CLOSED:
+                # 도중에 브레이커가 열리면 남은 종목은 다음 제공자로
+                passed.extend(pending[i:])
+                break
+            batch = pending[i:i + chunk]
+            outcome = _run(provider, health, batch, period, timeout)
+            results.update(outcome.data)
+            passed.extend(s for s in batch if s in outcome.failed)
+        remaining = passed
+
+    # 모든 제공자가 실패(또는 건너뜀)한 종목은 데이터 없음
+    with _tracking_lock:
+        for symbol in results:
+            _unreachable.pop(symbol, None)
+        for symbol in remaining:
+            _unreachable.pop(symbol, None)
+            _unreachable[symbol] = None
+        _trim(_unreachable)
+    for symbol in remaining:
+        results.setdefault(symbol, None)
+    return results
+
+def unreachable(symbol):
+    """마지막 조회에서 모든 제공자 요청이 실패했는지 (타임아웃, 연결 오류, 서버 오류)"""
+    with _tracking_lock:
+        return symbol in _unreachable
+
+def record_request(symbol, seconds):
+    """제공자 구현에서 종목 1개 요청에 걸린 시간 기록"""
+    with _tracking_lock:
+        total = _request_seconds.pop(symbol, (0.0, None))[0]
+        _request_seconds[symbol] = (total + seconds, time.time())
+        _trim(_request_seconds)
+
+def request_seconds(symbol, since=None):
+    """마지막 조회에서 종목 요청에 걸린 시간 (초) - since 이후 요청하지 않았으면 (저장소·캐시에서 읽음) None"""
+    with _tracking_lock:
+        entry = _request_seconds.get(symbol)
+    if entry is None or (since is not None and entry[1] < since):
+        return None
+    return entry[0]
+
+def _trim(tracked):
+    """종목별 기록이 MAX_TRACKED_SYMBOLS를 넘으면 오래된 것부터 삭제 (_tracking_lock 안에서 호출)"""
+    while len(tracked) > MAX_TRACKED_SYMBOLS:
+        del tracked[next(iter(tracked))]
+
+def _run(provider, health, symbols, period, timeout, probe=False):
+    """제공자 호출 후 상태 기록
+
+    지연 시간은 제공자가 record_request()로 남긴 요청별 시간을 쓰고, 남기지 않는 제공자만 배치 평균으로 대신합니다.
+    """
+    before = {symbol: request_seconds(symbol) or 0.0 for symbol in symbols}
+    start = time.monotonic()
+    try:
+        outcome = provider.fetch(symbols, period, timeout)
+    except Exception:
+        outcome = FetchResult(failed=symbols)
+    elapsed = time.monotonic() - start
+
+    successes = len(outcome.data)
+    failures = len(outcome.failed)
+    if successes or failures:
+        latencies = []
+        for symbol in outcome.data:
+            seconds = request_seconds(symbol)
+            if seconds is not None and seconds > before.get(symbol, 0.0):
+                latencies.append(seconds - before.get(symbol, 0.0))
+        health.record(successes, failures, latencies or [elapsed / len(symbols)])
+    elif probe:
+        health.release_probe()
+    return outcome
+
+def get_metrics():
+    """제공자별 상태 지표 (우선순위 순)"""
+    return {p.name: _health[p.name].get_metrics() for p in get_providers()}
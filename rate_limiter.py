@@ -0,0 +1,196 @@
+"""Yahoo 요청 속도 제한 - 프로세스 전체가 공유하는 적응형 토큰 버킷
+
+모든 Yahoo 요청(직접 API, 비동기 엔진, yfinance)은 요청 전에 토큰을 받고,
+응답 상태를 보고합니다.
+- 429/403 응답: 속도를 절반으로 낮추고 지터가 섞인 지수 백오프 동안 전체 요청 중단
+- 정상 응답: 제한 없이 일정 시간이 지나면 속도를 조금씩 올림 (마지막 제한 지점 근처에서는 천천히)
+"""
+import time
+import random
+import asyncio
+import threading
+import config
+
+# 속도 제한으로 간주하는 HTTP 상태 코드
+THROTTLE_STATUSES = (429, 403)
+
+# 백오프 (초) - 연속 제한 횟수에 따라 2배씩 증가
+BACKOFF_BASE = 2.0
+BACKOFF_MAX = 60.0
+
+# 제한 시 속도 감소 비율, 회복 주기(초)와 1회 증가폭 (최대 속도 대비)
+DECREASE_FACTOR = 0.5
+RAMP_INTERVAL = 1.0
+RAMP_STEP_RATIO = 0.05
+
+class YFRateLimitError(Exception):
+    """yfinance API 제한 오류 (재시도 후에도 속도 제한 응답)"""
+    pass
+
+class AdaptiveRateLimiter:
+    """적응형 토큰 버킷 (스레드/이벤트 루프 공용)"""
+
+    def __init__(self, max_rate, min_rate, burst=None):
+        self.max_rate = float(max_rate)
+        self.min_rate = float(min(min_rate, max_rate))
+        self.rate = self.max_rate
+        self.burst = float(burst or max(self.max_rate, 1.0))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._last_change = 0.0
+        self._ceiling = None  # 마지막으로 제한을 받은 속도
+        self._streak = 0  # 연속 제한 횟수
+        self._lock = threading.Lock()
+
+        # 지표
+        self.total_requests = 0
+        self.throttled_responses = 0
+        self.throttle_events = 0
+        self.total_wait = 0.0
+        self.last_throttle_at = None
+
+    def _refill(self, now):
+        """경과 시간만큼 토큰 보충 (백오프 중에는 보충하지 않음)"""
+        start = max(self._updated, self._paused_until)
+        if now > start:
+            self._tokens = min(self.burst, self._tokens + (now - start) * self.rate)
+        self._updated = now
+
+    def try_acquire(self):
+        """토큰 1개 획득 시도 - 획득하면 0, 아니면 다시 시도할 때까지의 대기 시간(초) 반환
+
+        대기 시간을 미리 확정하지 않고 매번 다시 시도하므로,
+        대기 중에 속도가 낮아지거나 백오프가 시작되면 대기 중인 요청에도 즉시 반영됩니다.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now + random.uniform(0, 1.0 / self.rate)
+            self._refill(now)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self.total_requests += 1
+                return 0.0
+            # 대기 중인 요청들이 한꺼번에 깨어나지 않도록 지터 추가
+            return (1 - self._tokens) / self.rate * random.uniform(1.0, 1.5)
+
+    def acquire(self):
+        """토큰을 얻을 때까지 대기 (동기)"""
+        start = time.monotonic()
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                break
+            time.sleep(wait)
+        self._add_wait(time.monotonic() - start)
+
+    async def acquire_async(self):
+        """토큰을 얻을 때까지 대기 (이벤트 루프용)"""
+        start = time.monotonic()
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+        self._add_wait(time.monotonic() - start)
+
+    def _add_wait(self, seconds):
+        with self._lock:
+            self.total_wait += seconds
+
+    def record(self, status, retry_after=None):
+        """응답 상태 보고 - 속도 제한 응답이면 True 반환"""
+        if status in THROTTLE_STATUSES:
+            self._on_throttle(retry_after)
+            return True
+        if status is not None:
+            self._on_success()
+        return False
+
+    def _on_throttle(self, retry_after=None):
+        with self._lock:
+            now = time.monotonic()
+            self.throttled_responses += 1
+            # 이미 백오프 중이면 동시에 나갔던 요청의 응답이므로 한 번만 반영
+            if now < self._paused_until:
+                return
+            self.throttle_events += 1
+            self.last_throttle_at = time.time()
+            self._streak += 1
+            self._ceiling = self.rate
+            self.rate = max(self.min_rate, self.rate * DECREASE_FACTOR)
+
+            backoff = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (self._streak - 1))
+            backoff *= random.uniform(0.5, 1.0)  # 지터 (워커들이 동시에 재시도하지 않도록)
+            if retry_after:
+                backoff = max(backoff, min(float(retry_after), BACKOFF_MAX))
+            self._paused_until = now + backoff
+            self._tokens = min(self._tokens, 0.0)
+            self._last_change = self._paused_until
+
+    def _on_success(self):
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return
+            self._streak = 0
+            if self.rate >= self.max_rate or now - self._last_change < RAMP_INTERVAL:
+                return
+            step = self.max_rate * RAMP_STEP_RATIO
+            # 마지막 제한 지점 근처에서는 천천히 올림
+            if self._ceiling is not None and self.rate >= self._ceiling * 0.9:
+                step /= 4
+            self.rate = min(self.max_rate, self.rate + step)
+            self._last_change = now
+
+    def cooldown_remaining(self):
+        """남은 백오프 시간(초)"""
+        with self._lock:
+            return max(0.0, self._paused_until - time.monotonic())
+
+    def wait_for_cooldown(self):
+        """백오프가 끝날 때까지 대기"""
+        remaining = self.cooldown_remaining()
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def worst_case_wait(self, count):
+        """count개 요청이 최저 속도와 최대 백오프를 모두 겪을 때의 대기 시간(초)"""
+        return count / self.min_rate + (config.RATE_LIMIT_RETRIES + 1) * BACKOFF_MAX
+
+    def get_metrics(self):
+        """현재 속도 및 제한 지표"""
+        with self._lock:
+            return {
+                'rate': round(self.rate, 2),
+                'max_rate': self.max_rate,
+                'min_rate': self.min_rate,
+                'total_requests': self.total_requests,
+                'throttled_responses': self.throttled_responses,
+                'throttle_events': self.throttle_events,
+                'cooldown_seconds': round(max(0.0, self._paused_until - time.monotonic()), 1),
+                'total_wait_seconds': round(self.total_wait, 1),
+                'last_throttle_at': self.last_throttle_at
+            }
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+def get_limiter():
+    """프로세스 전체 공유 리미터"""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = AdaptiveRateLimiter(config.YAHOO_RATE_LIMIT, config.YAHOO_RATE_LIMIT_MIN)
+    return _limiter
+
+def reset():
+    """리미터 재생성 (설정 변경 시)"""
+    global _limiter
+    with _limiter_lock:
+        _limiter = None
+
+def get_metrics():
+    return get_limiter().get_metrics()
@@ -0,0 +1,117 @@
+"""상대강도 등급 (RS Rating) - 스캔 전체 종목 대비 백분위
+
+윌리엄 오닐의 RS Rating처럼 최근 3/6/9/12개월 수익률을 가중 평균(최근 3개월 40%, 나머지 각 20%)하고
+스캔한 전체 종목 안에서 1-99 백분위로 환산합니다.
+스캔 중에는 지난 스캔의 분포(reference)에 대해 배치마다 등급을 매기고, 수집이 끝나면 배치별 가중 수익률을 모아
+이번 스캔 전체 종목 분포로 한 번 다시 계산합니다 (종가 행렬은 배치 단위로 만들어 배열 연산으로 계산).
+"""
+import threading
+import numpy as np
+
+# 수익률 기간 (거래일: 3/6/9/12개월)과 가중치
+HORIZONS = (63, 126, 189, 252)
+WEIGHTS = (0.4, 0.2, 0.2, 0.2)
+
+# 종가 행렬 길이 (12개월 전 종가 포함)
+MATRIX_DAYS = HORIZONS[-1] + 1
+
+def close_matrix(frames, days=MATRIX_DAYS):
+    """{symbol: 일봉 DataFrame} → (종목 목록, 종가 행렬)
+
+    행렬은 종목 x 최근 days일 (마지막 열이 최근 봉), 이력이 짧은 종목의 앞부분은 NaN입니다.
+    """
+    symbols = [symbol for symbol, frame in frames.items() if frame is not None and not frame.empty]
+    matrix = np.full((len(symbols), days), np.nan)
+    for row, symbol in enumerate(symbols):
+        close = frames[symbol]['Close'].to_numpy(dtype=np.float64)[-days:]
+        matrix[row, days - len(close):] = close
+    return symbols, matrix
+
+def weighted_returns(matrix):
+    """종가 행렬 → 종목별 가중 수익률
+
+    이력이 짧아 없는 기간은 가중치에서 빼고 나머지로 평균합니다 (3개월 수익률이 없으면 NaN).
+    """
+    columns = [matrix.shape[1] - 1 - horizon for horizon in HORIZONS]
+    if matrix.shape[1] == 0 or columns[0] < 0:
+        return np.full(len(matrix), np.nan)
+    base = np.full((len(matrix), len(HORIZONS)), np.nan)
+    available = [i for i, column in enumerate(columns) if column >= 0]
+    base[:, available] = matrix[:, [columns[i] for i in available]]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = matrix[:, -1:] / base - 1.0
+        returns[~np.isfinite(returns)] = np.nan
+        weights = np.where(np.isnan(returns), 0.0, np.asarray(WEIGHTS))
+        strength = np.where(np.isnan(returns), 0.0, returns * weights).sum(axis=1) / weights.sum(axis=1)
+    strength[np.isnan(returns[:, 0])] = np.nan
+    return strength
+
+class RSRanking:
+    """스캔 1회의 상대강도 분포와 종목별 등급
+
+    분포는 만든 뒤 바뀌지 않습니다. 스트리밍 스캔의 배치는 rate_batch()로, 일괄 수집에서 빠져
+    나중에 받은 종목은 rating()에서 같은 분포에 대해 등급을 매깁니다.
+    """
+
+    def __init__(self, symbols, strength):
+        valid = ~np.isnan(strength)
+        self._sorted = np.sort(strength[valid])
+        self._lock = threading.Lock()
+        self._ratings = {}
+        self.rate_batch(symbols, strength)
+
+    def __len__(self):
+        return len(self._sorted)
+
+    def _rate(self, values):
+        """분포 내 순위(같은 값은 평균 순위)의 백분위 → 1-99 등급"""
+        if len(self._sorted) == 0:
+            return np.zeros(len(values), dtype=np.int64)
+        below = np.searchsorted(self._sorted, values, side='left')
+        upto = np.searchsorted(self._sorted, values, side='right')
+        percentile = (below + upto + 1) / 2 / len(self._sorted)
+        return np.clip(np.ceil(percentile * 99), 1, 99).astype(np.int64)
+
+    def rate_batch(self, symbols, strength):
+        """종목 목록과 가중 수익률(strengths() 결과)의 등급을 분포에 대해 한 번에 매겨 저장 (NaN은 건너뜀)"""
+        valid = ~np.isnan(strength)
+        ratings = self._rate(strength[valid])
+        entries = {
+            symbol: (int(rating), float(value))
+            for symbol, value, rating in zip(np.asarray(symbols, dtype=object)[valid], strength[valid], ratings)
+        }
+        with self._lock:
+            self._ratings.update(entries)
+
+    def rating(self, symbol, data=None):
+        """종목의 RS 등급 (1-99) - 분포에 없으면 data(일봉)로 계산, 계산할 수 없으면 None"""
+        entry = self._ratings.get(symbol)
+        if entry is None and data is not None and len(self._sorted):
+            _, matrix = close_matrix({symbol: data})
+            strength = weighted_returns(matrix)
+            if len(strength) and not np.isnan(strength[0]):
+                entry = (int(self._rate(strength)[0]), float(strength[0]))
+                with self._lock:
+                    self._ratings[symbol] = entry
+        return entry[0] if entry else None
+
+    def reference(self):
+        """같은 분포에 종목 등급만 비운 RSRanking - 다음 스캔에서 수집한 일봉으로 배치마다 등급 계산"""
+        ranking = RSRanking([], np.empty(0))
+        ranking._sorted = self._sorted
+        return ranking
+
+    def rows(self):
+        """저장용 (종목, 등급, 가중 수익률) 목록"""
+        with self._lock:
+            return [(symbol, rating, strength) for symbol, (rating, strength) in self._ratings.items()]
+
+def strengths(frames):
+    """{symbol: 일봉 DataFrame} → (종목 목록, 가중 수익률) - 배치별로 모아 RSRanking으로 순위 계산"""
+    symbols, matrix = close_matrix(frames)
+    return symbols, weighted_returns(matrix)
+
+def rank_universe(frames):
+    """수집한 일봉 전체 → RSRanking (종가 행렬 1회 생성, 가중 수익률·등급은 배열 연산)"""
+    return RSRanking(*strengths(frames))
@@ -0,0 +1,629 @@
+"""Yahoo/NASDAQ 응답 기록·재생 서버 - 오프라인 스캔 및 벤치마크용
+
+사용법:
+    python replay_server.py record fixtures [종목 ...]     # 실제 API 응답 기록 (종목 미지정 시 스크리너 전체)
+    python replay_server.py synthesize fixtures [종목수]   # 합성 종목 생성 (기본 6000개)
+    python replay_server.py serve fixtures [--port 8765] [--latency 0.05] [--error-rate 0.01] [--throttle-rate 0.01]
+
+재생 서버 실행 후 YAHOO_BASE_URL, NASDAQ_BASE_URL을 서버 주소로 설정하면
+종목 목록, 차트, 현재가, ticker.info, 재무제표 요청이 모두 재생 서버로 갑니다.
+
+픽스처 구성:
+    manifest.json               종류(recorded/synthetic), 종목 목록, 생성 시각
+    chart/{SYM}.json            2년 일봉 차트 응답 (range/period1/period2 요청은 잘라서 응답)
+    quote/{SYM}.json            v7 quote 결과 1건 (여러 종목 요청은 합쳐서 응답)
+    info/{SYM}.json             ticker.info의 quoteSummary 응답
+    raw/{key}.json              그 밖의 Yahoo 응답 (재무제표 등) - 경로 + 쿼리 기준
+    screener/{nasdaq,nyse}.json NASDAQ 스크리너 응답
+합성 픽스처는 manifest에 종목 수와 시드만 기록하고, 응답은 요청 시 종목별로 결정적으로 생성합니다.
+"""
+import os
+import sys
+import json
+import time
+import zlib
+import calendar
+import random
+import hashlib
+import argparse
+import threading
+from functools import lru_cache
+from urllib.parse import urlparse, parse_qsl, unquote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import config
+import http_client
+from market_regime import INDEXES
+
+# range 요청 → 마지막 봉 기준 포함 일수 (달력 기준)
+RANGE_DAYS = {'1d': 1, '5d': 7, '1mo': 31, '3mo': 92, '6mo': 183, '1y': 365, '2y': 730, '5y': 1826}
+
+# 기록/합성 차트 범위
+FIXTURE_RANGE = '2y'
+SYNTHETIC_BARS = 504
+
+# raw 응답 키에서 제외할 쿼리 (요청 시각마다 달라지는 값)
+VOLATILE_PARAMS = ('period1', 'period2', 'crumb', '_')
+
+# 재생 서버가 발급하는 crumb (v7 quote 요청에 없으면 401)
+REPLAY_CRUMB = 'replay-crumb'
+
+def _write_json(path, payload):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def _read_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def raw_key(path, query):
+    """raw 응답 키 - 경로 + 정렬된 쿼리 (시각 관련 파라미터 제외)"""
+    items = sorted((k, v) for k, v in query if k not in VOLATILE_PARAMS)
+    canonical = path + '?' + '&'.join(f"{k}={v}" for k, v in items)
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:20]
+
+def slice_chart(payload, params):
+    """2년 차트 응답을 요청 구간(range 또는 period1/period2)에 맞게 잘라냄"""
+    result = payload['chart']['result'][0]
+    timestamps = result.get('timestamp') or []
+    if not timestamps:
+        return payload
+
+    ts = np.asarray(timestamps, dtype=np.int64)
+    if 'period1' in params:
+        mask = ts >= int(params['period1'])
+        if params.get('period2'):
+            mask &= ts < int(params['period2'])
+    else:
+        days = RANGE_DAYS.get(params.get('range', '1mo'))
+        if days is None:  # max, ytd 등은 기록된 전체 구간
+            return payload
+        mask = ts > ts[-1] - days * 86400
+    keep = np.flatnonzero(mask)
+    lo, hi = (int(keep[0]), int(keep[-1]) + 1) if len(keep) else (0, 0)
+
+    sliced = {k: v for k, v in result.items() if k not in ('timestamp', 'indicators', 'events')}
+    if hi > lo:
+        sliced['timestamp'] = timestamps[lo:hi]
+        indicators = {}
+        for name, series in result.get('indicators', {}).items():
+            indicators[name] = [{k: v[lo:hi] for k, v in item.items()} for item in series]
+        sliced['indicators'] = indicators
+        # 구간 안의 배당/분할 이벤트만 포함
+        start, end = timestamps[lo], timestamps[hi - 1]
+        events = {}
+        for kind, items in result.get('events', {}).items():
+            kept = {k: v for k, v in items.items() if start <= int(k) <= end}
+            if kept:
+                events[kind] = kept
+        if events:
+            sliced['events'] = events
+    return {'chart': {'result': [sliced], 'error': None}}
+
+def _fmt(value):
+    """quoteSummary 값 형식 ({raw, fmt})"""
+    return {'raw': value, 'fmt': f"{value:.2f}"}
+
+class SyntheticUniverse:
+    """합성 종목 응답 생성기 - 같은 시드와 종목이면 항상 같은 응답"""
+
+    def __init__(self, count=6000, seed=1):
+        self.count = count
+        self.seed = seed
+        self.symbols = [self.symbol(i) for i in range(count)]
+        # 시장 지수(SPY, QQQ, ^IXIC)는 차트만 제공 (스크리너 목록에는 없음)
+        self._index = {s: i for i, s in enumerate(self.symbols + list(INDEXES))}
+        self.chart_payload = lru_cache(maxsize=512)(self._chart_payload)
+
+    @staticmethod
+    def symbol(i):
+        """i번째 합성 종목 코드 (알파벳 4자리: AAAA, AAAB, ...)"""
+        letters = []
+        for _ in range(4):
+            i, r = divmod(i, 26)
+            letters.append(chr(65 + r))
+        return ''.join(reversed(letters))
+
+    def __contains__(self, symbol):
+        return symbol in self._index
+
+    def _rng(self, symbol, stream):
+        return np.random.default_rng([self.seed, zlib.crc32(symbol.encode()), stream])
+
+    def _profile(self, symbol):
+        """종목별 고정 특성 (시작가, 추세, 변동성, 거래량, 주식 수)"""
+        rng = self._rng(symbol, 0)
+        index = symbol in INDEXES
+        return {
+            'start': float(rng.uniform(5, 300)),
+            'drift': float(rng.normal(0.0004, 0.0012)),
+            'sigma': float(rng.uniform(0.008, 0.012) if index else rng.uniform(0.01, 0.035)),
+            'volume': float(rng.uniform(2e5, 5e6)),
+            'shares': float(rng.uniform(2e7, 2e9))
+        }
+
+    def _bars(self, symbol):
+        """오늘까지의 일봉 (평일 기준) - (timestamps, open, high, low, close, volume)"""
+        profile = self._profile(symbol)
+        rng = self._rng(symbol, 1)
+        today = np.datetime64(time.strftime('%Y-%m-%d', time.gmtime()), 'D')
+        end = np.busday_offset(today, 0, roll='backward')
+        days = np.busday_offset(end, np.arange(-SYNTHETIC_BARS + 1, 1), roll='backward')
+        timestamps = days.astype('datetime64[s]').astype(np.int64) + 48600  # 13:30 UTC (장 시작)
+
+        sigma = profile['sigma']
+        close = profile['start'] * np.exp(np.cumsum(rng.normal(profile['drift'], sigma, SYNTHETIC_BARS)))
+        prev = np.concatenate(([close[0]], close[:-1]))
+        open_ = prev * (1 + rng.normal(0, sigma / 4, SYNTHETIC_BARS))
+        high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, sigma / 2, SYNTHETIC_BARS)))
+        low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, sigma / 2, SYNTHETIC_BARS)))
+        volume = np.round(profile['volume'] * rng.lognormal(0, 0.4, SYNTHETIC_BARS))
+        return timestamps, open_.round(4), high.round(4), low.round(4), close.round(4), volume
+
+    def _chart_payload(self, symbol):
+        timestamps, open_, high, low, close, volume = self._bars(symbol)
+        meta = {
+            'currency': 'USD',
+            'symbol': symbol,
+            'exchangeName': 'NMS' if self._index[symbol] % 2 == 0 else 'NYQ',
+            'instrumentType': 'EQUITY',
+            'regularMarketTime': int(timestamps[-1]),
+            'regularMarketPrice': float(close[-1]),
+            'chartPreviousClose': float(close[-2]),
+            'previousClose': float(close[-2]),
+            'dataGranularity': '1d'
+        }
+        return {'chart': {'result': [{
+            'meta': meta,
+            'timestamp': timestamps.tolist(),
+            'indicators': {
+                'quote': [{
+                    'open': open_.tolist(),
+                    'high': high.tolist(),
+                    'low': low.tolist(),
+                    'close': close.tolist(),
+                    'volume': volume.astype(np.int64).tolist()
+                }],
+                'adjclose': [{'adjclose': close.tolist()}]
+            }
+        }], 'error': None}}
+
+    def quote(self, symbol):
+        _, _, high, low, close, volume = self._bars(symbol)
+        year = slice(-252, None)
+        price, previous = float(close[-1]), float(close[-2])
+        return {
+            'symbol': symbol,
+            'shortName': f"{symbol} Inc.",
+            'longName': f"{symbol} Holdings Inc.",
+            'currency': 'USD',
+            'quoteType': 'EQUITY',
+            'regularMarketPrice': price,
+            'regularMarketPreviousClose': previous,
+            'regularMarketChangePercent': (price / previous - 1) * 100,
+            'regularMarketVolume': int(volume[-1]),
+            'regularMarketTime': int(time.time()),
+            'marketCap': int(price * self._profile(symbol)['shares']),
+            'fiftyTwoWeekHigh': float(high[year].max()),
+            'fiftyTwoWeekLow': float(low[year].min())
+        }
+
+    def info(self, symbol):
+        """ticker.info가 사용하는 quoteSummary 응답 (점수 계산에 쓰는 항목 위주)"""
+        quote = self.quote(symbol)
+        profile = self._profile(symbol)
+        _, _, _, _, _, volume = self._bars(symbol)
+        rng = self._rng(symbol, 2)
+        price = quote['regularMarketPrice']
+        eps = price / rng.uniform(8, 60)
+        growth = float(rng.normal(0.12, 0.2))
+
+        return {'quoteSummary': {'result': [{
+            'financialData': {
+                'currentPrice': _fmt(price),
+                'returnOnEquity': _fmt(float(rng.normal(0.15, 0.1))),
+                'debtToEquity': _fmt(float(rng.uniform(0, 250))),
+                'revenueGrowth': _fmt(float(rng.normal(0.08, 0.15))),
+                'earningsGrowth': _fmt(growth),
+                'profitMargins': _fmt(float(rng.normal(0.1, 0.1))),
+                'currentRatio': _fmt(float(rng.uniform(0.5, 4))),
+                'quickRatio': _fmt(float(rng.uniform(0.3, 3)))
+            },
+            'defaultKeyStatistics': {
+                'forwardPE': _fmt(float(price / (eps * (1 + growth / 2)))),
+                'priceToBook': _fmt(float(rng.uniform(0.5, 15))),
+                'pegRatio': _fmt(float(rng.uniform(0.3, 4))),
+                'enterpriseToRevenue': _fmt(float(rng.uniform(0.5, 15))),
+                'enterpriseToEbitda': _fmt(float(rng.uniform(4, 40))),
+                'earningsQuarterlyGrowth': _fmt(float(rng.normal(0.1, 0.3))),
+                'sharesOutstanding': _fmt(profile['shares']),
+                'heldPercentInstitutions': _fmt(float(rng.uniform(0.05, 0.95))),
+                'mostRecentQuarter': _fmt(self._last_quarter_end())
+            },
+            'summaryDetail': {
+                'trailingPE': _fmt(float(price / eps)),
+                'marketCap': _fmt(quote['marketCap']),
+                'dividendYield': _fmt(float(max(0.0, rng.normal(0.012, 0.015)))),
+                'volume': _fmt(int(volume[-1])),
+                'averageVolume': _fmt(int(volume[-63:].mean())),
+                'fiftyTwoWeekHigh': _fmt(quote['fiftyTwoWeekHigh']),
+                'fiftyTwoWeekLow': _fmt(quote['fiftyTwoWeekLow'])
+            },
+            'quoteType': {
+                'symbol': symbol,
+                'quoteType': 'EQUITY',
+                'shortName': quote['shortName'],
+                'longName': quote['longName']
+            },
+            'assetProfile': {
+                'sector': 'Technology' if self._index[symbol] % 3 == 0 else 'Industrials',
+                'industry': 'Synthetic'
+            }
+        }], 'error': None}}
+
+    @staticmethod
+    def _last_quarter_end():
+        """직전 분기 종료일 (UTC epoch 초)"""
+        now = time.gmtime()
+        quarter_start = calendar.timegm((now.tm_year, (now.tm_mon - 1) // 3 * 3 + 1, 1, 0, 0, 0))
+        return quarter_start - 86400
+
+    def screener(self, exchange):
+        """NASDAQ 스크리너 응답 (짝수 번째 종목은 NASDAQ, 홀수 번째는 NYSE - 가격·거래량·시가총액은 현재가와 같은 값)"""
+        parity = 1 if exchange == 'nyse' else 0
+        rows = []
+        for i, s in enumerate(self.symbols):
+            if i % 2 != parity:
+                continue
+            quote = self.quote(s)
+            rows.append({
+                'symbol': s,
+                'name': f"{s} Inc.",
+                'lastsale': f"${quote['regularMarketPrice']:,.2f}",
+                'volume': str(quote['regularMarketVolume']),
+                'marketCap': f"{quote['marketCap']:.2f}",
+                'sector': 'Technology' if i % 3 == 0 else 'Industrials',
+                'industry': ''
+            })
+        return {'data': {'rows': rows}, 'status': {'rCode': 200}}
+
+class FixtureStore:
+    """픽스처 디렉토리 읽기 (기록된 응답 또는 합성 종목)"""
+
+    def __init__(self, root):
+        self.root = root
+        self.manifest = _read_json(os.path.join(root, 'manifest.json')) or {}
+        self.synthetic = None
+        if self.manifest.get('source') == 'synthetic':
+            self.synthetic = SyntheticUniverse(self.manifest.get('count', 6000), self.manifest.get('seed', 1))
+        self._load = lru_cache(maxsize=1024)(self._read)
+
+    def _read(self, *parts):
+        return _read_json(os.path.join(self.root, *parts))
+
+    def chart(self, symbol):
+        if self.synthetic is not None:
+            return self.synthetic.chart_payload(symbol) if symbol in self.synthetic else None
+        return self._load('chart', f"{symbol}.json")
+
+    def quote(self, symbol):
+        if self.synthetic is not None:
+            return self.synthetic.quote(symbol) if symbol in self.synthetic else None
+        return self._load('quote', f"{symbol}.json")
+
+    def info(self, symbol):
+        if self.synthetic is not None:
+            return self.synthetic.info(symbol) if symbol in self.synthetic else None
+        return self._load('info', f"{symbol}.json")
+
+    def raw(self, path, query):
+        """그 밖의 응답 - (상태 코드, 본문 문자열) 또는 None"""
+        entry = self._load('raw', f"{raw_key(path, query)}.json")
+        if entry is None:
+            return None
+        return entry['status'], entry['body']
+
+    @staticmethod
+    def _last_quarter_end():
+        """직전 분기 종료일 (UTC epoch 초)"""
+        now = time.gmtime()
+        quarter_start = calendar.timegm((now.tm_year, (now.tm_mon - 1) // 3 * 3 + 1, 1, 0, 0, 0))
+        return quarter_start - 86400
+
+    def screener(self, exchange):
+        if self.synthetic is not None:
+            return self.synthetic.screener(exchange)
+        return self._load('screener', f"{exchange}.json")
+
+class ReplayServer:
+    """픽스처 재생 HTTP 서버 (keep-alive)
+
+    latency: 응답 전 대기 시간(초)
+    error_rate: 500 응답 비율, throttle_rate: 429 응답 비율 (Retry-After 없음)
+    같은 seed면 같은 순서의 요청에 같은 오류가 주입됩니다.
+    """
+
+    def __init__(self, fixtures, host='127.0.0.1', port=0, latency=0.0, error_rate=0.0, throttle_rate=0.0, seed=1):
+        self.store = fixtures if isinstance(fixtures, FixtureStore) else FixtureStore(fixtures)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.reset()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                status, body = server.handle(self.path)
+                if isinstance(body, (dict, list)):
+                    body = json.dumps(body)
+                body = body.encode('utf-8') if isinstance(body, str) else body
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        # 클라이언트가 keep-alive 연결을 끊을 때의 오류 출력 생략
+        self.httpd.handle_error = lambda request, client_address: None
+        self.url = f"http://{host}:{self.httpd.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.throttled = 0
+            self.errors = 0
+            self.not_found = 0
+            self.by_kind = {}
+
+    def _inject(self):
+        """주입할 오류 상태 코드 (없으면 None)"""
+        with self._lock:
+            self.requests += 1
+            draw = self._random.random()
+            if draw < self.throttle_rate:
+                self.throttled += 1
+                return 429
+            if draw < self.throttle_rate + self.error_rate:
+                self.errors += 1
+                return 500
+        return None
+
+    def handle(self, raw_path):
+        """요청 경로 → (상태 코드, 본문)"""
+        injected = self._inject()
+        if self.latency:
+            time.sleep(self.latency)
+        if injected is not None:
+            return injected, {'error': 'injected'}
+
+        parsed = urlparse(raw_path)
+        query = parse_qsl(parsed.query)
+        params = dict(query)
+        path = parsed.path
+        symbol = unquote(path.rstrip('/').split('/')[-1]).upper()
+
+        if path == http_client.YAHOO_CRUMB_PATH:
+            # v7 quote·v10 quoteSummary용 crumb (재생 서버는 쿠키 없이 발급)
+            with self._lock:
+                self.by_kind['crumb'] = self.by_kind.get('crumb', 0) + 1
+            return 200, REPLAY_CRUMB
+        if path.endswith('/finance/quote') and params.get('crumb') != REPLAY_CRUMB:
+            # 실제 Yahoo처럼 crumb 없는 v7 quote 요청은 거절
+            with self._lock:
+                self.by_kind['unauthorized'] = self.by_kind.get('unauthorized', 0) + 1
+            return 401, {'finance': {'result': None, 'error': {'code': 'Unauthorized', 'description': 'Invalid Crumb'}}}
+        if path.startswith('/v8/finance/chart/'):
+            kind, payload = 'chart', self.store.chart(symbol)
+            if payload is not None:
+                payload = slice_chart(payload, params)
+            missing = {'chart': {'result': None, 'error': {'code': 'Not Found', 'description': 'No data found, symbol may be delisted'}}}
+        elif path.endswith('/finance/quote'):
+            symbols = [s.strip().upper() for s in params.get('symbols', '').split(',') if s.strip()]
+            quotes = [q for q in (self.store.quote(s) for s in symbols) if q is not None]
+            kind, payload = 'quote', {'quoteResponse': {'result': quotes, 'error': None}}
+        elif '/finance/quoteSummary/' in path:
+            kind, payload = 'info', self.store.info(symbol)
+            missing = {'quoteSummary': {'result': None, 'error': {'code': 'Not Found', 'description': 'Quote not found for ticker symbol: ' + symbol}}}
+        elif path == '/api/screener/stocks':
+            exchange = 'nyse' if params.get('exchange', '').upper() == 'NYSE' else 'nasdaq'
+            kind, payload = 'screener', self.store.screener(exchange)
+            missing = {'data': None, 'status': {'rCode': 404}}
+        else:
+            kind = 'raw'
+            recorded = self.store.raw(path, query)
+            with self._lock:
+                self.by_kind[kind] = self.by_kind.get(kind, 0) + 1
+            if recorded is not None:
+                return recorded
+            if '/fundamentals-timeseries/' in path:
+                # 기록되지 않은 재무제표는 빈 결과 (yfinance는 빈 DataFrame 반환)
+                return 200, {'timeseries': {'result': [], 'error': None}}
+            with self._lock:
+                self.not_found += 1
+            return 404, {'error': 'not recorded'}
+
+        with self._lock:
+            self.by_kind[kind] = self.by_kind.get(kind, 0) + 1
+            if payload is None:
+                self.not_found += 1
+        if payload is None:
+            return 404, missing
+        return 200, payload
+
+    def get_metrics(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'throttled': self.throttled,
+                'errors': self.errors,
+                'not_found': self.not_found,
+                'by_kind': dict(self.by_kind)
+            }
+
+def synthesize(root, count=6000, seed=1):
+    """합성 픽스처 생성 (manifest만 기록, 응답은 재생 시 생성)"""
+    universe = SyntheticUniverse(count, seed)
+    _write_json(os.path.join(root, 'manifest.json'), {
+        'source': 'synthetic',
+        'count': count,
+        'seed': seed,
+        'created_at': int(time.time()),
+        'symbols': universe.symbols
+    })
+    print(f"✅ 합성 픽스처 생성: {count}개 종목 ({root})")
+    return universe.symbols
+
+def _record_response(root, response):
+    """ticker.info, 재무제표 등 yfinance가 보낸 Yahoo 응답 저장 (세션 응답 훅)"""
+    parsed = urlparse(response.url)
+    if not http_client.is_yahoo_url(response.url) or response.status_code in (429, 403):
+        return
+    if '/finance/quoteSummary/' in parsed.path:
+        if response.status_code == 200:
+            symbol = parsed.path.rstrip('/').split('/')[-1].upper()
+            _write_json(os.path.join(root, 'info', f"{symbol}.json"), response.json())
+        return
+    if parsed.path.startswith('/v8/finance/chart/') or parsed.path.endswith('/finance/quote'):
+        return  # 차트와 현재가는 직접 기록
+    query = parse_qsl(parsed.query)
+    _write_json(os.path.join(root, 'raw', f"{raw_key(parsed.path, query)}.json"), {
+        'path': parsed.path,
+        'query': query,
+        'status': response.status_code,
+        'body': response.text
+    })
+
+def record(root, symbols=None, timeout=15):
+    """실제 API 응답 기록 - 종목 미지정 시 스크리너의 전체 종목"""
+    import async_fetcher
+    import symbol_fetcher
+
+    # 1. 스크리너 (NASDAQ, NYSE)
+    listed = []
+    for exchange, extra in [('nasdaq', {}), ('nyse', {'exchange': 'NYSE'})]:
+        params = {'tableonly': 'true', 'limit': 10000, 'offset': 0, 'download': 'true', **extra}
+        try:
+            response = http_client.nasdaq_get('/api/screener/stocks', params=params, timeout=30)
+            data = response.json()
+            _write_json(os.path.join(root, 'screener', f"{exchange}.json"), data)
+            listed.extend(row.get('symbol', '') for row in (data.get('data') or {}).get('rows') or [])
+        except Exception as e:
+            print(f"⚠️ {exchange} 스크리너 기록 실패: {str(e)}")
+    symbols = [s.upper() for s in symbols] if symbols else sorted(set(symbol_fetcher.filter_valid_symbols(listed)))
+    print(f"📊 기록 대상: {len(symbols)}개 종목")
+
+    # 2. 차트 (2년 전체, 재생 시 잘라서 응답) - 시장 국면 계산용 지수 포함
+    params = {'interval': '1d', 'range': FIXTURE_RANGE, 'includePrePost': 'false', 'events': 'div,splits'}
+    charts = 0
+    chart_symbols = symbols + [s for s in INDEXES if s not in symbols]
+    batch_size = max(config.FETCH_BATCH_SIZE, 1)
+    for start in range(0, len(chart_symbols), batch_size):
+        for symbol, (status, data) in async_fetcher.fetch_charts(chart_symbols[start:start + batch_size], params, timeout).items():
+            if status == 200 and data:
+                _write_json(os.path.join(root, 'chart', f"{symbol}.json"), data)
+                charts += 1
+
+    # 3. 현재가 (v7 quote 일괄)
+    requests = {}
+    chunk = max(config.QUOTE_BATCH_SIZE, 1)
+    for start in range(0, len(symbols), chunk):
+        requests[start] = ('/v7/finance/quote', {'symbols': ','.join(symbols[start:start + chunk])})
+    quotes = 0
+    for status, data in async_fetcher.fetch_many(requests, timeout).values():
+        for quote in ((data or {}).get('quoteResponse') or {}).get('result') or []:
+            _write_json(os.path.join(root, 'quote', f"{quote['symbol'].upper()}.json"), quote)
+            quotes += 1
+
+    # 4. ticker.info, 재무제표 (yfinance 요청을 세션 훅으로 기록)
+    def record_info(symbol):
+        session = http_client.get_session()
+        if not getattr(session, '_replay_recording', False):
+            session.hooks['response'].append(lambda response, *args, **kwargs: _record_response(root, response))
+            session._replay_recording = True
+        try:
+            ticker = http_client.get_ticker(symbol)
+            ticker.info
+            ticker.financials
+            ticker.quarterly_financials
+        except Exception:
+            pass
+
+    with ThreadPoolExecutor(max_workers=max(config.MONITOR_WORKERS, 1)) as executor:
+        list(executor.map(record_info, symbols))
+    # 훅이 남은 세션을 다른 작업이 쓰지 않도록 재생성
+    http_client.reset_pool()
+
+    _write_json(os.path.join(root, 'manifest.json'), {
+        'source': 'recorded',
+        'count': len(symbols),
+        'created_at': int(time.time()),
+        'symbols': symbols
+    })
+    print(f"✅ 기록 완료: 차트 {charts}개, 현재가 {quotes}개 ({root})")
+    return symbols
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Yahoo/NASDAQ 응답 기록·재생 서버')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    rec = commands.add_parser('record', help='실제 API 응답 기록')
+    rec.add_argument('fixtures')
+    rec.add_argument('symbols', nargs='*')
+
+    syn = commands.add_parser('synthesize', help='합성 종목 픽스처 생성')
+    syn.add_argument('fixtures')
+    syn.add_argument('count', nargs='?', type=int, default=6000)
+    syn.add_argument('--seed', type=int, default=1)
+
+    serve = commands.add_parser('serve', help='픽스처 재생 서버 실행')
+    serve.add_argument('fixtures')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--latency', type=float, default=0.0)
+    serve.add_argument('--error-rate', type=float, default=0.0)
+    serve.add_argument('--throttle-rate', type=float, default=0.0)
+    serve.add_argument('--seed', type=int, default=1)
+
+    args = parser.parse_args(argv)
+    if args.command == 'record':
+        record(args.fixtures, args.symbols or None)
+    elif args.command == 'synthesize':
+        synthesize(args.fixtures, args.count, args.seed)
+    else:
+        server = ReplayServer(args.fixtures, args.host, args.port, args.latency,
+                              args.error_rate, args.throttle_rate, args.seed)
+        print(f"✅ 재생 서버 시작: {server.url} (종목 {server.store.manifest.get('count', 0)}개)")
+        print(f"   YAHOO_BASE_URL={server.url} NASDAQ_BASE_URL={server.url} 로 설정 후 서버/스캔 실행")
+        try:
+            server.httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.httpd.server_close()
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,321 @@
+"""종목 점수 계산 파이프라인 - 방법론별 점수를 한 번에 계산
+
+CAN SLIM, 가치투자, 기술적 분석 점수를 공용 입력(일봉 배열, 재무 지표)으로 한 번씩만 계산하고,
+신호와 점수 근거 문장은 실제로 필요할 때만 만듭니다.
+
+전체 종목 일괄 계산: universe_table()로 종목별 입력을 특징 표(종목 x 항목)로 만들고
+score_universe()로 CAN SLIM·가치투자 점수를 배열 연산으로 한 번에 계산합니다 (종목별 계산과 동일한 값).
+"""
+import json
+import hashlib
+import time
+from collections import namedtuple
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import fundamentals
+import canslim_score
+import value_investing_score
+import signal_generator
+import shared_panel
+
+# 입력 재무 지표를 아직 조회하지 않음
+_UNSET = object()
+
+# 프로세스 풀로 보내는 점수 계산 입력 (일봉은 필요한 배열만, 재무 지표는 조회를 마친 값)
+# panel이 있으면 일봉 배열은 None이고 작업 프로세스가 공유 메모리 패널(shared_panel)에서 읽음
+# key는 입력 전체의 해시 (ScoreInputs.input_key - 같으면 지난 결과 재사용)
+ScoreJob = namedtuple('ScoreJob', ['symbol', 'close', 'high', 'volume', 'info', 'rs_rating', 'regime', 'technical', 'panel', 'key'])
+
+# 묶음 계산 결과 점수 배열의 열 (계산에 실패한 방법론은 NaN, 작업 자체가 실패하면 price도 NaN)
+RESULT_COLUMNS = ('price', 'canslim', 'value', 'technical')
+
+class Reasons:
+    """점수 근거 - 문장 틀과 값만 기록하고 to_dict()에서 문장 생성"""
+    __slots__ = ('_items',)
+
+    def __init__(self):
+        self._items = []
+
+    def add(self, key, template, *args):
+        self._items.append((key, template, args))
+
+    def __len__(self):
+        return len(self._items)
+
+    def to_dict(self):
+        return {key: template.format(*args) if args else template for key, template, args in self._items}
+
+class ScoreInputs:
+    """종목 1개의 점수 계산 입력 (방법론 공용)
+
+    일봉은 컬럼별 NumPy 배열로 한 번만 꺼내고, 재무 지표는 처음 필요할 때 한 번만 조회합니다.
+    info를 넘기면 조회하지 않고 그대로 사용합니다 (None이면 재무 지표 없음).
+    rs_rating은 스캔 전체 기준 상대강도 등급(1-99, relative_strength)이며 없으면 None입니다.
+    regime은 스캔 시작 시 계산한 시장 국면(market_regime.MarketRegime)으로 모든 종목이 같은 객체를 공유합니다.
+    technical은 패널 모드(signal_generator.calculate_scores)로 미리 계산한 기술적 점수이며 없으면 None입니다.
+    """
+
+    def __init__(self, symbol, price_data, info=_UNSET, rs_rating=None, regime=None, technical=None):
+        self.symbol = symbol
+        self.price_data = price_data
+        self.rs_rating = rs_rating
+        self.regime = regime
+        self.technical = technical
+        self.length = 0 if price_data is None else len(price_data)
+        if self.length:
+            self.close = price_data['Close'].to_numpy(dtype=np.float64)
+            self.high = price_data['High'].to_numpy(dtype=np.float64)
+            self.volume = price_data['Volume'].to_numpy(dtype=np.float64)
+        self._info = info
+
+    @classmethod
+    def from_job(cls, job):
+        """ScoreJob → ScoreInputs (일봉 DataFrame 없이 배열만 사용, 패널 위치가 있으면 공유 메모리 뷰)"""
+        inputs = cls(job.symbol, None, job.info, job.rs_rating, job.regime, job.technical)
+        if job.panel is not None:
+            inputs.close, inputs.high, inputs.volume = shared_panel.arrays(job.panel)
+        else:
+            inputs.close, inputs.high, inputs.volume = job.close, job.high, job.volume
+        inputs.length = len(inputs.close)
+        return inputs
+
+    def to_job(self, panel=None):
+        """프로세스 풀로 보낼 ScoreJob (재무 지표를 아직 조회하지 않았으면 여기서 조회)
+
+        panel: 공유 메모리 패널 위치 (shared_panel.PanelSlice) - 있으면 일봉 배열을 담지 않음
+        """
+        key = self.input_key()
+        if panel is not None:
+            return ScoreJob(self.symbol, None, None, None, self.info, self.rs_rating, self.regime, self.technical, panel, key)
+        return ScoreJob(self.symbol, self.close, self.high, self.volume, self.info,
+                        self.rs_rating, self.regime, self.technical, None, key)
+
+    def input_key(self):
+        """점수 계산 입력 전체(일봉 배열, 재무 지표, 상대강도 등급, 시장 국면, 기술적 점수)의 해시"""
+        digest = hashlib.blake2b(digest_size=16)
+        for values in (self.close, self.high, self.volume):
+            digest.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+        # 시장 국면 계산 시각은 점수에 쓰지 않으므로 제외
+        regime = None if self.regime is None else self.regime._replace(computed_at=None)
+        digest.update(repr((self.rs_rating, self.technical, regime)).encode())
+        digest.update(json.dumps(self.info, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    @property
+    def last_close(self):
+        return float(self.close[-1])
+
+    @property
+    def info(self):
+        """재무 지표 (없으면 None) - 속도 제한이면 YFRateLimitError를 그대로 올림 (호출한 쪽에서 백오프 후 재시도)"""
+        if self._info is _UNSET:
+            try:
+                self._info = fundamentals.get_info(self.symbol, self.price_data)
+            except (KeyError, IndexError, TypeError, ValueError):
+                # 응답·일봉에 필요한 값이 없음 - 재무 지표 없이 점수 계산
+                self._info = None
+        return self._info
+
+def make_signal(symbol, method, score, price, reasons=None):
+    """신호 딕셔너리 (점수가 있으면 7.5점 미만이어도 반환)"""
+    signal = {
+        'symbol': symbol,
+        'level': 'BUY' if score >= 7.5 else 'WATCH',
+        'score': round(score, 2),
+        'price': round(price, 2),
+        'date': datetime.now().isoformat()
+    }
+    if reasons is not None:
+        signal['reasons'] = reasons.to_dict()
+    signal['method'] = method
+    return signal
+
+class ScoreResult:
+    """종목 1개의 방법론별 점수와 선택된 신호"""
+
+    def __init__(self, symbol, price, canslim, value, technical, rs_rating=None):
+        self.symbol = symbol
+        self.price = price
+        self.rs_rating = rs_rating
+        self._results = {'canslim': canslim, 'value_investing': value, 'technical': technical}
+        self.canslim_score = round(canslim[0], 2) if canslim else 0.0
+        self.value_score = round(value[0], 2) if value else 0.0
+        self.technical_score = round(technical[0], 2) if technical else 0.0
+        self.total_score = max(self.canslim_score, self.value_score, self.technical_score)
+        # CAN SLIM 우선, 계산에 실패한 경우에만 가치투자 → 기술적 분석 순으로 사용
+        self.method = next((m for m, r in self._results.items() if r is not None), None)
+
+    @property
+    def signal_candidate(self):
+        """신호를 만들 종목인지 (총점 6.5점 이상 또는 CAN SLIM 5점 이상)"""
+        return self.total_score >= 6.5 or self.canslim_score >= 5.0
+
+    def pack(self):
+        """묶음 계산 결과 한 행 (RESULT_COLUMNS 순서의 점수, 선택된 방법론 근거 - 신호 후보가 아니면 None)"""
+        row = [self.price] + [np.nan if r is None else r[0] for r in self._results.values()]
+        reasons = self._results[self.method][1] if self.method is not None and self.signal_candidate else None
+        return row, reasons
+
+    @classmethod
+    def unpack(cls, symbol, row, reasons=None, rs_rating=None):
+        """pack() 결과 → ScoreResult (근거는 선택된 방법론에만 붙음)"""
+        results = [None if np.isnan(score) else (float(score), None) for score in row[1:]]
+        method = next((i for i, r in enumerate(results) if r is not None), None)
+        if method is not None:
+            results[method] = (results[method][0], reasons)
+        return cls(symbol, float(row[0]), *results, rs_rating=rs_rating)
+
+    def signal(self):
+        """선택된 방법론의 신호 (모든 방법론 점수 포함) - 근거 문장은 이때 생성"""
+        if self.method is None:
+            return None
+        score, reasons = self._results[self.method]
+        signal = make_signal(self.symbol, self.method, score, self.price, reasons)
+        signal['canslim_score'] = self.canslim_score
+        signal['value_score'] = self.value_score
+        signal['technical_score'] = self.technical_score
+        signal['total_score'] = self.total_score
+        if self.rs_rating is not None:
+            signal['rs_rating'] = self.rs_rating
+        return signal
+
+def _technical(inputs):
+    if inputs.technical is not None:
+        return inputs.technical, None
+    return signal_generator.score_arrays(inputs.close, inputs.volume), None
+
+def _safe(scorer, inputs):
+    """방법론 1개 계산 - 실패하면 None"""
+    try:
+        return scorer(inputs)
+    except Exception:
+        return None
+
+def _evaluate(inputs):
+    return ScoreResult(
+        inputs.symbol,
+        inputs.last_close,
+        _safe(canslim_score.score_canslim, inputs),
+        _safe(value_investing_score.score_value, inputs),
+        _safe(_technical, inputs),
+        inputs.rs_rating
+    )
+
+def evaluate(symbol, price_data, info=_UNSET, rs_rating=None, regime=None, technical=None):
+    """모든 방법론 점수를 한 번씩 계산 - ScoreResult (일봉이 없으면 None)
+
+    technical을 넘기면 기술적 점수는 다시 계산하지 않고 그대로 사용합니다.
+    """
+    if price_data is None or price_data.empty:
+        return None
+    return _evaluate(ScoreInputs(symbol, price_data, info, rs_rating, regime, technical))
+
+def evaluate_job(job):
+    """ScoreJob → ScoreResult (프로세스 풀 작업 - 네트워크·DB 접근 없이 CPU 계산만)"""
+    return _evaluate(ScoreInputs.from_job(job))
+
+def evaluate_batch(jobs):
+    """ScoreJob 묶음 → (점수 배열 (작업 수 x RESULT_COLUMNS), {행 번호: 근거}, 작업별 계산 시간 배열 (초)) - 프로세스 풀 작업
+
+    결과를 작게 돌려보내려고 점수는 배열 하나에 담고, 근거는 신호 후보 종목의 선택된 방법론만 담습니다.
+    """
+    scores = np.full((len(jobs), len(RESULT_COLUMNS)), np.nan)
+    seconds = np.zeros(len(jobs))
+    reasons = {}
+    for index, job in enumerate(jobs):
+        started = time.perf_counter()
+        try:
+            row, reason = _evaluate(ScoreInputs.from_job(job)).pack()
+        except Exception:
+            continue
+        finally:
+            seconds[index] = time.perf_counter() - started
+        scores[index] = row
+        if reason is not None:
+            reasons[index] = reason
+    return scores, reasons, seconds
+
+def unpack_batch(jobs, scores, reasons):
+    """evaluate_batch 결과 → 작업 순서대로 ScoreResult 목록 (실패한 작업은 None)"""
+    return [
+        None if np.isnan(row[0]) else ScoreResult.unpack(job.symbol, row, reasons.get(index), job.rs_rating)
+        for index, (job, row) in enumerate(zip(jobs, scores))
+    ]
+
+# ============================================
+# 전체 종목 일괄 계산 (특징 표)
+# ============================================
+
+# 특징 표에 담는 재무 지표 (info 키 - 없으면 NaN)
+INFO_FEATURES = (
+    'earningsQuarterlyGrowth', 'earningsGrowth', 'revenueGrowth', 'returnOnEquity', 'profitMargins',
+    'heldPercentInstitutions', 'volume', 'averageVolume', 'fiftyTwoWeekHigh', 'fiftyTwoWeekLow',
+    'trailingPE', 'priceToBook', 'debtToEquity', 'currentRatio', 'pegRatio', 'dividendYield'
+)
+
+FEATURE_COLUMNS = (
+    'length', 'has_info', 'price_from_close', 'current_price', 'last_close', 'close_20', 'close_60', 'close_120',
+    'recent_high_60', 'recent_volume', 'avg_volume_20', 'prev_volume_avg', 'rs_rating'
+) + INFO_FEATURES
+
+def _close_at(close, offset):
+    return close[-offset] if len(close) >= offset else np.nan
+
+def feature_row(inputs):
+    """ScoreInputs → 특징 표의 한 행 (일봉 파생 값 + 재무 지표, 종목별 계산과 같은 방식)"""
+    row = {'length': inputs.length, 'has_info': False}
+    if inputs.length < 20:
+        return row
+    info = inputs.info
+    close, volume = inputs.close, inputs.volume
+    row['has_info'] = info is not None
+    info = info or {}
+
+    current_price = info.get('currentPrice', info.get('regularMarketPrice', 0))
+    row['price_from_close'] = current_price == 0
+    row['current_price'] = close[-1] if current_price == 0 else current_price
+    row['last_close'] = close[-1]
+    row['close_20'] = close[-20]
+    row['close_60'] = _close_at(close, 60)
+    row['close_120'] = _close_at(close, 120)
+    row['recent_high_60'] = np.nanmax(inputs.high[-60:]) if inputs.length >= 60 else np.nan
+    row['recent_volume'] = np.nanmean(volume[-5:])
+    row['avg_volume_20'] = np.nanmean(volume[-20:])
+    row['prev_volume_avg'] = np.nanmean(volume[-20:-10])
+    row['rs_rating'] = np.nan if inputs.rs_rating is None else inputs.rs_rating
+    for key in INFO_FEATURES:
+        row[key] = info.get(key, np.nan)
+    return row
+
+def universe_table(inputs_list):
+    """ScoreInputs 목록 → 특징 표 (index: 종목, 값이 없으면 NaN)"""
+    rows = [feature_row(inputs) for inputs in inputs_list]
+    table = pd.DataFrame.from_records(rows, index=[inputs.symbol for inputs in inputs_list], columns=FEATURE_COLUMNS)
+    for column in ('has_info', 'price_from_close'):
+        table[column] = table[column].eq(True)
+    return table
+
+def ladder(values, bins, points, right=False):
+    """임계값 사다리 점수 - if/elif 연쇄를 np.digitize로 한 번에 계산
+
+    right=False: bins[i-1] <= x < bins[i] (>= 비교 사다리), right=True: bins[i-1] < x <= bins[i] (<= 비교 사다리).
+    points는 구간별 점수 (len(bins) + 1개).
+    """
+    return np.asarray(points, dtype=np.float64)[np.digitize(values, bins, right=right)]
+
+def normalize(score, max_score):
+    """종목별 계산과 같은 10점 정규화 - (score / max_score) * 10.0, 최대 10점"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        normalized = np.where(max_score > 0, (score / max_score) * 10.0, 0.0)
+    return np.minimum(normalized, 10.0)
+
+def score_universe(table, regime=None):
+    """특징 표 전체의 CAN SLIM·가치투자 점수 (종목별 score_canslim/score_value와 같은 값)
+
+    regime: 시장 국면 (market_regime.MarketRegime, 모든 종목 공통)
+    """
+    return pd.DataFrame({
+        'canslim_score': canslim_score.score_canslim_table(table, regime),
+        'value_score': value_investing_score.score_value_table(table)
+    }, index=table.index)
@@ -9,10 +9,13 @@ from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from datetime import datetime
 import config
+import rate_limiter
+import fundamentals
+import market_regime
 from monitor import StockMonitor
 from database import Database
 from stock_info import get_stock_info, get_recommendation_reason, get_recent_news, get_pros_cons
-from data_fetcher import fetch_stock_data
+from data_fetcher import fetch_stock_data, get_current_prices, get_provider_metrics, get_history_cache_metrics
 import requests
 import json
 
@@ -68,9 +71,11 @@ def send_notification(message):
     except:
         return False
 
-def format_signal_message(signals):
-    """신호 메시지 포맷팅"""
+def format_signal_message(signals, coverage=None):
+    """신호 메시지 포맷팅 (coverage: 부분 스캔이면 처리한 종목 비율)"""
     message = "🔔 <b>새로운 매수 신호 발견!</b>\n\n"
+    if coverage is not None:
+        message += f"⏹️ 부분 스캔 (전체 종목의 {coverage:.0%}만 처리)\n\n"
     for signal in signals[:10]:  # 최대 10개만
         message += f"📈 {signal['symbol']}\n"
         message += f"   점수: {signal['score']}/10\n"
@@ -98,26 +103,85 @@ def init_scheduler():
     except Exception as e:
         print(f"⚠️ 신호 복원 실패: {str(e)}")
     
+    # 기술적 지표 상태 복원 (다음 스캔에서 전체 이력을 다시 계산하지 않음)
+    try:
+        restored_states = monitor.load_indicator_states(db.get_indicator_states())
+        if restored_states:
+            print(f"✅ 데이터베이스에서 {restored_states}개 종목 지표 상태 복원 완료")
+    except Exception as e:
+        print(f"⚠️ 지표 상태 복원 실패: {str(e)}")
+    
+    # 스캔 우선순위 기록 복원 (재시작 후에도 hot 종목부터 수집하고 등급별 수집 주기 유지)
+    try:
+        restored_priorities = monitor.priority.load(db.get_scan_priorities())
+        if restored_priorities:
+            print(f"✅ 데이터베이스에서 {restored_priorities}개 종목 스캔 우선순위 복원 완료")
+    except Exception as e:
+        print(f"⚠️ 스캔 우선순위 복원 실패: {str(e)}")
+    
+    # 지난 스캔 상대강도 분포 복원 (다음 스캔에서 전체 종목 수집을 기다리지 않고 배치마다 등급 계산)
+    try:
+        restored_ratings = monitor.load_rs_ratings(db.get_rs_ratings(weighted_returns=True))
+        if restored_ratings:
+            print(f"✅ 데이터베이스에서 {restored_ratings}개 종목 상대강도 분포 복원 완료")
+    except Exception as e:
+        print(f"⚠️ 상대강도 분포 복원 실패: {str(e)}")
+    
+    # 스캔 체크포인트 저장소 연결 및 중단된 스캔 재개 (완료된 종목은 다시 수집하지 않음)
+    monitor.checkpoint_store = db
+    resume_interrupted_scan()
+    
     # 하루 2번 스캔: 22:30 (미국 시장 개장 시)와 02:30 (4시간 후)
     scheduler.add_job(
         scheduled_scan,
         CronTrigger(hour=22, minute=30, timezone='Asia/Seoul'),
         id='scan_morning',
-        replace_existing=True
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True
     )
     
     scheduler.add_job(
         scheduled_scan,
         CronTrigger(hour=2, minute=30, timezone='Asia/Seoul'),
         id='scan_afternoon',
-        replace_existing=True
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True
     )
     
     scheduler.start()
     print("✅ 스케줄러 시작됨: 매일 22:30, 02:30에 자동 스캔")
 
+def resume_interrupted_scan():
+    """재시작 전에 중단된 스캔이 있으면 남은 종목만 백그라운드에서 이어서 스캔"""
+    try:
+        run = db.get_interrupted_scan()
+        if run is None:
+            return
+        age_hours = (datetime.now() - datetime.fromisoformat(run['started_at'])).total_seconds() / 3600
+        if age_hours > config.SCAN_RESUME_MAX_AGE_HOURS:
+            db.finish_scan_run(run['id'], 'abandoned')
+            print(f"⚠️ 중단된 스캔이 {age_hours:.1f}시간 전 것이라 재개하지 않음 (다음 예약 스캔에서 전체 스캔)")
+            return
+        print(f"🔁 중단된 스캔 발견: {len(run['results'])}/{len(run['symbols'])}개 종목 완료 - 남은 종목 재개")
+    except Exception as e:
+        print(f"⚠️ 중단된 스캔 확인 실패: {str(e)}")
+        return
+    
+    import threading
+    thread = threading.Thread(target=scheduled_scan_async, kwargs={'resume': run})
+    thread.daemon = True
+    thread.start()
+
 def scheduled_scan():
-    """스케줄된 스캔 실행 (스케줄러용 - 실시간 업데이트 사용)"""
+    """스케줄된 스캔 실행 (스케줄러용 - 실시간 업데이트 사용)
+
+    이전 스캔이 아직 진행 중이면 건너뜁니다 (스캔은 SCAN_DEADLINE_MINUTES 안에 끝나므로 다음 예약 스캔과 겹치지 않음).
+    """
+    if scan_status['is_scanning']:
+        print(f"⏭️ 이전 스캔이 진행 중이라 예약 스캔을 건너뜀 (시작: {scan_status['start_time']})")
+        return
     scheduled_scan_with_realtime()
 
 @app.route('/')
@@ -145,6 +209,12 @@ def status():
         'interval_minutes': int(os.environ.get('MONITOR_INTERVAL', '60')),
         'symbol_count': symbol_count,
         'is_full_scan': symbol_count_str == '0' or symbol_count_str == '',
+        'rate_limit': rate_limiter.get_metrics(),
+        'providers': get_provider_metrics(),
+        'history_cache': get_history_cache_metrics(),
+        'fundamentals': fundamentals.get_metrics(),
+        'market_regime': market_regime.to_dict(market_regime.get_latest()) or db.get_market_regime(),
+        'last_scan': monitor.last_scan_metrics if monitor is not None else {},
         'timestamp': datetime.now().isoformat()
     })
 
@@ -188,7 +258,9 @@ scan_status = {
     'progress': 0,
     'total': 0,
     'found_signals': [],
-    'start_time': None
+    'start_time': None,
+    'last_status': None,  # 마지막 스캔 결과 (completed / partial)
+    'coverage': None  # 마지막 스캔에서 처리한 종목 비율
 }
 
 @app.route('/scan', methods=['POST', 'GET'])
@@ -226,11 +298,32 @@ def get_scan_status():
         'total': scan_status['total'],
         'found_count': len(scan_status['found_signals']),
         'start_time': scan_status['start_time'],
+        'last_status': scan_status['last_status'],
+        'coverage': scan_status['coverage'],
+        'timestamp': datetime.now().isoformat()
+    })
+
+@app.route('/scan/cancel', methods=['POST'])
+def cancel_scan():
+    """진행 중인 스캔 취소 (처리된 종목 결과는 저장하고 부분 스캔으로 종료)"""
+    if not scan_status['is_scanning'] or monitor is None or not monitor.cancel_scan():
+        return jsonify({
+            'status': 'idle',
+            'message': '진행 중인 스캔이 없습니다.',
+            'timestamp': datetime.now().isoformat()
+        })
+    
+    print(f"⏹️ 스캔 취소 요청 ({scan_status['progress']}/{scan_status['total']}개 처리)")
+    return jsonify({
+        'status': 'cancelling',
+        'message': '스캔을 중단합니다. 처리된 종목 결과는 저장됩니다.',
+        'progress': scan_status['progress'],
+        'total': scan_status['total'],
         'timestamp': datetime.now().isoformat()
     })
 
-def scheduled_scan_async():
-    """비동기 스캔 실행 (웹에서 즉시 스캔 버튼 클릭 시)"""
+def scheduled_scan_async(resume=None):
+    """비동기 스캔 실행 (웹에서 즉시 스캔 버튼 클릭 시, 중단된 스캔 재개 시)"""
     global scan_status
     
     try:
@@ -239,14 +332,14 @@ def scheduled_scan_async():
         scan_status['found_signals'] = []
         scan_status['start_time'] = datetime.now().isoformat()
         
-        scheduled_scan_with_realtime()
+        scheduled_scan_with_realtime(resume)
         
     finally:
         scan_status['is_scanning'] = False
         scan_status['progress'] = scan_status['total']  # 완료 표시
 
-def scheduled_scan_with_realtime():
-    """실시간 업데이트가 있는 스캔"""
+def scheduled_scan_with_realtime(resume=None):
+    """실시간 업데이트가 있는 스캔 (resume: 중단된 스캔 - 남은 종목만 스캔)"""
     global scan_status, monitor
     
     # 스캔 상태 초기화 (스케줄러에서 직접 호출될 때도 설정)
@@ -267,33 +360,38 @@ def scheduled_scan_with_realtime():
             monitor = StockMonitor(scan_interval_minutes=240, save_history=True)
             print("✅ monitor 객체 초기화 완료")
         
-        # 종목 리스트 가져오기
-        symbol_count_str = os.environ.get('MONITOR_SYMBOL_COUNT', '0')
-        symbol_count = int(symbol_count_str) if symbol_count_str else 0
+        if resume is not None:
+            # 중단된 스캔의 종목 목록 (완료된 종목은 모니터에서 제외)
+            symbols = resume['symbols']
+            print(f"🔁 중단된 스캔 재개: {len(symbols)}개 종목 중 {len(resume['results'])}개 완료")
+        else:
+            # 종목 리스트 가져오기
+            symbol_count_str = os.environ.get('MONITOR_SYMBOL_COUNT', '0')
+            symbol_count = int(symbol_count_str) if symbol_count_str else 0
         
-        all_symbols = get_all_symbols()
+            all_symbols = get_all_symbols()
         
-        if symbol_count == 0 or symbol_count >= len(all_symbols):
-            symbols = all_symbols
-            print(f"📊 전체 종목 스캔: {len(symbols)}개 종목")
-        else:
-            symbols = all_symbols[:symbol_count]
-            print(f"📊 제한된 종목 스캔: {len(symbols)}개 종목 (전체: {len(all_symbols)}개)")
-        
-        # 특수 문자 및 우선주 필터링 (symbol_fetcher에서 이미 필터링되었지만 이중 체크)
-        valid_symbols = []
-        for s in symbols:
-            s_upper = s.upper().strip()
-            # 우선주 제외
-            if ('.PR' in s_upper or s_upper.endswith('-P') or 
-                any(s_upper.endswith(f'-{chr(i)}') for i in range(65, 91))):  # -A ~ -Z
-                continue
-            # 특수 문자 제외
-            if '^' not in s_upper and '/' not in s_upper and '$' not in s_upper:
-                valid_symbols.append(s_upper)
-        
-        symbols = valid_symbols
-        print(f"📊 최종 스캔 대상: {len(symbols)}개 종목 (우선주/상장폐지 제외)")
+            if symbol_count == 0 or symbol_count >= len(all_symbols):
+                symbols = all_symbols
+                print(f"📊 전체 종목 스캔: {len(symbols)}개 종목")
+            else:
+                symbols = all_symbols[:symbol_count]
+                print(f"📊 제한된 종목 스캔: {len(symbols)}개 종목 (전체: {len(all_symbols)}개)")
+        
+            # 특수 문자 및 우선주 필터링 (symbol_fetcher에서 이미 필터링되었지만 이중 체크)
+            valid_symbols = []
+            for s in symbols:
+                s_upper = s.upper().strip()
+                # 우선주 제외
+                if ('.PR' in s_upper or s_upper.endswith('-P') or 
+                    any(s_upper.endswith(f'-{chr(i)}') for i in range(65, 91))):  # -A ~ -Z
+                    continue
+                # 특수 문자 제외
+                if '^' not in s_upper and '/' not in s_upper and '$' not in s_upper:
+                    valid_symbols.append(s_upper)
+        
+            symbols = valid_symbols
+            print(f"📊 최종 스캔 대상: {len(symbols)}개 종목 (우선주/상장폐지 제외)")
         
         scan_status['total'] = len(symbols)
         scan_status['progress'] = 0
@@ -308,7 +406,8 @@ def scheduled_scan_with_realtime():
                 symbols=symbols,
                 timeframe=os.environ.get('MONITOR_TIMEFRAME', 'short_swing'),
                 max_workers=int(os.environ.get('MONITOR_WORKERS', '20')),
-                progress_callback=update_scan_progress
+                progress_callback=update_scan_progress,
+                resume=resume
             )
         except Exception as scan_error:
             print(f"❌ 스캔 실행 중 오류 발생: {str(scan_error)}")
@@ -316,6 +415,12 @@ def scheduled_scan_with_realtime():
             traceback.print_exc()
             new_signals = []
         
+        # 시간 예산 초과·취소로 중단된 부분 스캔
+        scan_metrics = monitor.last_scan_metrics if monitor else {}
+        scan_status['last_status'] = scan_metrics.get('status')
+        scan_status['coverage'] = scan_metrics.get('coverage')
+        partial_coverage = scan_metrics.get('coverage') if scan_metrics.get('status') == 'partial' else None
+        
         # 6.5점 이상 종목 모두 수집 (매수 신호 + 관찰 종목)
         watch_score = 6.5
         buy_score = 7.5
@@ -333,6 +438,7 @@ def scheduled_scan_with_realtime():
                         'canslim_score': data.get('canslim_score', 0),
                         'value_score': data.get('value_score', 0),
                         'technical_score': data.get('technical_score', 0),
+                        'rs_rating': data.get('rs_rating'),
                         'price': data.get('price', 0),
                         'date': data.get('date', datetime.now().isoformat())
                     })
@@ -346,16 +452,61 @@ def scheduled_scan_with_realtime():
         print(f"   - 관찰 종목: {len(watch_signals)}개 (6.5-7.5점)")
         print(f"{'='*50}\n")
         
+        scan_id = None
         if all_qualified_signals:
             try:
-                db.save_scan(all_qualified_signals)
+                scan_id = db.save_scan(all_qualified_signals)
                 print(f"✅ 스캔 결과 저장 완료: {len(all_qualified_signals)}개 종목 (6.5점 이상)")
             except Exception as e:
                 print(f"⚠️ 스캔 결과 저장 실패: {str(e)}")
         
+        # 전체 종목 상대강도 등급·시장 국면은 스캔 실행(scan_runs) 기준으로 저장 (오래된 등급은 정리)
+        rs_ratings = monitor.rs_ranking.rows() if monitor and monitor.rs_ranking is not None else None
+        regime = market_regime.to_dict(monitor.market_regime) if monitor else None
+        run_id = scan_metrics.get('run_id')
+        if run_id is not None and (rs_ratings or regime):
+            try:
+                db.save_scan_context(run_id, rs_ratings=rs_ratings, regime=regime)
+                print(f"✅ 상대강도 등급 {len(rs_ratings or [])}개·시장 국면 저장 완료 (최근 {config.RS_RATINGS_KEEP_SCANS}회 스캔 보관)")
+            except Exception as e:
+                print(f"⚠️ 상대강도 등급·시장 국면 저장 실패: {str(e)}")
+        
+        # 스캔 측정 요약 저장 (단계별 소요 시간 백분위, 결과 분류, 처리량)
+        if scan_metrics.get('telemetry'):
+            try:
+                db.save_scan_metrics(scan_metrics, scan_id)
+            except Exception as e:
+                print(f"⚠️ 스캔 측정 저장 실패: {str(e)}")
+        
+        # 확정 봉이 바뀐 종목의 기술적 지표 상태 저장 (장중 재스캔은 대부분 변경 없음)
+        if monitor:
+            try:
+                states = monitor.pop_changed_indicator_states()
+                db.save_indicator_states(states, scan_id)
+                if states:
+                    print(f"✅ 지표 상태 저장 완료: {len(states)}개 종목")
+            except Exception as e:
+                print(f"⚠️ 지표 상태 저장 실패: {str(e)}")
+            
+            # 종목별 점수·유동성·수집 시각 저장 (다음 시작 시 스캔 순서·등급별 수집 주기 복원)
+            try:
+                db.save_scan_priorities(monitor.priority.rows())
+            except Exception as e:
+                print(f"⚠️ 스캔 우선순위 저장 실패: {str(e)}")
+        
+        # 보유 신호 전체의 일일 가격 갱신 (수익률 계산용, 일괄 조회)
+        try:
+            held = db.get_latest_signals(limit=500)
+            scores = {sym: data.get('score') for sym, data in held.items()}
+            scores.update({s['symbol']: s['score'] for s in all_qualified_signals})
+            prices = refresh_signal_prices(list(scores.keys()), scores)
+            print(f"✅ 일일 가격 갱신 완료: {len(prices)}/{len(scores)}개 종목")
+        except Exception as e:
+            print(f"⚠️ 일일 가격 갱신 실패: {str(e)}")
+        
         # 전체 스캔 완료 후에만 텔레그램 알림 전송 (6.5점 이상 모두)
         if all_qualified_signals:
-            message = format_signal_message(all_qualified_signals)
+            message = format_signal_message(all_qualified_signals, partial_coverage)
             success = send_notification(message)
             if success:
                 print(f"✅ 텔레그램 알림 전송 완료: {len(all_qualified_signals)}개 종목")
@@ -371,6 +522,7 @@ def update_scan_progress(completed, total, new_signal):
     """스캔 진행 상황 업데이트"""
     global scan_status
     scan_status['progress'] = completed
+    scan_status['total'] = total  # 사전 필터로 제외된 종목은 빠진 수
     
     # 새로운 신호 발견 시 실시간으로 추가 (6.5점 이상)
     if new_signal:
@@ -403,6 +555,28 @@ def get_scans():
         'timestamp': datetime.now().isoformat()
     })
 
+@app.route('/scans/metrics')
+def get_scan_metrics():
+    """스캔별 측정 요약 (단계별 종목당 소요 시간 p50/p95/p99, 결과 분류, 처리량)
+
+    최신 스캔의 처리량을 이전 스캔들의 중앙값과 비교한 값(throughput_change)을 함께 반환합니다.
+    """
+    limit = int(request.args.get('limit', 50))
+    rows = db.get_scan_metrics(limit)
+    
+    throughput_change = None
+    previous = [row['throughput'] for row in rows[1:] if row['throughput'] and row['status'] == 'completed']
+    if rows and rows[0]['throughput'] and previous:
+        baseline = sorted(previous)[len(previous) // 2]
+        throughput_change = round(rows[0]['throughput'] / baseline - 1, 3)
+    
+    return jsonify({
+        'scans': rows,
+        'count': len(rows),
+        'throughput_change': throughput_change,
+        'timestamp': datetime.now().isoformat()
+    })
+
 @app.route('/signals/by-date')
 def get_signals_by_date():
     """특정 날짜의 검색된 종목 조회"""
@@ -499,6 +673,46 @@ def get_available_dates():
             'dates': []
         }), 500
 
+# 현재가 캐시 (대시보드 새로고침마다 Yahoo를 호출하지 않도록)
+PRICE_CACHE_SECONDS = 60
+price_cache = {'prices': {}, 'updated_at': {}}
+
+def refresh_signal_prices(symbols, scores=None):
+    """신호 종목 현재가 일괄 조회 후 캐시 및 daily_prices 갱신 - {symbol: 현재가 정보} 반환"""
+    quotes = get_current_prices(symbols)
+    now = datetime.now().timestamp()
+    for symbol, quote in quotes.items():
+        price_cache['prices'][symbol] = quote
+        price_cache['updated_at'][symbol] = now
+    if quotes:
+        db.save_daily_prices({sym: q['price'] for sym, q in quotes.items()}, scores)
+    return quotes
+
+@app.route('/signals/prices')
+def get_signal_prices():
+    """신호 종목 현재가 일괄 조회 (symbols 미지정 시 보유 신호 전체)"""
+    try:
+        symbols_arg = request.args.get('symbols', '')
+        if symbols_arg:
+            symbols = [s.strip().upper() for s in symbols_arg.split(',') if s.strip()]
+        else:
+            symbols = list(db.get_latest_signals(limit=500).keys())
+        
+        # 캐시가 만료된 종목만 조회
+        now = datetime.now().timestamp()
+        stale = [s for s in symbols if now - price_cache['updated_at'].get(s, 0) > PRICE_CACHE_SECONDS]
+        if stale:
+            refresh_signal_prices(stale)
+        
+        prices = {s: price_cache['prices'][s] for s in symbols if s in price_cache['prices']}
+        return jsonify({
+            'prices': prices,
+            'count': len(prices),
+            'timestamp': datetime.now().isoformat()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e), 'prices': {}, 'count': 0}), 500
+
 @app.route('/symbol/<symbol>')
 def get_symbol_detail(symbol):
     """종목 상세 정보"""
@@ -530,7 +744,7 @@ def get_symbol_detail(symbol):
 def get_chart_data(symbol):
     """차트 데이터 (전체 기간)"""
     try:
-        # 전체 기간 데이터 가져오기 (최대 2년)
+        # 전체 기간 데이터 가져오기 (최대 2년, 일봉 저장소에 있으면 요청 없이 읽음)
         data = fetch_stock_data(symbol, period='2y')
         if data is None or data.empty:
             # 2년 데이터가 없으면 1년 시도
@@ -571,6 +785,8 @@ def get_chart_data(symbol):
             'candles': candles,
             'markers': markers
         })
+    except rate_limiter.YFRateLimitError:
+        return jsonify({'error': '데이터 요청이 일시적으로 제한되었습니다. 잠시 후 다시 시도해주세요.'}), 429
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
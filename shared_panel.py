@@ -0,0 +1,95 @@
+"""공유 메모리 일봉 패널 - 점수 계산 프로세스에 일봉 배열을 복사 없이 전달
+
+스캔에서 수집 배치마다 일봉(종가·고가·거래량)을 multiprocessing.shared_memory 블록 1개에
+종목별로 이어 붙여 저장하고, 점수 계산 작업에는 블록 이름과 위치(PanelSlice)만 담습니다.
+작업 프로세스는 블록을 한 번 연결한 뒤 NumPy 뷰로 바로 읽습니다 (DataFrame 피클링 없음).
+블록은 배치의 모든 종목 결과가 나오면 해제하므로 스캔 중 공유 메모리는 진행 중인 배치 수만큼만 씁니다.
+
+블록 배치: float64 (PANEL_ROWS x 전체 봉 수) - 행 순서는 PANEL_COLUMNS
+"""
+from collections import namedtuple
+from multiprocessing import shared_memory
+import numpy as np
+
+# 패널에 담는 일봉 컬럼 (점수 계산에 쓰는 배열만)
+PANEL_COLUMNS = ('Close', 'High', 'Volume')
+PANEL_ROWS = len(PANEL_COLUMNS)
+
+# 점수 계산 작업에 담는 패널 위치 - name: 공유 메모리 이름, size: 전체 봉 수, start/length: 종목 구간
+PanelSlice = namedtuple('PanelSlice', ['name', 'size', 'start', 'length'])
+
+# 작업 프로세스에서 연결한 블록 {이름: (SharedMemory, 패널 뷰)} - MAX_ATTACHED개를 넘으면 가장 먼저 연결한 블록부터 닫음
+_attached = {}
+MAX_ATTACHED = 8
+
+class SharedPanel:
+    """수집 배치 1개의 공유 메모리 패널 (생성한 프로세스가 close()로 해제)"""
+
+    def __init__(self, frames):
+        """frames: {종목: 일봉 DataFrame} (비어 있는 일봉은 제외)"""
+        self.slices = {}
+        lengths = {symbol: len(frame) for symbol, frame in frames.items() if frame is not None and len(frame)}
+        size = sum(lengths.values())
+        self._memory = shared_memory.SharedMemory(create=True, size=max(size * PANEL_ROWS * 8, 8))
+        self.name = self._memory.name
+        try:
+            panel = np.ndarray((PANEL_ROWS, size), dtype=np.float64, buffer=self._memory.buf)
+            start = 0
+            for symbol, length in lengths.items():
+                frame = frames[symbol]
+                for row, column in enumerate(PANEL_COLUMNS):
+                    panel[row, start:start + length] = frame[column].to_numpy(dtype=np.float64)
+                self.slices[symbol] = PanelSlice(self._memory.name, size, start, length)
+                start += length
+            del panel
+        except Exception:
+            self.close()
+            raise
+        self.nbytes = size * PANEL_ROWS * 8
+
+    def slice(self, symbol, length):
+        """종목의 패널 위치 (패널에 없거나 봉 수가 다르면 None - 배열을 직접 전달)"""
+        panel_slice = self.slices.get(symbol)
+        if panel_slice is None or panel_slice.length != length:
+            return None
+        return panel_slice
+
+    def close(self):
+        """공유 메모리 해제 (배치 결과가 모두 나온 뒤 1회 - 작업 프로세스가 연결한 블록은 새 블록을 연결하면서 닫힘)"""
+        memory, self._memory = self._memory, None
+        if memory is None:
+            return
+        try:
+            memory.close()
+            memory.unlink()
+        except Exception:
+            pass
+
+def create(frames):
+    """수집 배치 결과로 공유 메모리 패널 생성 - 실패하면 None (작업에 배열을 직접 담음)"""
+    try:
+        return SharedPanel(frames)
+    except Exception:
+        return None
+
+def arrays(panel_slice):
+    """작업 프로세스에서 패널 위치 → (종가, 고가, 거래량) 배열 (공유 메모리 뷰, 복사 없음)"""
+    attached = _attached.get(panel_slice.name)
+    if attached is None:
+        for name in list(_attached)[:max(len(_attached) - MAX_ATTACHED + 1, 0)]:
+            _detach(name)
+        memory = shared_memory.SharedMemory(name=panel_slice.name)
+        panel = np.ndarray((PANEL_ROWS, panel_slice.size), dtype=np.float64, buffer=memory.buf)
+        panel.flags.writeable = False
+        attached = _attached[panel_slice.name] = (memory, panel)
+    panel = attached[1][:, panel_slice.start:panel_slice.start + panel_slice.length]
+    return panel[0], panel[1], panel[2]
+
+def _detach(name):
+    memory, panel = _attached.pop(name)
+    del panel
+    try:
+        memory.close()
+    except Exception:
+        # 아직 뷰를 쓰는 배열이 남아 있으면 닫지 않음 (프로세스 종료 시 해제)
+        pass
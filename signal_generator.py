@@ -1,94 +1,93 @@
 """매수 신호 생성"""
 import pandas as pd
 import numpy as np
-import ta
 from datetime import datetime
+import indicators
 
 # pandas의 isna 함수 사용
 pd_isna = pd.isna
 
+# 기술적 점수 계산에 필요한 최소 일봉 수
+MIN_BARS = 20
+
+# 패널 모드에서 한 번에 계산할 종목 수 (중간 배열이 CPU 캐시에 머물 만큼)
+PANEL_CHUNK = 256
+
+def score_values(values):
+    """지표 마지막 값(indicators.LastValues) → 점수 (0-10점, 2차원 입력이면 종목별 배열)
+
+    NaN(계산할 수 없는 지표)은 비교 결과가 거짓이므로 점수에 더해지지 않습니다.
+    """
+    rsi = values.rsi
+    score = np.where((30 <= rsi) & (rsi <= 70), 1.0, 0.0)  # RSI 과매수/과매도 구간 제외
+    score += np.where((40 <= rsi) & (rsi <= 60), 0.5, 0.0)  # RSI 중립 구간
+    score += np.where(values.macd > values.macd_signal, 1.5, 0.0)  # MACD 골든크로스
+    score += np.where(values.ma20 > values.ma50, 1.0, 0.0)  # 이동평균 단기 > 장기
+    score += np.where(values.close > values.ma20, 1.0, 0.0)  # 현재가 > 단기 이동평균
+    score += np.where(values.close <= values.bb_lower, 1.5, 0.0)  # 볼린저 밴드 하단 터치
+    score += np.where(values.volume > values.volume_ma20 * 1.2, 1.0, 0.0)  # 거래량 증가
+    score += np.where(values.trend > 0, 1.0, 0.0)  # 5일 상승 추세
+    # 최대 10점으로 제한
+    return np.minimum(score, 10.0)
+
 def calculate_score(data):
-    """종목 점수 계산 (0-10점)"""
-    if data is None or data.empty or len(data) < 20:
+    """종목 점수 계산 (0-10점)
+
+    RSI, MACD, 볼린저 밴드 등은 indicators 커널(NumPy)로 마지막 값만 계산합니다 (ta 라이브러리와 결과 동일).
+    """
+    if data is None or data.empty:
+        return 0.0
+    return score_arrays(data['Close'].to_numpy(dtype=np.float64), data['Volume'].to_numpy(dtype=np.float64))
+
+def score_arrays(close, volume):
+    """종가·거래량 배열 → 점수 (0-10점, calculate_score와 같은 값)"""
+    if len(close) < MIN_BARS:
         return 0.0
     
     try:
-        score = 0.0
-        
-        # RSI (상대강도지수)
-        try:
-            rsi = ta.momentum.RSIIndicator(data['Close'], window=14).rsi()
-            if not rsi.empty and not pd_isna(rsi.iloc[-1]):
-                current_rsi = rsi.iloc[-1]
-                if 30 <= current_rsi <= 70:  # 과매수/과매도 구간 제외
-                    score += 1.0
-                if 40 <= current_rsi <= 60:  # 중립 구간
-                    score += 0.5
-        except:
-            pass
-        
-        # MACD
-        try:
-            macd = ta.trend.MACD(data['Close'])
-            macd_line = macd.macd()
-            signal_line = macd.macd_signal()
-            if not macd_line.empty and not signal_line.empty:
-                if not pd_isna(macd_line.iloc[-1]) and not pd_isna(signal_line.iloc[-1]):
-                    if macd_line.iloc[-1] > signal_line.iloc[-1]:  # 골든크로스
-                        score += 1.5
-        except:
-            pass
-        
-        # 이동평균선
-        try:
-            ma20 = data['Close'].rolling(window=20).mean()
-            if len(data) >= 50:
-                ma50 = data['Close'].rolling(window=50).mean()
-                if not ma20.empty and not ma50.empty:
-                    if not pd_isna(ma20.iloc[-1]) and not pd_isna(ma50.iloc[-1]):
-                        if ma20.iloc[-1] > ma50.iloc[-1]:  # 단기 > 장기
-                            score += 1.0
-            if not ma20.empty and not pd_isna(ma20.iloc[-1]):
-                if data['Close'].iloc[-1] > ma20.iloc[-1]:  # 현재가 > 단기
-                    score += 1.0
-        except:
-            pass
-        
-        # 볼린저 밴드
-        try:
-            bb = ta.volatility.BollingerBands(data['Close'], window=20)
-            bb_upper = bb.bollinger_hband()
-            bb_lower = bb.bollinger_lband()
-            if not bb_lower.empty and not pd_isna(bb_lower.iloc[-1]):
-                if data['Close'].iloc[-1] <= bb_lower.iloc[-1]:  # 하단 터치
-                    score += 1.5
-        except:
-            pass
-        
-        # 거래량
-        try:
-            volume_ma = data['Volume'].rolling(window=20).mean()
-            if not volume_ma.empty and not pd_isna(volume_ma.iloc[-1]):
-                if data['Volume'].iloc[-1] > volume_ma.iloc[-1] * 1.2:  # 거래량 증가
-                    score += 1.0
-        except:
-            pass
-        
-        # 가격 추세
-        try:
-            if len(data) >= 5:
-                recent_trend = (data['Close'].iloc[-1] - data['Close'].iloc[-5]) / data['Close'].iloc[-5]
-                if recent_trend > 0:  # 상승 추세
-                    score += 1.0
-        except:
-            pass
-        
-        # 최대 10점으로 제한
-        return min(score, 10.0)
+        return float(score_values(indicators.last_values(close, volume)))
     except Exception as e:
         # 조용히 실패 (로그는 monitor.py에서 출력)
         return 0.0
 
+def price_panel(frames):
+    """{symbol: 일봉 DataFrame} → (종목 목록, 종가 행렬, 거래량 행렬)
+
+    행렬은 종목 x 가장 긴 이력의 일수 (마지막 열이 최근 봉), 이력이 짧은 종목의 앞부분은 NaN입니다.
+    """
+    symbols = [symbol for symbol, frame in frames.items() if frame is not None and not frame.empty]
+    days = max((len(frames[symbol]) for symbol in symbols), default=0)
+    close = np.full((len(symbols), days), np.nan)
+    volume = np.full((len(symbols), days), np.nan)
+    for row, symbol in enumerate(symbols):
+        frame = frames[symbol]
+        close[row, days - len(frame):] = frame['Close'].to_numpy(dtype=np.float64)
+        volume[row, days - len(frame):] = frame['Volume'].to_numpy(dtype=np.float64)
+    return symbols, close, volume
+
+def calculate_scores(close, volume):
+    """전체 종목 점수 일괄 계산 (패널 모드) - 종목별 점수 배열 (0-10점)
+
+    close, volume은 종목 x 일 행렬이며 이력이 짧은 종목은 앞부분을 NaN으로 채웁니다 (price_panel).
+    모든 지표를 배열 연산으로 한 번에 계산하며 종목별 calculate_score와 같은 점수입니다
+    (유효 일봉이 20개 미만인 종목은 0점).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+    if close.ndim != 2 or close.shape[1] < MIN_BARS:
+        return np.zeros(len(close))
+    score = np.concatenate([
+        score_values(indicators.last_values(close[start:start + PANEL_CHUNK], volume[start:start + PANEL_CHUNK]))
+        for start in range(0, len(close), PANEL_CHUNK)
+    ]) if len(close) else np.zeros(0)
+    valid = np.count_nonzero(~np.isnan(close), axis=1) >= MIN_BARS
+    return np.where(valid, score, 0.0)
+
+def score_frames(frames):
+    """{symbol: 일봉} → {symbol: 기술적 점수} (패널 모드 1회 계산)"""
+    symbols, close, volume = price_panel(frames)
+    return dict(zip(symbols, calculate_scores(close, volume).tolist()))
+
 def generate_signal(symbol, data):
     """기술적 분석 기반 매수 신호 생성 (점수만 반환)"""
     if data is None or data.empty:
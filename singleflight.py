@@ -0,0 +1,134 @@
+"""동일 요청 합치기 (single-flight) + 짧은 결과 캐시
+
+같은 키의 요청이 동시에 들어오면 먼저 온 요청(리더)만 실제로 조회하고,
+나머지는 리더의 결과를 기다려 함께 받습니다. 성공한 결과는 ttl초 동안 캐시되어
+짧은 시간 안에 반복되는 요청(대시보드 연속 클릭 등)도 조회 1번으로 처리됩니다.
+
+여러 키를 한 번에 처리하는 일괄 조회도 지원합니다 (claim → resolve/fail).
+캐시된 값은 여러 호출자가 공유하므로 수정하지 않고 읽기만 해야 합니다.
+"""
+import time
+import threading
+
+# 결과 없음 (속도 제한 등으로 조회하지 못함) - 캐시하지 않고 기다리던 요청에도 그대로 전달
+MISSING = object()
+
+class _Call:
+    """진행 중인 조회 1건"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = MISSING
+        self.error = None
+
+    def wait(self, timeout=None):
+        """리더의 결과 대기 - 오류는 그대로 다시 발생"""
+        if not self.event.wait(timeout):
+            return MISSING
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+class SingleFlight:
+    def __init__(self, ttl=30, max_entries=2000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._calls = {}
+        self._cache = {}
+        self._lock = threading.Lock()
+
+        # 지표
+        self.hits = 0
+        self.shared = 0
+        self.misses = 0
+
+    def _cached(self, key, now):
+        entry = self._cache.get(key)
+        if entry is None:
+            return MISSING
+        value, expires_at = entry
+        if now >= expires_at:
+            del self._cache[key]
+            return MISSING
+        return value
+
+    def claim(self, keys):
+        """키 목록 등록 - (캐시 결과 {key: value}, 직접 조회할 키 [], 기다릴 조회 {key: call})"""
+        cached, leading, waiting = {}, [], {}
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                value = self._cached(key, now)
+                if value is not MISSING:
+                    cached[key] = value
+                    self.hits += 1
+                elif key in self._calls:
+                    waiting[key] = self._calls[key]
+                    self.shared += 1
+                else:
+                    self._calls[key] = _Call()
+                    leading.append(key)
+                    self.misses += 1
+        return cached, leading, waiting
+
+    def resolve(self, key, value, cache=True):
+        """리더의 조회 결과 전달 (cache=False이면 기다리던 요청에만 전달)"""
+        with self._lock:
+            call = self._calls.pop(key, None)
+            if cache and value is not MISSING and self.ttl > 0:
+                if len(self._cache) >= self.max_entries:
+                    self._evict(time.monotonic())
+                self._cache[key] = (value, time.monotonic() + self.ttl)
+        if call is not None:
+            call.value = value
+            call.event.set()
+
+    def fail(self, key, error):
+        """리더의 조회 실패 전달 (캐시하지 않음)"""
+        with self._lock:
+            call = self._calls.pop(key, None)
+        if call is not None:
+            call.error = error
+            call.event.set()
+
+    def _evict(self, now):
+        """만료된 항목 제거, 그래도 가득 차면 가장 먼저 만료될 항목부터 제거 (잠금 상태에서 호출)"""
+        for key in [k for k, (_, expires_at) in self._cache.items() if now >= expires_at]:
+            del self._cache[key]
+        overflow = len(self._cache) - self.max_entries + 1
+        if overflow > 0:
+            for key, _ in sorted(self._cache.items(), key=lambda item: item[1][1])[:overflow]:
+                del self._cache[key]
+
+    def do(self, key, fn, *args, **kwargs):
+        """단일 키 조회 - 캐시 또는 진행 중인 조회가 있으면 그 결과를 공유"""
+        cached, leading, waiting = self.claim([key])
+        if key in cached:
+            return cached[key]
+        if key in waiting:
+            return waiting[key].wait()
+        try:
+            value = fn(*args, **kwargs)
+        except Exception as e:
+            self.fail(key, e)
+            raise
+        self.resolve(key, value, cache=value is not None)
+        return value
+
+    def invalidate(self, key=None):
+        """캐시 삭제 (key가 없으면 전체)"""
+        with self._lock:
+            if key is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(key, None)
+
+    def get_metrics(self):
+        with self._lock:
+            return {
+                'cache_hits': self.hits,
+                'shared_in_flight': self.shared,
+                'upstream_calls': self.misses,
+                'cached_entries': len(self._cache),
+                'in_flight': len(self._calls)
+            }
@@ -1,41 +1,26 @@
 """종목 정보 가져오기"""
-import yfinance as yf
-import requests
-from signal_generator import calculate_score
-from data_fetcher import fetch_stock_data
+import numpy as np
+import http_client
+import fundamentals
+import indicators
+from data_fetcher import fetch_stock_data, get_current_prices
 
 def get_stock_info(symbol):
     """기본 종목 정보 - 직접 API 호출"""
-    try:
-        # 직접 Yahoo Finance API 호출 시도
-        url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
-        params = {'interval': '1d', 'range': '1d'}
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'application/json'
+    # 일괄 조회 API (quote 응답에 섹터/업종은 없으므로 N/A)
+    quote = get_current_prices([symbol], timeout=5).get(symbol.upper())
+    if quote:
+        return {
+            'name': quote.get('name') or symbol,
+            'sector': 'N/A',
+            'industry': 'N/A',
+            'marketCap': quote.get('marketCap') or 0,
+            'currentPrice': quote['price']
         }
-        
-        response = requests.get(url, params=params, headers=headers, timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            if 'chart' in data and 'result' in data['chart'] and len(data['chart']['result']) > 0:
-                result = data['chart']['result'][0]
-                if 'meta' in result:
-                    meta = result['meta']
-                    return {
-                        'name': meta.get('longName', symbol),
-                        'sector': meta.get('sector', 'N/A'),
-                        'industry': meta.get('industry', 'N/A'),
-                        'marketCap': meta.get('marketCap', 0),
-                        'currentPrice': meta.get('regularMarketPrice', 0)
-                    }
-    except:
-        pass
     
-    # Fallback: yfinance
+    # Fallback: 재무 지표 캐시 (섹터/업종 포함)
     try:
-        ticker = yf.Ticker(symbol)
-        info = ticker.info
+        info = fundamentals.get_info(symbol) or {}
         
         return {
             'name': info.get('longName', symbol),
@@ -62,29 +47,24 @@ def get_recommendation_reason(symbol, signal_data):
         
         reasons = []
         
+        values = indicators.last_values(
+            data['Close'].to_numpy(dtype=np.float64),
+            data['Volume'].to_numpy(dtype=np.float64)
+        )
+        
         # RSI 분석
-        import ta
-        rsi = ta.momentum.RSIIndicator(data['Close'], window=14).rsi()
-        if not rsi.empty:
-            current_rsi = rsi.iloc[-1]
-            if current_rsi < 40:
-                reasons.append("RSI가 과매도 구간에 있어 반등 가능성")
-            elif 40 <= current_rsi <= 60:
-                reasons.append("RSI가 적정 수준")
+        if values.rsi < 40:
+            reasons.append("RSI가 과매도 구간에 있어 반등 가능성")
+        elif 40 <= values.rsi <= 60:
+            reasons.append("RSI가 적정 수준")
         
         # MACD 분석
-        macd = ta.trend.MACD(data['Close'])
-        macd_line = macd.macd()
-        signal_line = macd.macd_signal()
-        if not macd_line.empty and not signal_line.empty:
-            if macd_line.iloc[-1] > signal_line.iloc[-1]:
-                reasons.append("MACD 골든크로스 발생")
+        if values.macd > values.macd_signal:
+            reasons.append("MACD 골든크로스 발생")
         
         # 이동평균선
-        ma20 = data['Close'].rolling(window=20).mean()
-        if not ma20.empty:
-            if data['Close'].iloc[-1] > ma20.iloc[-1]:
-                reasons.append("20일 이동평균선 위에 위치")
+        if values.close > values.ma20:
+            reasons.append("20일 이동평균선 위에 위치")
         
         return "; ".join(reasons) if reasons else "기술적 지표가 매수 신호를 보임"
     except:
@@ -93,7 +73,7 @@ def get_recommendation_reason(symbol, signal_data):
 def get_recent_news(symbol, limit=5):
     """최근 뉴스"""
     try:
-        ticker = yf.Ticker(symbol)
+        ticker = http_client.get_ticker(symbol)
         news = ticker.news[:limit]
         
         news_list = []
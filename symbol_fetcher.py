@@ -1,10 +1,11 @@
 """종목 리스트 가져오기 - NYSE & NASDAQ"""
-import yfinance as yf
 import pandas as pd
-import requests
+import http_client
 import time
 import os
 import re
+import numpy as np
+import config
 
 def filter_valid_symbols(symbols):
     """유효한 종목만 필터링 (상장폐지, 우선주 제외)"""
@@ -43,79 +44,80 @@ def filter_valid_symbols(symbols):
     
     return valid
 
-def get_nasdaq_symbols():
-    """NASDAQ 종목 리스트 가져오기"""
-    symbols = []
+# 스크리너 행에서 보관하는 종목 메타데이터 (사전 필터용, 종목 리스트와 함께 저장)
+METADATA_COLUMNS = ['symbol', 'exchange', 'price', 'volume', 'market_cap', 'sector', 'industry']
+
+def _number(value):
+    """스크리너 숫자 문자열 ('$1,234.50', '12,345', 'NA', '') → float (없으면 NaN)"""
     try:
-        # NASDAQ API
-        nasdaq_url = "https://api.nasdaq.com/api/screener/stocks?tableonly=true&limit=10000&offset=0&download=true"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'application/json',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Referer': 'https://www.nasdaq.com/',
-            'Origin': 'https://www.nasdaq.com'
-        }
-        
-        response = requests.get(nasdaq_url, headers=headers, timeout=30)
+        return float(str(value).replace('$', '').replace(',', '').strip())
+    except (TypeError, ValueError):
+        return float('nan')
+
+def parse_screener_row(row, exchange):
+    """스크리너 행 → 메타데이터 딕셔너리 (가격: lastsale, 거래량: 당일 거래량, 시가총액: marketCap)"""
+    return {
+        'symbol': row.get('symbol', '').strip().upper(),
+        'exchange': exchange,
+        'price': _number(row.get('lastsale')),
+        'volume': _number(row.get('volume')),
+        'market_cap': _number(row.get('marketCap')),
+        'sector': row.get('sector') or '',
+        'industry': row.get('industry') or ''
+    }
+
+def _get_screener_rows(exchange, params):
+    """NASDAQ 스크리너 API 행 → 메타데이터 목록"""
+    rows = []
+    try:
+        response = http_client.nasdaq_get('/api/screener/stocks', params=params, timeout=30)
         if response.status_code == 200:
             data = response.json()
             if 'data' in data and 'rows' in data['data']:
                 for row in data['data']['rows']:
-                    symbol = row.get('symbol', '').strip().upper()
-                    if symbol:
-                        symbols.append(symbol)
-                print(f"✅ NASDAQ에서 {len(symbols)}개 종목 가져옴")
+                    parsed = parse_screener_row(row, exchange)
+                    if parsed['symbol']:
+                        rows.append(parsed)
+                print(f"✅ {exchange}에서 {len(rows)}개 종목 가져옴")
         else:
-            print(f"⚠️ NASDAQ API 응답 코드: {response.status_code}")
+            print(f"⚠️ {exchange} API 응답 코드: {response.status_code}")
     except Exception as e:
-        print(f"⚠️ NASDAQ API 실패: {str(e)}")
-    
-    return symbols
+        print(f"⚠️ {exchange} API 실패: {str(e)}")
+    return rows
 
-def get_nyse_symbols():
-    """NYSE 종목 리스트 가져오기"""
-    symbols = []
+def get_nasdaq_rows():
+    """NASDAQ 종목 메타데이터 목록 (가격, 거래량, 시가총액 포함)"""
+    return _get_screener_rows('NASDAQ', {'tableonly': 'true', 'limit': 10000, 'offset': 0, 'download': 'true'})
+
+def get_nyse_rows():
+    """NYSE 종목 메타데이터 목록 (NASDAQ API와 동일한 구조 사용)"""
+    return _get_screener_rows('NYSE', {'tableonly': 'true', 'exchange': 'NYSE', 'limit': 10000, 'offset': 0, 'download': 'true'})
+
+def _get_sp500_symbols():
+    """백업 방법: Wikipedia에서 S&P 500 종목 가져오기 (대부분 NYSE/NASDAQ, 메타데이터 없음)"""
     try:
-        # NYSE API (NASDAQ API와 동일한 구조 사용)
-        nyse_url = "https://api.nasdaq.com/api/screener/stocks?tableonly=true&exchange=NYSE&limit=10000&offset=0&download=true"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'application/json',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Referer': 'https://www.nasdaq.com/',
-            'Origin': 'https://www.nasdaq.com'
-        }
-        
-        response = requests.get(nyse_url, headers=headers, timeout=30)
-        if response.status_code == 200:
-            data = response.json()
-            if 'data' in data and 'rows' in data['data']:
-                for row in data['data']['rows']:
-                    symbol = row.get('symbol', '').strip().upper()
-                    if symbol:
-                        symbols.append(symbol)
-                print(f"✅ NYSE에서 {len(symbols)}개 종목 가져옴")
-        else:
-            print(f"⚠️ NYSE API 응답 코드: {response.status_code}")
+        print("📊 Wikipedia에서 S&P 500 종목 가져오는 중...")
+        sp500_url = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
+        tables = pd.read_html(sp500_url)
+        if len(tables) > 0:
+            sp500_table = tables[0]
+            if 'Symbol' in sp500_table.columns:
+                wiki_symbols = sp500_table['Symbol'].tolist()
+                print(f"✅ Wikipedia에서 {len(wiki_symbols)}개 종목 추가")
+                return wiki_symbols
     except Exception as e:
-        print(f"⚠️ NYSE API 실패: {str(e)}")
-    
-    # 백업 방법: Wikipedia에서 S&P 500 종목 가져오기 (대부분 NYSE/NASDAQ)
+        print(f"⚠️ Wikipedia 가져오기 실패: {str(e)}")
+    return []
+
+def get_nasdaq_symbols():
+    """NASDAQ 종목 리스트 가져오기"""
+    return [row['symbol'] for row in get_nasdaq_rows()]
+
+def get_nyse_symbols():
+    """NYSE 종목 리스트 가져오기"""
+    symbols = [row['symbol'] for row in get_nyse_rows()]
     if len(symbols) < 100:
-        try:
-            print("📊 Wikipedia에서 S&P 500 종목 가져오는 중...")
-            sp500_url = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
-            tables = pd.read_html(sp500_url)
-            if len(tables) > 0:
-                sp500_table = tables[0]
-                if 'Symbol' in sp500_table.columns:
-                    wiki_symbols = sp500_table['Symbol'].tolist()
-                    symbols.extend(wiki_symbols)
-                    print(f"✅ Wikipedia에서 {len(wiki_symbols)}개 종목 추가")
-        except Exception as e:
-            print(f"⚠️ Wikipedia 가져오기 실패: {str(e)}")
-    
+        symbols.extend(_get_sp500_symbols())
     return symbols
 
 def get_all_symbols():
@@ -126,15 +128,21 @@ def get_all_symbols():
         print("📊 NYSE & NASDAQ 종목 리스트 가져오는 중...")
         
         # NASDAQ 종목 가져오기
-        nasdaq_symbols = get_nasdaq_symbols()
-        all_symbols.extend(nasdaq_symbols)
+        nasdaq_rows = get_nasdaq_rows()
+        all_symbols.extend(row['symbol'] for row in nasdaq_rows)
         
         # 잠시 대기 (API 제한 방지)
         time.sleep(1)
         
         # NYSE 종목 가져오기
-        nyse_symbols = get_nyse_symbols()
-        all_symbols.extend(nyse_symbols)
+        nyse_rows = get_nyse_rows()
+        all_symbols.extend(row['symbol'] for row in nyse_rows)
+        if len(nyse_rows) < 100:
+            all_symbols.extend(_get_sp500_symbols())
+        
+        # 스크리너 메타데이터 저장 (스캔 전 사전 필터용)
+        if nasdaq_rows or nyse_rows:
+            save_metadata_to_file(nasdaq_rows + nyse_rows)
         
         # 중복 제거
         all_symbols = list(set(all_symbols))
@@ -201,3 +209,63 @@ def save_symbols_to_file(symbols, filename='symbols.txt'):
         print(f"✅ 종목 리스트 저장 완료: {len(symbols)}개 → {filename}")
     except Exception as e:
         print(f"❌ 종목 리스트 저장 실패: {str(e)}")
+
+def save_metadata_to_file(rows, filename=None):
+    """스크리너 메타데이터 저장 (CSV, 종목 리스트와 함께 보관)"""
+    filename = filename or config.UNIVERSE_META_FILE
+    try:
+        table = pd.DataFrame(rows, columns=METADATA_COLUMNS).drop_duplicates('symbol', keep='first')
+        table.to_csv(filename, index=False)
+        print(f"✅ 종목 메타데이터 저장 완료: {len(table)}개 → {filename}")
+    except Exception as e:
+        print(f"❌ 종목 메타데이터 저장 실패: {str(e)}")
+
+def load_metadata_from_file(filename=None, max_age_hours=None):
+    """저장된 스크리너 메타데이터 - DataFrame (index: 종목), 없거나 max_age_hours보다 오래되면 None"""
+    filename = filename or config.UNIVERSE_META_FILE
+    try:
+        if not os.path.exists(filename):
+            return None
+        if max_age_hours is not None and time.time() - os.path.getmtime(filename) > max_age_hours * 3600:
+            return None
+        return pd.read_csv(filename, keep_default_na=False, na_values=['']).set_index('symbol')
+    except Exception as e:
+        print(f"⚠️ 종목 메타데이터 로드 실패: {str(e)}")
+        return None
+
+def get_universe_metadata():
+    """사전 필터용 종목 메타데이터 - 저장 파일이 UNIVERSE_META_MAX_AGE_HOURS보다 오래되면 스크리너에서 다시 받음
+
+    스크리너 요청은 거래소당 1회입니다. 받지 못하면 오래된 파일이라도 사용하고, 파일도 없으면 None.
+    """
+    metadata = load_metadata_from_file(max_age_hours=config.UNIVERSE_META_MAX_AGE_HOURS)
+    if metadata is not None:
+        return metadata
+    rows = get_nasdaq_rows() + get_nyse_rows()
+    if rows:
+        save_metadata_to_file(rows)
+    return load_metadata_from_file()
+
+def prefilter(symbols, metadata):
+    """가격·거래대금·시가총액 사전 필터 (배열 연산) - (통과 종목 목록, 제외 종목 목록)
+
+    기준은 PREFILTER_MIN_PRICE, PREFILTER_MIN_DOLLAR_VOLUME (가격 x 당일 거래량), PREFILTER_MIN_MARKET_CAP이며
+    0이면 그 기준은 사용하지 않습니다. 메타데이터가 없거나 값이 비어 있는 종목은 제외하지 않습니다.
+    """
+    if metadata is None or len(symbols) == 0:
+        return list(symbols), []
+    table = metadata.reindex([symbol.upper() for symbol in symbols])
+    price = table['price'].to_numpy(dtype=np.float64)
+    volume = table['volume'].to_numpy(dtype=np.float64)
+    market_cap = table['market_cap'].to_numpy(dtype=np.float64)
+    drop = np.zeros(len(symbols), dtype=bool)
+    with np.errstate(invalid='ignore'):
+        if config.PREFILTER_MIN_PRICE > 0:
+            drop |= price < config.PREFILTER_MIN_PRICE
+        if config.PREFILTER_MIN_DOLLAR_VOLUME > 0:
+            drop |= price * volume < config.PREFILTER_MIN_DOLLAR_VOLUME
+        if config.PREFILTER_MIN_MARKET_CAP > 0:
+            drop |= market_cap < config.PREFILTER_MIN_MARKET_CAP
+    kept = [symbol for symbol, dropped in zip(symbols, drop) if not dropped]
+    removed = [symbol for symbol, dropped in zip(symbols, drop) if dropped]
+    return kept, removed
@@ -0,0 +1,94 @@
+"""스캔 측정 - 종목별 단계 소요 시간 히스토그램(p50/p95/p99)과 결과 분류 카운터
+
+스캔마다 ScanTelemetry를 새로 만들어 준비·점수 계산·결과 반영 스레드에서 기록하고,
+스캔이 끝나면 summary()를 scan_metrics 테이블에 1행으로 저장합니다 (GET /scans/metrics).
+어느 단계가 스캔 시간을 차지하는지, 변경 후 처리량이 떨어졌는지 스캔끼리 비교할 수 있습니다.
+"""
+import threading
+from collections import deque
+import numpy as np
+
+# 종목별로 측정하는 단계
+FETCH = 'fetch'  # 일봉 수집 (종목별 차트 요청 시간 - 저장소·캐시에서 읽은 종목은 제외)
+PARSE = 'parse'  # 일봉 → 점수 계산 입력 (배열 추출, 상대강도 등급, 입력 해시)
+FUNDAMENTALS = 'fundamentals'  # 재무 지표 조회
+SCORE = 'score'  # 점수 계산 (작업 프로세스에서 종목별로 측정)
+PERSIST = 'persist'  # 결과 반영 (신호 생성, 체크포인트 저장)
+STAGES = (FETCH, PARSE, FUNDAMENTALS, SCORE, PERSIST)
+
+# 종목별 결과 분류
+NO_DATA = 'no_data'  # 일봉 없음 (상장폐지, 데이터 부족)
+TIMEOUT = 'timeout'  # 모든 제공자 요청 실패 (타임아웃, 연결 오류, 서버 오류)
+THROTTLED = 'throttled'  # 재시도 후에도 속도 제한
+FILTERED = 'filtered'  # 사전 필터·종목 필터로 제외
+SCORED = 'scored'  # 점수 계산 완료 (재사용 포함)
+ERROR = 'error'  # 그 밖의 오류
+OUTCOMES = (NO_DATA, TIMEOUT, THROTTLED, FILTERED, SCORED, ERROR)
+
+# 단계별로 보관하는 최대 측정값 수 (백분위 계산용)
+MAX_SAMPLES = 100000
+
+class Histogram:
+    """소요 시간 분포 - 개수·합계는 전체, 백분위는 최근 MAX_SAMPLES개 기준"""
+
+    def __init__(self, max_samples=MAX_SAMPLES):
+        self.samples = deque(maxlen=max_samples)
+        self.count = 0
+        self.total = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        """종목 1개의 측정값 기록"""
+        with self._lock:
+            self.samples.append(seconds)
+            self.count += 1
+            self.total += seconds
+
+    def summary(self):
+        with self._lock:
+            if not self.samples:
+                return {'count': 0, 'total_s': 0.0, 'p50_ms': None, 'p95_ms': None, 'p99_ms': None}
+            p50, p95, p99 = np.percentile(np.fromiter(self.samples, dtype=np.float64), [50, 95, 99])
+            return {
+                'count': self.count,
+                'total_s': round(self.total, 3),
+                'p50_ms': round(float(p50) * 1000, 2),
+                'p95_ms': round(float(p95) * 1000, 2),
+                'p99_ms': round(float(p99) * 1000, 2)
+            }
+
+class ScanTelemetry:
+    """스캔 1회의 단계별 히스토그램과 결과 분류 카운터 (여러 스레드에서 기록)"""
+
+    def __init__(self):
+        self.histograms = {stage: Histogram() for stage in STAGES}
+        self.outcomes = dict.fromkeys(OUTCOMES, 0)
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        self.histograms[stage].observe(seconds)
+
+    def count(self, outcome, count=1):
+        with self._lock:
+            self.outcomes[outcome] += count
+
+    def summary(self):
+        """{'stages': {단계: 히스토그램 요약}, 'outcomes': {분류: 종목 수}, 'dominant_stage': 작업 시간 합이 가장 큰 단계}"""
+        stages = {stage: histogram.summary() for stage, histogram in self.histograms.items()}
+        with self._lock:
+            outcomes = dict(self.outcomes)
+        busiest = max(stages, key=lambda stage: stages[stage]['total_s'])
+        return {
+            'stages': stages,
+            'outcomes': outcomes,
+            'dominant_stage': busiest if stages[busiest]['total_s'] > 0 else None
+        }
+
+def format_summary(summary):
+    """스캔 완료 출력용 줄 목록"""
+    lines = []
+    for stage, stats in summary['stages'].items():
+        if stats['count']:
+            lines.append(f"{stage} {stats['count']}개 | p50 {stats['p50_ms']:.1f}ms, p95 {stats['p95_ms']:.1f}ms, p99 {stats['p99_ms']:.1f}ms | 합 {stats['total_s']:.1f}초")
+    lines.append(' | '.join(f"{outcome} {count}" for outcome, count in summary['outcomes'].items()))
+    return lines
@@ -1,41 +1,44 @@
 """유명 투자자 방법론 기반 점수 계산"""
-import pandas as pd
-import yfinance as yf
-import requests
-from datetime import datetime
+import fundamentals
+import scoring
+import numpy as np
 
-def get_financial_data(symbol):
-    """yfinance를 통해 재무 지표 가져오기"""
+def _financial_fields(info):
+    """재무 지표 → 가치투자 분석 항목"""
+    return {
+        'trailingPE': info.get('trailingPE'),
+        'forwardPE': info.get('forwardPE'),
+        'priceToBook': info.get('priceToBook'),
+        'returnOnEquity': info.get('returnOnEquity'),
+        'debtToEquity': info.get('debtToEquity'),
+        'revenueGrowth': info.get('revenueGrowth'),
+        'earningsGrowth': info.get('earningsGrowth'),
+        'profitMargins': info.get('profitMargins'),
+        'marketCap': info.get('marketCap', 0),
+        'dividendYield': info.get('dividendYield'),
+        'currentRatio': info.get('currentRatio'),
+        'quickRatio': info.get('quickRatio'),
+        'pegRatio': info.get('pegRatio'),
+        'enterpriseToRevenue': info.get('enterpriseToRevenue'),
+        'enterpriseToEbitda': info.get('enterpriseToEbitda'),
+        '52WeekHigh': info.get('fiftyTwoWeekHigh'),
+        '52WeekLow': info.get('fiftyTwoWeekLow'),
+        'currentPrice': info.get('currentPrice', info.get('regularMarketPrice', 0))
+    }
+
+def get_financial_data(symbol, price_data=None):
+    """재무 지표 가져오기 (재무 지표 캐시 사용)"""
     try:
-        ticker = yf.Ticker(symbol)
-        info = ticker.info
-        
-        return {
-            'trailingPE': info.get('trailingPE'),
-            'forwardPE': info.get('forwardPE'),
-            'priceToBook': info.get('priceToBook'),
-            'returnOnEquity': info.get('returnOnEquity'),
-            'debtToEquity': info.get('debtToEquity'),
-            'revenueGrowth': info.get('revenueGrowth'),
-            'earningsGrowth': info.get('earningsGrowth'),
-            'profitMargins': info.get('profitMargins'),
-            'marketCap': info.get('marketCap', 0),
-            'dividendYield': info.get('dividendYield'),
-            'currentRatio': info.get('currentRatio'),
-            'quickRatio': info.get('quickRatio'),
-            'pegRatio': info.get('pegRatio'),
-            'enterpriseToRevenue': info.get('enterpriseToRevenue'),
-            'enterpriseToEbitda': info.get('enterpriseToEbitda'),
-            '52WeekHigh': info.get('fiftyTwoWeekHigh'),
-            '52WeekLow': info.get('fiftyTwoWeekLow'),
-            'currentPrice': info.get('currentPrice', info.get('regularMarketPrice', 0))
-        }
+        info = fundamentals.get_info(symbol, price_data)
+        if info is None:
+            return None
+        return _financial_fields(info)
     except:
         return None
 
-def calculate_value_score(symbol, price_data):
+def score_value(inputs):
     """
-    유명 투자자 방법론 기반 종합 점수 계산 (0-10점)
+    유명 투자자 방법론 기반 종합 점수 계산 (0-10점) - (점수, scoring.Reasons)
     
     포함된 방법론:
     1. 워렌 버핏 (Warren Buffett) - 가치투자, ROE, 부채비율
@@ -44,22 +47,24 @@ def calculate_value_score(symbol, price_data):
     4. 조지 소로스 (George Soros) - 추세 추종
     5. 존 네프 (John Neff) - 저PER 투자
     """
-    if price_data is None or price_data.empty or len(price_data) < 20:
-        return 0.0, {}
+    reasons = scoring.Reasons()
+    if inputs.length < 20:
+        return 0.0, reasons
     
     try:
         score = 0.0
-        reasons = {}
         max_score = 0.0
         
-        # 재무 지표 가져오기
-        financial = get_financial_data(symbol)
-        if financial is None:
-            return 0.0, {'error': '재무 데이터 없음'}
+        # 재무 지표 (재무 지표 캐시)
+        info = inputs.info
+        if info is None:
+            reasons.add('error', '재무 데이터 없음')
+            return 0.0, reasons
+        financial = _financial_fields(info)
         
         current_price = financial.get('currentPrice', 0)
         if current_price == 0:
-            current_price = price_data['Close'].iloc[-1]
+            current_price = inputs.close[-1]
         
         # ============================================
         # 1. 워렌 버핏 (Warren Buffett) - 가치투자
@@ -70,15 +75,15 @@ def calculate_value_score(symbol, price_data):
             max_score += 2.0
             if roe >= 20:
                 score += 2.0
-                reasons['buffett_roe'] = f"ROE {roe:.1f}% (우수)"
+                reasons.add('buffett_roe', "ROE {:.1f}% (우수)", roe)
             elif roe >= 15:
                 score += 1.5
-                reasons['buffett_roe'] = f"ROE {roe:.1f}% (양호)"
+                reasons.add('buffett_roe', "ROE {:.1f}% (양호)", roe)
             elif roe >= 10:
                 score += 1.0
-                reasons['buffett_roe'] = f"ROE {roe:.1f}% (보통)"
+                reasons.add('buffett_roe', "ROE {:.1f}% (보통)", roe)
             else:
-                reasons['buffett_roe'] = f"ROE {roe:.1f}% (낮음)"
+                reasons.add('buffett_roe', "ROE {:.1f}% (낮음)", roe)
         
         # 부채비율 (Debt to Equity) - 낮을수록 좋음
         debt_to_equity = financial.get('debtToEquity')
@@ -86,15 +91,15 @@ def calculate_value_score(symbol, price_data):
             max_score += 1.0
             if debt_to_equity <= 30:
                 score += 1.0
-                reasons['buffett_debt'] = f"부채비율 {debt_to_equity:.1f}% (우수)"
+                reasons.add('buffett_debt', "부채비율 {:.1f}% (우수)", debt_to_equity)
             elif debt_to_equity <= 50:
                 score += 0.7
-                reasons['buffett_debt'] = f"부채비율 {debt_to_equity:.1f}% (양호)"
+                reasons.add('buffett_debt', "부채비율 {:.1f}% (양호)", debt_to_equity)
             elif debt_to_equity <= 100:
                 score += 0.3
-                reasons['buffett_debt'] = f"부채비율 {debt_to_equity:.1f}% (보통)"
+                reasons.add('buffett_debt', "부채비율 {:.1f}% (보통)", debt_to_equity)
             else:
-                reasons['buffett_debt'] = f"부채비율 {debt_to_equity:.1f}% (높음)"
+                reasons.add('buffett_debt', "부채비율 {:.1f}% (높음)", debt_to_equity)
         
         # ============================================
         # 2. 벤저민 그레이엄 (Benjamin Graham) - 안전마진
@@ -105,15 +110,15 @@ def calculate_value_score(symbol, price_data):
             max_score += 1.5
             if trailing_pe <= 15:
                 score += 1.5
-                reasons['graham_pe'] = f"PER {trailing_pe:.1f} (저평가)"
+                reasons.add('graham_pe', "PER {:.1f} (저평가)", trailing_pe)
             elif trailing_pe <= 20:
                 score += 1.0
-                reasons['graham_pe'] = f"PER {trailing_pe:.1f} (적정)"
+                reasons.add('graham_pe', "PER {:.1f} (적정)", trailing_pe)
             elif trailing_pe <= 25:
                 score += 0.5
-                reasons['graham_pe'] = f"PER {trailing_pe:.1f} (다소 고평가)"
+                reasons.add('graham_pe', "PER {:.1f} (다소 고평가)", trailing_pe)
             else:
-                reasons['graham_pe'] = f"PER {trailing_pe:.1f} (고평가)"
+                reasons.add('graham_pe', "PER {:.1f} (고평가)", trailing_pe)
         
         # PBR (주가순자산비율) - 1.5 이하 선호
         pbr = financial.get('priceToBook')
@@ -121,15 +126,15 @@ def calculate_value_score(symbol, price_data):
             max_score += 1.0
             if pbr <= 1.0:
                 score += 1.0
-                reasons['graham_pbr'] = f"PBR {pbr:.2f} (매우 저평가)"
+                reasons.add('graham_pbr', "PBR {:.2f} (매우 저평가)", pbr)
             elif pbr <= 1.5:
                 score += 0.8
-                reasons['graham_pbr'] = f"PBR {pbr:.2f} (저평가)"
+                reasons.add('graham_pbr', "PBR {:.2f} (저평가)", pbr)
             elif pbr <= 2.5:
                 score += 0.5
-                reasons['graham_pbr'] = f"PBR {pbr:.2f} (적정)"
+                reasons.add('graham_pbr', "PBR {:.2f} (적정)", pbr)
             else:
-                reasons['graham_pbr'] = f"PBR {pbr:.2f} (고평가)"
+                reasons.add('graham_pbr', "PBR {:.2f} (고평가)", pbr)
         
         # 유동비율 (Current Ratio) - 2.0 이상 선호
         current_ratio = financial.get('currentRatio')
@@ -137,12 +142,12 @@ def calculate_value_score(symbol, price_data):
             max_score += 0.5
             if current_ratio >= 2.0:
                 score += 0.5
-                reasons['graham_liquidity'] = f"유동비율 {current_ratio:.2f} (우수)"
+                reasons.add('graham_liquidity', "유동비율 {:.2f} (우수)", current_ratio)
             elif current_ratio >= 1.5:
                 score += 0.3
-                reasons['graham_liquidity'] = f"유동비율 {current_ratio:.2f} (양호)"
+                reasons.add('graham_liquidity', "유동비율 {:.2f} (양호)", current_ratio)
             else:
-                reasons['graham_liquidity'] = f"유동비율 {current_ratio:.2f} (낮음)"
+                reasons.add('graham_liquidity', "유동비율 {:.2f} (낮음)", current_ratio)
         
         # ============================================
         # 3. 피터 린치 (Peter Lynch) - 성장주 투자
@@ -153,47 +158,49 @@ def calculate_value_score(symbol, price_data):
             max_score += 1.5
             if peg <= 0.5:
                 score += 1.5
-                reasons['lynch_peg'] = f"PEG {peg:.2f} (매우 우수)"
+                reasons.add('lynch_peg', "PEG {:.2f} (매우 우수)", peg)
             elif peg <= 1.0:
                 score += 1.2
-                reasons['lynch_peg'] = f"PEG {peg:.2f} (우수)"
+                reasons.add('lynch_peg', "PEG {:.2f} (우수)", peg)
             elif peg <= 1.5:
                 score += 0.8
-                reasons['lynch_peg'] = f"PEG {peg:.2f} (양호)"
+                reasons.add('lynch_peg', "PEG {:.2f} (양호)", peg)
             elif peg <= 2.0:
                 score += 0.4
-                reasons['lynch_peg'] = f"PEG {peg:.2f} (보통)"
+                reasons.add('lynch_peg', "PEG {:.2f} (보통)", peg)
             else:
-                reasons['lynch_peg'] = f"PEG {peg:.2f} (높음)"
+                reasons.add('lynch_peg', "PEG {:.2f} (높음)", peg)
         
         # 매출 성장률 (Revenue Growth)
         revenue_growth = financial.get('revenueGrowth')
         if revenue_growth is not None:
             max_score += 1.0
+            pct = revenue_growth * 100
             if revenue_growth >= 0.20:  # 20% 이상
                 score += 1.0
-                reasons['lynch_revenue'] = f"매출 성장률 {revenue_growth*100:.1f}% (우수)"
+                reasons.add('lynch_revenue', "매출 성장률 {:.1f}% (우수)", pct)
             elif revenue_growth >= 0.10:  # 10% 이상
                 score += 0.7
-                reasons['lynch_revenue'] = f"매출 성장률 {revenue_growth*100:.1f}% (양호)"
+                reasons.add('lynch_revenue', "매출 성장률 {:.1f}% (양호)", pct)
             elif revenue_growth >= 0.05:  # 5% 이상
                 score += 0.4
-                reasons['lynch_revenue'] = f"매출 성장률 {revenue_growth*100:.1f}% (보통)"
+                reasons.add('lynch_revenue', "매출 성장률 {:.1f}% (보통)", pct)
             elif revenue_growth < 0:
-                reasons['lynch_revenue'] = f"매출 성장률 {revenue_growth*100:.1f}% (감소)"
+                reasons.add('lynch_revenue', "매출 성장률 {:.1f}% (감소)", pct)
         
         # 이익 성장률 (Earnings Growth)
         earnings_growth = financial.get('earningsGrowth')
         if earnings_growth is not None:
             max_score += 0.5
+            pct = earnings_growth * 100
             if earnings_growth >= 0.20:  # 20% 이상
                 score += 0.5
-                reasons['lynch_earnings'] = f"이익 성장률 {earnings_growth*100:.1f}% (우수)"
+                reasons.add('lynch_earnings', "이익 성장률 {:.1f}% (우수)", pct)
             elif earnings_growth >= 0.10:  # 10% 이상
                 score += 0.3
-                reasons['lynch_earnings'] = f"이익 성장률 {earnings_growth*100:.1f}% (양호)"
+                reasons.add('lynch_earnings', "이익 성장률 {:.1f}% (양호)", pct)
             elif earnings_growth < 0:
-                reasons['lynch_earnings'] = f"이익 성장률 {earnings_growth*100:.1f}% (감소)"
+                reasons.add('lynch_earnings', "이익 성장률 {:.1f}% (감소)", pct)
         
         # ============================================
         # 4. 조지 소로스 (George Soros) - 추세 추종
@@ -207,26 +214,26 @@ def calculate_value_score(symbol, price_data):
             # 52주 고점 근처에 있으면 추세 상승 중
             if price_position >= 0.8:
                 score += 0.5
-                reasons['soros_trend'] = f"52주 고점 근처 ({price_position*100:.0f}%)"
+                reasons.add('soros_trend', "52주 고점 근처 ({:.0f}%)", price_position * 100)
             elif price_position >= 0.6:
                 score += 0.3
-                reasons['soros_trend'] = f"52주 중상단 ({price_position*100:.0f}%)"
+                reasons.add('soros_trend', "52주 중상단 ({:.0f}%)", price_position * 100)
             elif price_position <= 0.2:
-                reasons['soros_trend'] = f"52주 저점 근처 ({price_position*100:.0f}%)"
+                reasons.add('soros_trend', "52주 저점 근처 ({:.0f}%)", price_position * 100)
         
         # 가격 추세 (최근 6개월)
-        if len(price_data) >= 60:
-            price_6mo_ago = price_data['Close'].iloc[-60]
+        if inputs.length >= 60:
+            price_6mo_ago = inputs.close[-60]
             price_trend = (current_price - price_6mo_ago) / price_6mo_ago
             max_score += 0.5
             if price_trend >= 0.20:  # 20% 이상 상승
                 score += 0.5
-                reasons['soros_momentum'] = f"6개월 상승률 {price_trend*100:.1f}%"
+                reasons.add('soros_momentum', "6개월 상승률 {:.1f}%", price_trend * 100)
             elif price_trend >= 0.10:  # 10% 이상 상승
                 score += 0.3
-                reasons['soros_momentum'] = f"6개월 상승률 {price_trend*100:.1f}%"
+                reasons.add('soros_momentum', "6개월 상승률 {:.1f}%", price_trend * 100)
             elif price_trend < -0.20:  # 20% 이상 하락
-                reasons['soros_momentum'] = f"6개월 하락률 {price_trend*100:.1f}%"
+                reasons.add('soros_momentum', "6개월 하락률 {:.1f}%", price_trend * 100)
         
         # ============================================
         # 5. 존 네프 (John Neff) - 저PER + 배당
@@ -235,14 +242,15 @@ def calculate_value_score(symbol, price_data):
         dividend_yield = financial.get('dividendYield')
         if dividend_yield is not None and dividend_yield > 0:
             max_score += 0.5
+            pct = dividend_yield * 100
             if dividend_yield >= 0.04:  # 4% 이상
                 score += 0.5
-                reasons['neff_dividend'] = f"배당 수익률 {dividend_yield*100:.2f}% (우수)"
+                reasons.add('neff_dividend', "배당 수익률 {:.2f}% (우수)", pct)
             elif dividend_yield >= 0.02:  # 2% 이상
                 score += 0.3
-                reasons['neff_dividend'] = f"배당 수익률 {dividend_yield*100:.2f}% (양호)"
+                reasons.add('neff_dividend', "배당 수익률 {:.2f}% (양호)", pct)
             else:
-                reasons['neff_dividend'] = f"배당 수익률 {dividend_yield*100:.2f}% (낮음)"
+                reasons.add('neff_dividend', "배당 수익률 {:.2f}% (낮음)", pct)
         
         # ============================================
         # 6. 추가 지표
@@ -251,14 +259,15 @@ def calculate_value_score(symbol, price_data):
         profit_margin = financial.get('profitMargins')
         if profit_margin is not None and profit_margin > 0:
             max_score += 0.5
+            pct = profit_margin * 100
             if profit_margin >= 0.20:  # 20% 이상
                 score += 0.5
-                reasons['profit_margin'] = f"순이익률 {profit_margin*100:.1f}% (우수)"
+                reasons.add('profit_margin', "순이익률 {:.1f}% (우수)", pct)
             elif profit_margin >= 0.10:  # 10% 이상
                 score += 0.3
-                reasons['profit_margin'] = f"순이익률 {profit_margin*100:.1f}% (양호)"
+                reasons.add('profit_margin', "순이익률 {:.1f}% (양호)", pct)
             else:
-                reasons['profit_margin'] = f"순이익률 {profit_margin*100:.1f}% (낮음)"
+                reasons.add('profit_margin', "순이익률 {:.1f}% (낮음)", pct)
         
         # 최대 10점으로 정규화
         if max_score > 0:
@@ -269,7 +278,77 @@ def calculate_value_score(symbol, price_data):
         return min(normalized_score, 10.0), reasons
         
     except Exception as e:
-        return 0.0, {'error': str(e)}
+        reasons = scoring.Reasons()
+        reasons.add('error', '{}', str(e))
+        return 0.0, reasons
+
+def score_value_table(table):
+    """
+    특징 표(scoring.universe_table) 전체의 가치투자 점수 (0-10점) - NumPy 배열
+
+    score_value의 if/elif 사다리를 np.digitize/np.select로 계산하고,
+    항목 점수를 같은 순서로 더해 종목별 계산과 같은 값을 돌려줍니다.
+    """
+    column = lambda name: table[name].to_numpy(dtype=np.float64)
+    length = column('length')
+    current_price = column('current_price')
+    score = np.zeros(len(table))
+    max_score = np.zeros(len(table))
+
+    def add(mask, points, weight):
+        nonlocal score, max_score
+        score = score + np.where(mask, points, 0.0)
+        max_score = max_score + np.where(mask, weight, 0.0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # 워렌 버핏 - ROE, 부채비율
+        roe = column('returnOnEquity')
+        add(roe > 0, scoring.ladder(roe, [10, 15, 20], [0.0, 1.0, 1.5, 2.0]), 2.0)
+        debt_to_equity = column('debtToEquity')
+        add(debt_to_equity >= 0, scoring.ladder(debt_to_equity, [30, 50, 100], [1.0, 0.7, 0.3, 0.0], right=True), 1.0)
+
+        # 벤저민 그레이엄 - PER, PBR, 유동비율
+        trailing_pe = column('trailingPE')
+        add(trailing_pe > 0, scoring.ladder(trailing_pe, [15, 20, 25], [1.5, 1.0, 0.5, 0.0], right=True), 1.5)
+        pbr = column('priceToBook')
+        add(pbr > 0, scoring.ladder(pbr, [1.0, 1.5, 2.5], [1.0, 0.8, 0.5, 0.0], right=True), 1.0)
+        current_ratio = column('currentRatio')
+        add(current_ratio > 0, scoring.ladder(current_ratio, [1.5, 2.0], [0.0, 0.3, 0.5]), 0.5)
+
+        # 피터 린치 - PEG, 매출/이익 성장률
+        peg = column('pegRatio')
+        add(peg > 0, scoring.ladder(peg, [0.5, 1.0, 1.5, 2.0], [1.5, 1.2, 0.8, 0.4, 0.0], right=True), 1.5)
+        revenue_growth = column('revenueGrowth')
+        add(~np.isnan(revenue_growth), scoring.ladder(revenue_growth, [0.05, 0.10, 0.20], [0.0, 0.4, 0.7, 1.0]), 1.0)
+        earnings_growth = column('earningsGrowth')
+        add(~np.isnan(earnings_growth), scoring.ladder(earnings_growth, [0.10, 0.20], [0.0, 0.3, 0.5]), 0.5)
+
+        # 조지 소로스 - 52주 위치, 가격 추세
+        week_52_high, week_52_low = column('fiftyTwoWeekHigh'), column('fiftyTwoWeekLow')
+        price_position = (current_price - week_52_low) / (week_52_high - week_52_low)
+        add((week_52_high != 0) & (week_52_low != 0) & (week_52_high > week_52_low),
+            scoring.ladder(price_position, [0.6, 0.8], [0.0, 0.3, 0.5]), 0.5)
+        price_6mo_ago = column('close_60')
+        add(length >= 60, scoring.ladder((current_price - price_6mo_ago) / price_6mo_ago, [0.10, 0.20], [0.0, 0.3, 0.5]), 0.5)
+
+        # 존 네프 - 배당 수익률
+        dividend_yield = column('dividendYield')
+        add(dividend_yield > 0, scoring.ladder(dividend_yield, [0.02, 0.04], [0.0, 0.3, 0.5]), 0.5)
+
+        # 추가 지표 - 순이익률
+        profit_margin = column('profitMargins')
+        add(profit_margin > 0, scoring.ladder(profit_margin, [0.10, 0.20], [0.0, 0.3, 0.5]), 0.5)
+
+    # 재무 지표가 없거나 일봉이 짧은 종목은 0점
+    valid = table['has_info'].to_numpy() & (length >= 20)
+    return np.where(valid, scoring.normalize(score, max_score), 0.0)
+
+def calculate_value_score(symbol, price_data):
+    """가치투자 점수와 근거 (0-10점) - 근거는 문장 딕셔너리"""
+    if price_data is None or price_data.empty:
+        return 0.0, {}
+    score, reasons = score_value(scoring.ScoreInputs(symbol, price_data))
+    return score, reasons.to_dict()
 
 def generate_value_signal(symbol, price_data):
     """가치투자 방법론 기반 매수 신호 생성 (점수만 반환)"""
@@ -277,19 +356,9 @@ def generate_value_signal(symbol, price_data):
         return None
     
     try:
-        score, reasons = calculate_value_score(symbol, price_data)
-        current_price = price_data['Close'].iloc[-1]
-        
-        # 점수가 있으면 항상 반환 (7.5점 미만이어도)
-        return {
-            'symbol': symbol,
-            'level': 'BUY' if score >= 7.5 else 'WATCH',
-            'score': round(score, 2),
-            'price': round(current_price, 2),
-            'date': datetime.now().isoformat(),
-            'reasons': reasons,
-            'method': 'value_investing'
-        }
+        inputs = scoring.ScoreInputs(symbol, price_data)
+        score, reasons = score_value(inputs)
+        return scoring.make_signal(symbol, 'value_investing', score, inputs.last_close, reasons)
     except Exception as e:
         return None
 
@@ -300,4 +369,3 @@ def get_value_score_only(symbol, price_data):
         return round(score, 2)
     except:
         return 0.0
-